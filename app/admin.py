@@ -1,14 +1,25 @@
 from django.contrib import admin
-from .models import NewsArticle, LocalNews
+from .models import Article, ArticleScope
+from app.services.search import matching
 
-@admin.register(NewsArticle)
-class NewsArticleAdmin(admin.ModelAdmin):
-    list_display = ("title", "source", "category", "sentiment", "published_at")
-    list_filter = ("category", "sentiment", "source")
-    search_fields = ("title", "source")
 
-@admin.register(LocalNews)
-class LocalNewsAdmin(admin.ModelAdmin):
+class HeadlineSearchMixin:
+    """Admin search through the full-text index instead of ``LIKE '%term%'`` scans."""
+
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term.strip():
+            return queryset, False
+        return matching(queryset, search_term), False
+
+
+class ArticleScopeInline(admin.TabularInline):
+    model = ArticleScope
+    extra = 0
+
+
+@admin.register(Article)
+class ArticleAdmin(HeadlineSearchMixin, admin.ModelAdmin):
     list_display = ("title", "source", "category", "sentiment", "published_at")
-    list_filter = ("category", "sentiment", "source")
-    search_fields = ("title", "source")
\ No newline at end of file
+    list_filter = ("placements__scope", "category", "sentiment", "source")
+    search_fields = ("title", "source")
+    inlines = [ArticleScopeInline]
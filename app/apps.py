@@ -1,6 +1,14 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class AppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'app'
+
+    def ready(self):
+        # Connect the cache invalidation receivers of articles_changed
+        from app.services import facets, local_feeds, response_cache  # noqa: F401
+        from app.services.search import repair_search_index
+
+        post_migrate.connect(repair_search_index, sender=self)
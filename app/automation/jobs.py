@@ -0,0 +1,30 @@
+from django.core.cache import cache
+from django.utils.timezone import now
+import uuid
+
+JOB_TIMEOUT = 60 * 60  # Keep refresh job progress around for an hour
+
+
+def _key(job_id):
+    return f"refresh_job_{job_id}"
+
+
+def create_job(**info):
+    """Registers a new refresh job in the cache and returns its ID."""
+    job_id = uuid.uuid4().hex
+    cache.set(_key(job_id), {"job_id": job_id, "state": "queued", "updated_at": now().isoformat(), **info}, JOB_TIMEOUT)
+    return job_id
+
+
+def update_job(job_id, state, **info):
+    """Records the stage a refresh job has reached; a ``None`` job_id (scheduled runs) is ignored."""
+    if job_id is None:
+        return
+    job = cache.get(_key(job_id)) or {"job_id": job_id}
+    job.update(info, state=state, updated_at=now().isoformat())
+    cache.set(_key(job_id), job, JOB_TIMEOUT)
+
+
+def get_job(job_id):
+    """Returns the progress dict of a refresh job, or ``None`` if it is unknown or expired."""
+    return cache.get(_key(job_id))
@@ -0,0 +1,141 @@
+from celery import chain, shared_task
+from django.core.cache import cache
+from app.automation.jobs import create_job, update_job
+from app.services.freshness import EXPIRED, FRESH, backing_off, category_states, local_scope, mark_failed
+from app.services.geocoding import resolve_locality
+from app.services.news_fetcher import (
+    CATEGORIES, GLOBAL_SCOPE, fetch_global_articles, fetch_local_articles, fetch_local_news, fetch_news,
+    store_global_articles, store_local_articles,
+)
+from app.services.retention import purge_old_articles
+from app.services.sentiment_analyzer import analyze_sentiment
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+REVALIDATE_LOCK_TIMEOUT = 5 * 60  # Safety net: the lock is released when the background refresh ends
+
+
+@shared_task
+def fetch_articles(job_id=None, lat=None, lon=None):
+    """Fetch stage: pulls raw articles from NewsAPI and hands them to ``ingest_articles``.
+
+    Each stage stores its duration on the job (``<stage>_seconds``): metrics recorded on a
+    worker never reach the web process's ``/metrics``, but a slow refresh shows up in its status.
+    """
+    update_job(job_id, "fetching")
+    started = time.perf_counter()
+    fetched = {
+        "global": fetch_global_articles(),
+        "local": fetch_local_articles(lat, lon) if lat is not None and lon is not None else None,
+    }
+    update_job(job_id, "fetching", fetch_seconds=round(time.perf_counter() - started, 3))
+    return fetched
+
+
+@shared_task
+def ingest_articles(fetched, job_id=None):
+    """Ingest stage: bulk inserts the fetched articles and passes the created IDs on."""
+    update_job(job_id, "ingesting")
+    started = time.perf_counter()
+    article_ids = store_global_articles(fetched["global"]) if fetched["global"] is not None else []
+    local_ids = store_local_articles(fetched["local"]) if fetched["local"] is not None else []
+    update_job(job_id, "ingesting", ingest_seconds=round(time.perf_counter() - started, 3))
+    return {"article_ids": article_ids, "local_ids": local_ids}
+
+
+@shared_task
+def score_articles(ingested, job_id=None):
+    """Score stage: runs sentiment analysis on just the newly created articles."""
+    update_job(job_id, "scoring", created=len(ingested["article_ids"]) + len(ingested["local_ids"]))
+    started = time.perf_counter()
+    scored = analyze_sentiment(article_ids=ingested["article_ids"], local_ids=ingested["local_ids"])
+    update_job(job_id, "done", scored=scored, score_seconds=round(time.perf_counter() - started, 3))
+    return scored
+
+
+@shared_task
+def mark_refresh_failed(job_id):
+    """Error callback of a refresh chain."""
+    update_job(job_id, "failed")
+
+
+def refresh_chain(job_id=None, lat=None, lon=None):
+    """Builds the fetch → ingest → score chain for one refresh."""
+    return chain(
+        fetch_articles.s(job_id=job_id, lat=lat, lon=lon),
+        ingest_articles.s(job_id=job_id),
+        score_articles.s(job_id=job_id),
+    )
+
+
+def enqueue_refresh(lat=None, lon=None):
+    """Queues a refresh on the Celery workers and returns the job ID to poll."""
+    job_id = create_job(lat=lat, lon=lon)
+    refresh_chain(job_id, lat, lon).apply_async(link_error=mark_refresh_failed.si(job_id))
+    return job_id
+
+
+@shared_task
+def release_revalidation(scope):
+    """Last task (and error callback) of a background revalidation: lets the next one be queued."""
+    cache.delete(f"revalidating_{scope}")
+
+
+def revalidate_news(lat=None, lon=None, location=None):
+    """Read-path freshness check for global news, or for the locality of ``lat``/``lon``.
+
+    Callers that already resolved the locality pass its ``location`` (see ``local_location``).
+
+    Stale categories are served as they are while one background refresh runs; only
+    categories past their hard TTL make the caller wait for a synchronous fetch. Categories
+    whose last fetch failed back off (see ``mark_failed``): until the back-off ends readers
+    get what is stored, possibly nothing, without waiting on the upstream.
+    """
+    if lat is None or lon is None:
+        scope = GLOBAL_SCOPE
+    else:
+        scope = local_scope(location if location is not None else resolve_locality(lat, lon))
+    states = category_states(scope, CATEGORIES)
+    due = [category for category in CATEGORIES if states[category] != FRESH]
+    failed = set(backing_off(scope, due))
+    due = [category for category in due if category not in failed]
+
+    if any(states[category] == EXPIRED for category in due):
+        logger.info(f"⌛ {scope} news is past its hard TTL, fetching before responding")
+        try:
+            if scope == GLOBAL_SCOPE:
+                analyze_sentiment(article_ids=fetch_news(), local_ids=[])
+            else:
+                analyze_sentiment(article_ids=[], local_ids=fetch_local_news(lat, lon))
+        except Exception as e:
+            mark_failed(scope, due)
+            logger.error(f"❌ Could not fetch {scope} news, serving stored articles: {str(e)}")
+    elif due:
+        _revalidate_in_background(scope, lat, lon)
+
+
+def _revalidate_in_background(scope, lat, lon):
+    """Queues one background refresh per scope; the lock is released when it ends, however it ends."""
+    if not cache.add(f"revalidating_{scope}", True, REVALIDATE_LOCK_TIMEOUT):
+        return
+    logger.info(f"🔄 {scope} news is stale, refreshing in the background")
+    try:
+        release = release_revalidation.si(scope)
+        (refresh_chain(lat=lat, lon=lon) | release).apply_async(link_error=release)
+    except Exception as e:
+        release_revalidation(scope)
+        logger.error(f"❌ Could not queue background refresh: {str(e)}")
+
+
+@shared_task
+def fetch_and_store_news():
+    """Scheduled global refresh (see ``config/celery.py``)."""
+    refresh_chain().apply_async()
+
+
+@shared_task
+def delete_old_articles():
+    """Scheduled retention purge (see ``config/celery.py``); returns articles unlisted per scope."""
+    return {result["scope"]: result["removed"] for result in purge_old_articles()}
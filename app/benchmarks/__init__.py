@@ -0,0 +1 @@
+"""Performance benchmarks over synthetic corpora; run them with ``manage.py benchmark_news``."""
@@ -0,0 +1,77 @@
+from contextlib import contextmanager
+from copy import deepcopy
+from datetime import timedelta, timezone
+from itertools import count
+from pathlib import Path
+from django.utils.timezone import now
+from app.benchmarks.corpus import synthetic_headline
+from app.services.clients import override_clients
+import json
+import random
+import time
+
+FIXTURES = Path(__file__).resolve().parent / "fixtures"
+
+
+def load_fixture(name):
+    with open(FIXTURES / name, encoding="utf-8") as f:
+        return json.load(f)
+
+
+class StubNewsApi:
+    """Offline NewsAPI client answering from a recorded response.
+
+    Every call returns ``page_size`` copies of the recorded articles with synthetic titles
+    and fresh URLs, so each refresh ingests new rows. ``latency`` simulates the network.
+    """
+
+    def __init__(self, page_size=100, latency=0.0, seed=0):
+        self.template = load_fixture("newsapi_top_headlines.json")
+        self.page_size = page_size
+        self.latency = latency
+        self.rng = random.Random(seed)
+        self.numbers = count()
+        self.calls = 0
+
+    def _page(self):
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        published = now().astimezone(timezone.utc)
+        recorded = self.template["articles"]
+        articles = []
+        for i in range(self.page_size):
+            article = deepcopy(recorded[i % len(recorded)])
+            number = next(self.numbers)
+            article["title"] = f"{synthetic_headline(self.rng)} - {article['source']['name']}"
+            article["url"] = f"https://bench.example.com/fetched/{number}"
+            article["publishedAt"] = (published - timedelta(minutes=number % 600)).strftime("%Y-%m-%dT%H:%M:%SZ")
+            articles.append(article)
+        return {"status": "ok", "totalResults": len(articles), "articles": articles}
+
+    def get_top_headlines(self, **params):
+        return self._page()
+
+    def get_everything(self, **params):
+        return self._page()
+
+
+class StubGeocoder:
+    """Offline OpenCage client returning a recorded reverse-geocoding result."""
+
+    def __init__(self):
+        self.results = load_fixture("opencage_reverse.json")
+        self.calls = 0
+
+    def reverse_geocode(self, lat, lon):
+        self.calls += 1
+        return deepcopy(self.results)
+
+
+@contextmanager
+def stub_clients(newsapi=None, geocoder=None):
+    """Swaps the NewsAPI and OpenCage clients for the offline stubs; yields ``(newsapi, geocoder)``."""
+    newsapi = newsapi or StubNewsApi()
+    geocoder = geocoder or StubGeocoder()
+    with override_clients(newsapi=newsapi, geocoder=geocoder):
+        yield newsapi, geocoder
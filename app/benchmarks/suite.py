@@ -0,0 +1,185 @@
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, override_settings
+from app.benchmarks.corpus import seed_table
+from app.benchmarks.stubs import stub_clients
+from app.middleware import QueryTimer
+from app.models import Article, NewsArticle, LocalNews, SCOPE_MODELS
+from app.services.freshness import local_scope, mark_fetched
+from app.services.news_fetcher import CATEGORIES, GLOBAL_SCOPE, fetch_local_news, fetch_news
+from app.services.scheduler import get_scheduler
+from app.services.score_cache import get_score_cache
+from app.services.sentiment_analyzer import pending_articles, process_sentiment
+from app.services.sentiment_engine import SENTIMENT_VERSION
+from app.signals import articles_changed
+import django
+import platform
+import statistics
+import time
+
+DEFAULT_SIZES = (1000, 100000, 1000000)
+
+# The fetch benchmarks measure fetch + ingest, not the request scheduler's limits
+UNLIMITED_NEWSAPI = {"NEWSAPI_DAILY_QUOTA": 10 ** 9, "NEWSAPI_RATE": 10.0 ** 6, "NEWSAPI_BURST": 10 ** 6}
+
+# Inside the cell of the recorded OpenCage result (Austin, Texas)
+LAT, LON = 30.2672, -97.7431
+
+VIEWS = {
+    "index": "/",
+    "index_filtered": "/?category=Business&sentiment=Positive",
+    "index_search": "/?q=climate",
+    "fetch_local_news_view": f"/fetch_local_news?lat={LAT}&lon={LON}",
+}
+
+
+def summarize(samples):
+    """Milliseconds statistics of a list of durations in seconds."""
+    ordered = sorted(samples)
+    return {
+        "runs": len(ordered),
+        "min_ms": round(ordered[0] * 1000, 3),
+        "median_ms": round(statistics.median(ordered) * 1000, 3),
+        "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 3),
+        "max_ms": round(ordered[-1] * 1000, 3),
+    }
+
+
+def bench_fetch(fetch, repeat, *args):
+    """Times a full fetch + ingest of stubbed NewsAPI pages; every run starts with all categories due."""
+    samples, articles = [], 0
+    for _ in range(repeat):
+        cache.clear()  # Forget the freshness markers
+        started = time.perf_counter()
+        articles += len(fetch(*args))
+        samples.append(time.perf_counter() - started)
+    return {**summarize(samples), "articles": articles, "articles_per_second": round(articles / sum(samples), 1)}
+
+
+def bench_sentiment(sample):
+    """Scores the ``sample`` newest articles again, with a cold then a warm score cache; reports titles/sec."""
+    ids = list(Article.objects.order_by("-published_at").values_list("id", flat=True)[:sample])
+    get_score_cache.cache_clear()
+    cache.clear()
+    results = {}
+    for run in ("cold", "warm"):
+        Article.objects.filter(id__in=ids).update(sentiment_version=0)
+        started = time.perf_counter()
+        scored = process_sentiment(pending_articles(ids))
+        seconds = time.perf_counter() - started
+        results[run] = {"titles": scored, "seconds": round(seconds, 4), "titles_per_second": round(scored / seconds, 1)}
+    return results
+
+
+def bench_views(repeat):
+    """Latency of the list views through the full middleware stack, cold and warm response cache."""
+    client = Client()
+    headers = {"HTTP_X_REQUESTED_WITH": "XMLHttpRequest"}
+    mark_fetched(GLOBAL_SCOPE, CATEGORIES)
+    client.get(VIEWS["fetch_local_news_view"], **headers)  # Geocodes once, before the cell is cached
+    mark_fetched(local_scope("Austin, Texas"), CATEGORIES)
+
+    results = {}
+    for name, path in VIEWS.items():
+        cold, warm = [], []
+        for _ in range(repeat):
+            # A new data generation misses the response cache, as after a refresh (which
+            # also rebuilds the feeds of Austin once it is hot)
+            articles_changed.send(sender=NewsArticle)
+            articles_changed.send(sender=LocalNews, locations=["Austin, Texas"])
+            queries = QueryTimer()
+            with connection.execute_wrapper(queries):
+                started = time.perf_counter()
+                response = client.get(path, **headers)
+                cold.append(time.perf_counter() - started)
+            if response.status_code != 200:
+                raise RuntimeError(f"{path} answered {response.status_code}")
+            started = time.perf_counter()
+            client.get(path, **headers)
+            warm.append(time.perf_counter() - started)
+        results[name] = {"cold": {**summarize(cold), "queries": queries.count}, "warm": summarize(warm)}
+    return results
+
+
+@contextmanager
+def unlimited_newsapi():
+    """Lifts the request scheduler's limits, rebuilding it on the way in and out."""
+    with override_settings(**UNLIMITED_NEWSAPI):
+        get_scheduler.cache_clear()
+        try:
+            yield
+        finally:
+            get_scheduler.cache_clear()
+
+
+def run_suite(sizes=DEFAULT_SIZES, repeat=5, score_sample=2000, seed=0, log=None):
+    """Grows both feeds to each size in turn and benchmarks ingestion, scoring and the views.
+
+    NewsAPI and OpenCage are replaced by offline stubs. Must run against a scratch
+    database: rows are added, rescored and never cleaned up. Returns a JSON-serializable dict.
+    """
+    log = log or (lambda message: None)
+    results = []
+    with stub_clients(), unlimited_newsapi():
+        for size in sorted(sizes):
+            log(f"Seeding {size} articles per feed scope...")
+            started = time.perf_counter()
+            for scope, model_class in SCOPE_MODELS.items():
+                existing = model_class.objects.count()
+                if existing < size:
+                    seed_table(scope, size - existing, start=existing, seed=seed)
+            seed_seconds = time.perf_counter() - started
+
+            log(f"Benchmarking at {size} rows...")
+            results.append({
+                "rows": size,
+                "seed_seconds": round(seed_seconds, 3),
+                "fetch_news": bench_fetch(fetch_news, repeat),
+                "fetch_local_news": bench_fetch(fetch_local_news, repeat, LAT, LON),
+                "process_sentiment": bench_sentiment(score_sample),
+                "views": bench_views(repeat),
+            })
+    return {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "environment": {
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "database": connection.vendor,
+            "platform": platform.platform(),
+            "sentiment_version": SENTIMENT_VERSION,
+        },
+        "parameters": {"repeat": repeat, "score_sample": score_sample, "seed": seed},
+        "results": results,
+    }
+
+
+def _flatten(value, prefix=""):
+    if isinstance(value, dict):
+        for key, item in value.items():
+            yield from _flatten(item, f"{prefix}.{key}" if prefix else key)
+    else:
+        yield prefix, value
+
+
+def compare(report, baseline, tolerance=0.25):
+    """Lists the medians and throughputs of ``report`` that are more than ``tolerance`` worse than ``baseline``.
+
+    Sizes are matched by row count; metrics missing from either report are skipped.
+    """
+    previous = {result["rows"]: dict(_flatten(result)) for result in baseline["results"]}
+    regressions = []
+    for result in report["results"]:
+        old = previous.get(result["rows"])
+        if old is None:
+            continue
+        for name, value in _flatten(result):
+            before = old.get(name)
+            if not before or not isinstance(value, (int, float)):
+                continue
+            if name.endswith("median_ms") and value > before * (1 + tolerance):
+                regressions.append(f"{result['rows']} rows: {name} {before} -> {value} ms")
+            elif name.endswith("per_second") and value < before * (1 - tolerance):
+                regressions.append(f"{result['rows']} rows: {name} {before} -> {value}/s")
+    return regressions
@@ -0,0 +1,68 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+from django.test.utils import (
+    override_settings, setup_databases, setup_test_environment, teardown_databases, teardown_test_environment,
+)
+from app.benchmarks.suite import DEFAULT_SIZES, compare, run_suite
+import json
+import logging
+import sys
+
+# Large enough that score cache entries never cull the freshness markers (locmem keeps 300 by default)
+BENCHMARK_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "OPTIONS": {"MAX_ENTRIES": 10 ** 7}},
+}
+
+
+class Command(BaseCommand):
+    help = "Benchmarks ingestion, sentiment scoring and the list views on synthetic corpora, offline"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES), help="Articles per feed scope")
+        parser.add_argument("--repeat", type=int, default=5, help="Runs per measurement")
+        parser.add_argument("--score-sample", type=int, default=2000, help="Titles rescored per size")
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--output", default="benchmark.json", help="JSON results file, or - for stdout")
+        parser.add_argument("--baseline", help="Earlier results file to check for regressions")
+        parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown against the baseline")
+        parser.add_argument("--keepdb", action="store_true", help="Keep the benchmark database between runs")
+
+    def handle(self, *args, **options):
+        baseline = None
+        if options["baseline"]:
+            with open(options["baseline"], encoding="utf-8") as f:
+                baseline = json.load(f)
+
+        # Runs against a throwaway test database and an in-memory cache, never the real ones
+        setup_test_environment()
+        old_config = setup_databases(
+            options["verbosity"], interactive=False,
+            keepdb=options["keepdb"], aliases={DEFAULT_DB_ALIAS},
+        )
+        logging.disable(logging.INFO)  # Per-refresh log lines would drown the progress output
+        try:
+            with override_settings(CACHES=BENCHMARK_CACHES, DEBUG=False, SERVER_TIMING=False):
+                report = run_suite(
+                    options["sizes"], options["repeat"], options["score_sample"], options["seed"],
+                    log=self.stdout.write,
+                )
+        finally:
+            logging.disable(logging.NOTSET)
+            teardown_databases(old_config, verbosity=options["verbosity"], keepdb=options["keepdb"])
+            teardown_test_environment()
+
+        if options["output"] == "-":
+            json.dump(report, sys.stdout, indent=2)
+            sys.stdout.write("\n")
+        else:
+            with open(options["output"], "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Wrote benchmark results to {options['output']}"))
+
+        if baseline is not None:
+            regressions = compare(report, baseline, options["tolerance"])
+            for regression in regressions:
+                self.stderr.write(regression)
+            if regressions:
+                raise CommandError(f"{len(regressions)} regressions against {options['baseline']}")
+            self.stdout.write(self.style.SUCCESS("No regressions against the baseline"))
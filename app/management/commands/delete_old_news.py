@@ -1,23 +1,23 @@
 from django.core.management.base import BaseCommand
-from datetime import timedelta
-from django.utils.timezone import now
-from app.models import NewsArticle
+from app.services.retention import purge_old_articles
 import logging
 
 logger = logging.getLogger(__name__)
 
 class Command(BaseCommand):
-    help = "Deletes news articles older than a week"
+    help = "Deletes global and local news articles older than their retention window (NEWS_RETENTION_DAYS)"
 
-    def handle(self, *args, **kwargs):
-        one_week_ago = now() - timedelta(days=7)
-        old_articles = NewsArticle.objects.filter(published_at__lt=one_week_ago)
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, help="Override the retention window of every feed")
+        parser.add_argument("--batch-size", type=int, help="Rows deleted per transaction (default: PURGE_BATCH_SIZE)")
 
-        if old_articles.exists():
-            count = old_articles.count()
-            old_articles.delete()
-            logger.info(f"🗑️ Deleted {count} old news articles older than 7 days.")
-            self.stdout.write(self.style.SUCCESS(f"Deleted {count} old news articles"))
-        else:
-            logger.info("✅ No old news articles to delete.")
-            self.stdout.write(self.style.SUCCESS("No old news articles to delete."))
+    def handle(self, *args, **options):
+        for result in purge_old_articles(days=options["days"], batch_size=options["batch_size"]):
+            if result["removed"]:
+                self.stdout.write(self.style.SUCCESS(
+                    f"Unlisted {result['removed']} old {result['scope']} articles, deleted {result['deleted']} "
+                    f"in {result['seconds']:.2f}s ({result['rows_per_second']:.0f} rows/s)"
+                ))
+            else:
+                logger.info(f"✅ No old {result['scope']} articles to delete.")
+                self.stdout.write(self.style.SUCCESS(f"No old {result['scope']} articles to delete."))
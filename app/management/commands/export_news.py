@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand, CommandError
+from app.services.export import CHUNK_SIZE, FORMATS, SCOPES, export_queryset, iter_export
+import sys
+
+class Command(BaseCommand):
+    help = "Streams the article archive to a file as NDJSON or CSV"
+
+    def add_arguments(self, parser):
+        parser.add_argument("output", help="File to write, or - for stdout")
+        parser.add_argument("--format", choices=FORMATS, default="ndjson")
+        parser.add_argument("--scope", choices=SCOPES, default="global")
+        parser.add_argument("--since", help="Only articles published on/after this ISO date or datetime")
+        parser.add_argument("--until", help="Only articles published on/before this ISO date or datetime")
+        parser.add_argument("--category")
+        parser.add_argument("--sentiment")
+        parser.add_argument("--location", help="Local scope only")
+        parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        try:
+            queryset = export_queryset(
+                options["scope"], options["since"], options["until"],
+                options["category"], options["sentiment"], options["location"],
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        output = sys.stdout if options["output"] == "-" else open(options["output"], "w", encoding="utf-8", newline="")
+        count = -1 if options["format"] == "csv" else 0  # Don't count the CSV header
+        try:
+            for line in iter_export(queryset, options["format"], options["chunk_size"]):
+                output.write(line)
+                count += 1
+        finally:
+            if output is not sys.stdout:
+                output.close()
+
+        if output is not sys.stdout:
+            self.stdout.write(self.style.SUCCESS(f"Exported {count} articles to {options['output']}"))
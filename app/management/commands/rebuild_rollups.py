@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand, CommandError
+from app.services.export import parse_moment
+from app.services.rollups import rebuild_rollups
+import logging
+
+logger = logging.getLogger(__name__)
+
+class Command(BaseCommand):
+    help = "Backfills the sentiment rollups from the stored articles"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--since",
+            help="Only rebuild buckets from this ISO date on (default: the oldest article still stored)",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            since = parse_moment(options["since"], "since") if options["since"] else None
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        written = rebuild_rollups(since)
+        logger.info(f"✅ Wrote {written} sentiment rollup rows.")
+        self.stdout.write(self.style.SUCCESS(f"Wrote {written} sentiment rollup rows"))
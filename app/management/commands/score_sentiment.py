@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+from app.models import Article
+from app.services.rollups import rebuild_rollups
+from app.services.sentiment_analyzer import analyze_sentiment
+import logging
+
+logger = logging.getLogger(__name__)
+
+class Command(BaseCommand):
+    help = "Scores news articles whose sentiment is missing or was computed by an older scorer version"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Reset every article's sentiment version first so the whole archive is rescored",
+        )
+
+    def handle(self, *args, **options):
+        if options["all"]:
+            Article.objects.update(sentiment_version=0)
+
+        scored = analyze_sentiment()
+        if options["all"]:
+            # The reset hid the old labels from the incremental rollup update, so recount
+            rebuild_rollups()
+        logger.info(f"✅ Scored {scored} articles.")
+        self.stdout.write(self.style.SUCCESS(f"Scored {scored} articles"))
@@ -0,0 +1,56 @@
+from django.conf import settings
+from django.db import connection
+from app.services.metrics import VIEW_QUERIES, VIEW_SECONDS, request_spans
+import time
+
+
+class QueryTimer:
+    """``connection.execute_wrapper`` hook counting the queries of a request and their time."""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.seconds += time.perf_counter() - started
+
+
+class ServerTimingMiddleware:
+    """Records latency and query counts per view, and optionally reports them to the client.
+
+    Spans recorded while the view runs (fetch, score, serialize...) and the database time
+    are sent in a ``Server-Timing`` header when ``SERVER_TIMING`` is enabled; it exposes
+    internals, so it defaults to ``DEBUG``.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        queries = QueryTimer()
+        token = request_spans.set([])
+        started = time.perf_counter()
+        try:
+            with connection.execute_wrapper(queries):
+                response = self.get_response(request)
+            spans = request_spans.get()
+        finally:
+            request_spans.reset(token)
+        elapsed = time.perf_counter() - started
+
+        match = request.resolver_match
+        view = match.view_name if match else "unresolved"
+        VIEW_SECONDS.observe(elapsed, view=view)
+        VIEW_QUERIES.observe(queries.count, view=view)
+
+        if getattr(settings, "SERVER_TIMING", False):
+            metrics = [f"{name};dur={seconds * 1000:.1f}" for name, seconds in spans]
+            metrics.append(f'db;desc="{queries.count} queries";dur={queries.seconds * 1000:.1f}')
+            metrics.append(f"total;dur={elapsed * 1000:.1f}")
+            response["Server-Timing"] = ", ".join(metrics)
+        return response
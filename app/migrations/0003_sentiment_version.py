@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0002_localnews_alter_newsarticle_options'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='localnews',
+            name='sentiment_version',
+            field=models.PositiveSmallIntegerField(db_index=True, default=0),
+        ),
+        migrations.AddField(
+            model_name='newsarticle',
+            name='sentiment_version',
+            field=models.PositiveSmallIntegerField(db_index=True, default=0),
+        ),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0003_sentiment_version'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='localnews',
+            options={'ordering': ['-published_at']},
+        ),
+        migrations.AlterModelOptions(
+            name='newsarticle',
+            options={'ordering': ['-published_at']},
+        ),
+        migrations.AddIndex(
+            model_name='localnews',
+            index=models.Index(fields=['-published_at', '-id'], name='local_published_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='localnews',
+            index=models.Index(fields=['category', '-published_at', '-id'], name='local_category_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='localnews',
+            index=models.Index(fields=['sentiment', '-published_at', '-id'], name='local_sentiment_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='localnews',
+            index=models.Index(fields=['location', '-published_at', '-id'], name='local_location_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='localnews',
+            index=models.Index(fields=['location', 'category', '-published_at', '-id'], name='local_loc_category_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='newsarticle',
+            index=models.Index(fields=['-published_at', '-id'], name='news_published_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='newsarticle',
+            index=models.Index(fields=['category', '-published_at', '-id'], name='news_category_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='newsarticle',
+            index=models.Index(fields=['sentiment', '-published_at', '-id'], name='news_sentiment_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='newsarticle',
+            index=models.Index(fields=['category', 'sentiment', '-published_at', '-id'], name='news_cat_sentiment_idx'),
+        ),
+    ]
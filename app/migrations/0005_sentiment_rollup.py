@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0004_article_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SentimentRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('granularity', models.CharField(choices=[('hour', 'Hour'), ('day', 'Day')], max_length=10)),
+                ('bucket', models.DateTimeField()),
+                ('scope', models.CharField(max_length=10)),
+                ('location', models.CharField(blank=True, default='', max_length=100)),
+                ('category', models.CharField(max_length=50)),
+                ('sentiment', models.CharField(max_length=20)),
+                ('count', models.IntegerField(default=0)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['granularity', 'scope', 'location', 'bucket'], name='rollup_bucket_idx')],
+                'constraints': [models.UniqueConstraint(fields=('granularity', 'scope', 'location', 'category', 'bucket', 'sentiment'), name='rollup_unique')],
+            },
+        ),
+    ]
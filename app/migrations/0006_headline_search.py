@@ -0,0 +1,75 @@
+from django.db import migrations
+
+TABLES = ("app_newsarticle", "app_localnews")
+
+# External-content FTS5 index over title/source, kept in sync by triggers. Scoring only
+# updates the sentiment columns, so the update trigger is limited to title and source.
+SQLITE_CREATE = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS {table}_fts USING fts5(
+        title, source, content='{table}', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS {table}_fts_insert AFTER INSERT ON {table} BEGIN
+        INSERT INTO {table}_fts(rowid, title, source) VALUES (new.id, new.title, new.source);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS {table}_fts_delete AFTER DELETE ON {table} BEGIN
+        INSERT INTO {table}_fts({table}_fts, rowid, title, source) VALUES ('delete', old.id, old.title, old.source);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS {table}_fts_update AFTER UPDATE OF title, source ON {table} BEGIN
+        INSERT INTO {table}_fts({table}_fts, rowid, title, source) VALUES ('delete', old.id, old.title, old.source);
+        INSERT INTO {table}_fts(rowid, title, source) VALUES (new.id, new.title, new.source);
+    END""",
+    "INSERT INTO {table}_fts({table}_fts) VALUES ('rebuild')",  # Index the existing rows
+]
+
+SQLITE_DROP = [
+    "DROP TRIGGER IF EXISTS {table}_fts_insert",
+    "DROP TRIGGER IF EXISTS {table}_fts_delete",
+    "DROP TRIGGER IF EXISTS {table}_fts_update",
+    "DROP TABLE IF EXISTS {table}_fts",
+]
+
+# Expression GIN index; the expression must match app.services.search.POSTGRES_DOCUMENT
+POSTGRES_CREATE = [
+    """CREATE INDEX IF NOT EXISTS {table}_search_idx ON {table} USING GIN (
+        to_tsvector('english'::regconfig, COALESCE(title, '') || ' ' || COALESCE(source, ''))
+    )""",
+]
+
+POSTGRES_DROP = ["DROP INDEX IF EXISTS {table}_search_idx"]
+
+
+def _run(schema_editor, statements):
+    for table in TABLES:
+        for statement in statements:
+            schema_editor.execute(statement.format(table=table))
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "sqlite":
+        with schema_editor.connection.cursor() as cursor:
+            cursor.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')")
+            if not cursor.fetchone()[0]:
+                return  # No FTS5 in this SQLite build: search falls back to LIKE
+        _run(schema_editor, SQLITE_CREATE)
+    elif vendor == "postgresql":
+        _run(schema_editor, POSTGRES_CREATE)
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "sqlite":
+        _run(schema_editor, SQLITE_DROP)
+    elif vendor == "postgresql":
+        _run(schema_editor, POSTGRES_DROP)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0005_sentiment_rollup'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
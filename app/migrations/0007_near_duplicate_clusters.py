@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0006_headline_search'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='localnews',
+            name='cluster_id',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='localnews',
+            name='is_duplicate',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='localnews',
+            name='title_simhash',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='newsarticle',
+            name='cluster_id',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='newsarticle',
+            name='is_duplicate',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='newsarticle',
+            name='title_simhash',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+    ]
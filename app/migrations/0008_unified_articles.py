@@ -0,0 +1,203 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:21
+
+import django.db.models.deletion
+from django.core.management.color import no_style
+from django.db import migrations, models
+
+
+COLUMNS = "title, source, url, published_at, category, sentiment, sentiment_version, title_simhash, cluster_id, is_duplicate"
+LOCAL_COLUMNS = COLUMNS.replace("sentiment,", "COALESCE(sentiment, 'Neutral'),", 1)
+
+# Global articles keep their IDs; a local row whose URL is already stored becomes a
+# local placement of that article instead of a second copy.
+COPY_GLOBAL = [
+    f"INSERT INTO app_article (id, {COLUMNS}) SELECT id, {COLUMNS} FROM app_newsarticle",
+    "INSERT INTO app_articlescope (article_id, scope, location) SELECT id, 'global', '' FROM app_newsarticle",
+]
+COPY_LOCAL = [
+    f"INSERT INTO app_article ({COLUMNS}) SELECT {LOCAL_COLUMNS} FROM app_localnews "
+    "WHERE url NOT IN (SELECT url FROM app_article)",
+    "INSERT INTO app_articlescope (article_id, scope, location) "
+    "SELECT a.id, 'local', l.location FROM app_localnews l JOIN app_article a ON a.url = l.url",
+]
+
+# Reverse: the old local table holds one location per URL, so the first placement wins
+RESTORE = [
+    f"INSERT INTO app_newsarticle (id, {COLUMNS}) SELECT a.id, "
+    + ", ".join(f"a.{column}" for column in COLUMNS.split(", "))
+    + " FROM app_article a JOIN app_articlescope s ON s.article_id = a.id AND s.scope = 'global'",
+    f"INSERT INTO app_localnews ({COLUMNS}, location) SELECT "
+    + ", ".join(f"a.{column}" for column in COLUMNS.split(", "))
+    + ", s.location FROM app_article a JOIN app_articlescope s ON s.article_id = a.id "
+    "WHERE s.id IN (SELECT MIN(id) FROM app_articlescope WHERE scope = 'local' GROUP BY article_id)",
+]
+
+# Full-text index of migration 0006, moved from the two old tables to app_article
+SQLITE_CREATE = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS {table}_fts USING fts5(
+        title, source, content='{table}', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS {table}_fts_insert AFTER INSERT ON {table} BEGIN
+        INSERT INTO {table}_fts(rowid, title, source) VALUES (new.id, new.title, new.source);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS {table}_fts_delete AFTER DELETE ON {table} BEGIN
+        INSERT INTO {table}_fts({table}_fts, rowid, title, source) VALUES ('delete', old.id, old.title, old.source);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS {table}_fts_update AFTER UPDATE OF title, source ON {table} BEGIN
+        INSERT INTO {table}_fts({table}_fts, rowid, title, source) VALUES ('delete', old.id, old.title, old.source);
+        INSERT INTO {table}_fts(rowid, title, source) VALUES (new.id, new.title, new.source);
+    END""",
+    "INSERT INTO {table}_fts({table}_fts) VALUES ('rebuild')",
+]
+
+SQLITE_DROP = [
+    "DROP TRIGGER IF EXISTS {table}_fts_insert",
+    "DROP TRIGGER IF EXISTS {table}_fts_delete",
+    "DROP TRIGGER IF EXISTS {table}_fts_update",
+    "DROP TABLE IF EXISTS {table}_fts",
+]
+
+POSTGRES_CREATE = [
+    """CREATE INDEX IF NOT EXISTS {table}_search_idx ON {table} USING GIN (
+        to_tsvector('english'::regconfig, COALESCE(title, '') || ' ' || COALESCE(source, ''))
+    )""",
+]
+
+POSTGRES_DROP = ["DROP INDEX IF EXISTS {table}_search_idx"]
+
+OLD_TABLES = ("app_newsarticle", "app_localnews")
+NEW_TABLES = ("app_article",)
+
+
+def _run(schema_editor, statements, tables=("",)):
+    for table in tables:
+        for statement in statements:
+            schema_editor.execute(statement.format(table=table))
+
+
+def copy_articles(apps, schema_editor):
+    _run(schema_editor, COPY_GLOBAL)
+    # Local articles get new IDs after the copied ones
+    connection = schema_editor.connection
+    _run(schema_editor, connection.ops.sequence_reset_sql(no_style(), [apps.get_model("app", "Article")]))
+    _run(schema_editor, COPY_LOCAL)
+
+
+def restore_articles(apps, schema_editor):
+    _run(schema_editor, RESTORE)
+
+
+def _has_fts5(schema_editor):
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')")
+        return bool(cursor.fetchone()[0])
+
+
+def _move_search_index(schema_editor, old_tables, new_tables):
+    vendor = schema_editor.connection.vendor
+    if vendor == "sqlite" and _has_fts5(schema_editor):
+        _run(schema_editor, SQLITE_DROP, old_tables)
+        _run(schema_editor, SQLITE_CREATE, new_tables)
+    elif vendor == "postgresql":
+        _run(schema_editor, POSTGRES_DROP, old_tables)
+        _run(schema_editor, POSTGRES_CREATE, new_tables)
+
+
+def move_search_index(apps, schema_editor):
+    _move_search_index(schema_editor, OLD_TABLES, NEW_TABLES)
+
+
+def restore_search_index(apps, schema_editor):
+    _move_search_index(schema_editor, NEW_TABLES, OLD_TABLES)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0007_near_duplicate_clusters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Article',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(max_length=500)),
+                ('source', models.CharField(max_length=100)),
+                ('url', models.URLField(unique=True)),
+                ('published_at', models.DateTimeField()),
+                ('category', models.CharField(choices=[('Technology', 'Technology'), ('Business', 'Business'), ('Sports', 'Sports'), ('Entertainment', 'Entertainment'), ('Health', 'Health'), ('Science', 'Science'), ('General', 'General')], max_length=50)),
+                ('sentiment', models.CharField(choices=[('Positive', 'Positive'), ('Negative', 'Negative'), ('Neutral', 'Neutral')], default='Neutral', max_length=20)),
+                ('sentiment_version', models.PositiveSmallIntegerField(db_index=True, default=0)),
+                ('title_simhash', models.BigIntegerField(blank=True, null=True)),
+                ('cluster_id', models.BigIntegerField(blank=True, null=True)),
+                ('is_duplicate', models.BooleanField(default=False)),
+            ],
+            options={
+                'ordering': ['-published_at'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(fields=['-published_at', '-id'], name='article_published_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(fields=['category', '-published_at', '-id'], name='article_category_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(fields=['sentiment', '-published_at', '-id'], name='article_sentiment_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(fields=['category', 'sentiment', '-published_at', '-id'], name='article_cat_sentiment_idx'),
+        ),
+        migrations.CreateModel(
+            name='ArticleScope',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.CharField(choices=[('global', 'Global'), ('local', 'Local')], max_length=10)),
+                ('location', models.CharField(blank=True, default='', max_length=100)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='articlescope',
+            name='article',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='placements', to='app.article'),
+        ),
+        migrations.AddConstraint(
+            model_name='articlescope',
+            constraint=models.UniqueConstraint(fields=('scope', 'location', 'article'), name='article_scope_unique'),
+        ),
+        migrations.RunPython(copy_articles, restore_articles),
+        migrations.RunPython(move_search_index, restore_search_index),
+        migrations.DeleteModel(
+            name='LocalNews',
+        ),
+        migrations.DeleteModel(
+            name='NewsArticle',
+        ),
+        migrations.CreateModel(
+            name='LocalNews',
+            fields=[
+            ],
+            options={
+                'proxy': True,
+                'indexes': [],
+                'constraints': [],
+            },
+            bases=('app.article',),
+        ),
+        migrations.CreateModel(
+            name='NewsArticle',
+            fields=[
+            ],
+            options={
+                'proxy': True,
+                'indexes': [],
+                'constraints': [],
+            },
+            bases=('app.article',),
+        ),
+    ]
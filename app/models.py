@@ -1,5 +1,30 @@
 from django.db import models
-class NewsArticle(models.Model):
+class ArticleQuerySet(models.QuerySet):
+    def in_scope(self, scope, location=None):
+        """Articles listed in ``scope``, each once; local articles of every location unless ``location`` is given.
+
+        One location's feed is a join driven by the placement index, so it only reads that
+        partition. A whole scope is an ``EXISTS`` probe per article instead, so lists still
+        walk the article indexes in page order.
+        """
+        if scope == ArticleScope.GLOBAL:
+            placements = ArticleScope.objects.filter(article=models.OuterRef("pk"), scope=scope, location="")
+        elif location is None:
+            placements = ArticleScope.objects.filter(article=models.OuterRef("pk"), scope=scope)
+        else:
+            return self.filter(placements__scope=scope, placements__location=location)
+        return self.filter(models.Exists(placements))
+
+    def with_locations(self, scope):
+        """One row per placement of the articles in ``scope``, with its ``location`` annotated."""
+        return self.filter(placements__scope=scope).annotate(location=models.F("placements__location"))
+
+
+class Article(models.Model):
+    """A news article, stored, deduplicated, scored and indexed once whatever lists it appears in.
+
+    Where it is listed (the global feed, local feeds) is recorded by ``ArticleScope`` rows.
+    """
     title = models.CharField(max_length=500)
     source = models.CharField(max_length=100)
     url = models.URLField(unique=True)  # Ensures no duplicate articles
@@ -18,24 +43,126 @@ class NewsArticle(models.Model):
         ('Negative', 'Negative'),
         ('Neutral', 'Neutral'),
     ], default="Neutral")
+    sentiment_version = models.PositiveSmallIntegerField(default=0, db_index=True)  # 0 = never scored
+    title_simhash = models.BigIntegerField(null=True, blank=True)
+    cluster_id = models.BigIntegerField(null=True, blank=True)  # SimHash of the story's first article
+    is_duplicate = models.BooleanField(default=False)  # Near-duplicate of an earlier article in its cluster
 
-class LocalNews(models.Model):
-    """Stores local news articles separately from global news."""
-    title = models.CharField(max_length=255)
-    url = models.URLField(unique=True)
-    source = models.CharField(max_length=100)
-    published_at = models.DateTimeField()
-    category = models.CharField(max_length=50)  # Technology, Business, etc.
-    sentiment = models.CharField(max_length=20, blank=True, null=True)
-    location = models.CharField(max_length=100)  # City or region
+    objects = ArticleQuerySet.as_manager()
+
+    class Meta:
+        ordering = ["-published_at"]  # Order articles by latest news first
+        # Every list filters on category and/or sentiment and pages by (-published_at, -id);
+        # the purge job range-scans published_at.
+        indexes = [
+            models.Index(fields=["-published_at", "-id"], name="article_published_idx"),
+            models.Index(fields=["category", "-published_at", "-id"], name="article_category_idx"),
+            models.Index(fields=["sentiment", "-published_at", "-id"], name="article_sentiment_idx"),
+            models.Index(fields=["category", "sentiment", "-published_at", "-id"], name="article_cat_sentiment_idx"),
+        ]
 
     def __str__(self):
-        return f"{self.title} - {self.location}"
+        return f"{self.title} - {self.source}"
+
 
+class ArticleScope(models.Model):
+    """Lists an article in the global feed, or in the local feed of one location."""
+    GLOBAL, LOCAL = "global", "local"
 
-class Meta:
-    ordering = ["-published_at"]  # Order articles by latest news first
+    article = models.ForeignKey(Article, on_delete=models.CASCADE, related_name="placements")
+    scope = models.CharField(max_length=10, choices=[(GLOBAL, 'Global'), (LOCAL, 'Local')])
+    location = models.CharField(max_length=100, blank=True, default="")  # City or region, local scope only
+
+    class Meta:
+        # Also the index the feed filters probe (see ArticleQuerySet.in_scope)
+        constraints = [
+            models.UniqueConstraint(fields=["scope", "location", "article"], name="article_scope_unique"),
+        ]
 
     def __str__(self):
-        return f"{self.title} - {self.source}"
+        return f"{self.scope} {self.location}".strip()
+
+
+class ScopedManager(models.Manager.from_queryset(ArticleQuerySet)):
+    scope = None
+
+    def get_queryset(self):
+        return super().get_queryset().in_scope(self.scope)
+
+
+class GlobalNewsManager(ScopedManager):
+    scope = ArticleScope.GLOBAL
+
+
+class LocalNewsManager(ScopedManager):
+    scope = ArticleScope.LOCAL
+
 
+class NewsArticle(Article):
+    """Compatibility view of the articles listed in the global feed."""
+
+    objects = GlobalNewsManager()
+
+    class Meta:
+        proxy = True
+
+
+class LocalNews(Article):
+    """Compatibility view of the articles listed in at least one local feed."""
+
+    objects = LocalNewsManager()
+
+    class Meta:
+        proxy = True
+
+
+# Model whose caches (responses, facets) a write to each scope invalidates
+SCOPE_MODELS = {ArticleScope.GLOBAL: NewsArticle, ArticleScope.LOCAL: LocalNews}
+
+
+class SentimentRollup(models.Model):
+    """Article counts per time bucket, category and sentiment, for the trend charts.
+
+    Maintained by the sentiment scorer and kept when old articles are purged.
+    """
+    granularity = models.CharField(max_length=10, choices=[('hour', 'Hour'), ('day', 'Day')])
+    bucket = models.DateTimeField()  # Start of the hour/day, UTC
+    scope = models.CharField(max_length=10)  # "global" or "local"
+    location = models.CharField(max_length=100, blank=True, default="")  # Local scope only
+    category = models.CharField(max_length=50)
+    sentiment = models.CharField(max_length=20)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["granularity", "scope", "location", "category", "bucket", "sentiment"],
+                name="rollup_unique",
+            ),
+        ]
+        # Trends across all categories range-scan buckets of one scope/location
+        indexes = [
+            models.Index(fields=["granularity", "scope", "location", "bucket"], name="rollup_bucket_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.granularity} {self.bucket:%Y-%m-%d %H:%M} {self.scope} {self.category} {self.sentiment}: {self.count}"
+
+
+class ApiQuota(models.Model):
+    """Requests made to an upstream API on one UTC day, counted by the request scheduler.
+
+    Shared by every web and Celery process through the database; see ``app.services.scheduler``.
+    """
+    api = models.CharField(max_length=20)
+    day = models.DateField()
+    used = models.PositiveIntegerField(default=0)
+    exhausted = models.BooleanField(default=False)  # The API reported the day's quota used up
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["api", "day"], name="api_quota_unique"),
+        ]
+
+    def __str__(self):
+        return f"{self.api} {self.day}: {self.used}"
@@ -0,0 +1,68 @@
+from contextlib import contextmanager
+from django.conf import settings
+import threading
+
+# Upstream clients are built on first use, so importing the services (every web worker,
+# Celery worker and management command does) pays neither for the client libraries nor
+# for their construction. Tests and benchmarks inject replacements with override_clients().
+
+
+def _build_newsapi():
+    from app.services.newsapi_client import NewsApiHttpClient
+    return NewsApiHttpClient(api_key=getattr(settings, "NEWSAPI_KEY", None))
+
+
+def _build_geocoder():
+    from opencage.geocoder import OpenCageGeocode  # Pulls in aiohttp: only import it when geocoding
+    return OpenCageGeocode(getattr(settings, "GEOCODING_API_KEY", None))
+
+
+FACTORIES = {"newsapi": _build_newsapi, "geocoder": _build_geocoder}
+
+_instances = {}
+_lock = threading.Lock()
+
+
+def get_client(name):
+    """Returns the shared client ``name``, building it on first use."""
+    client = _instances.get(name)
+    if client is None:
+        with _lock:
+            client = _instances.get(name)
+            if client is None:
+                client = _instances[name] = FACTORIES[name]()
+    return client
+
+
+def get_newsapi():
+    """The NewsAPI client (``get_top_headlines`` / ``get_everything``)."""
+    return get_client("newsapi")
+
+
+def get_geocoder():
+    """The OpenCage client (``reverse_geocode``)."""
+    return get_client("geocoder")
+
+
+def set_client(name, client):
+    """Replaces the shared client ``name``; ``None`` makes the next use build a fresh one."""
+    if name not in FACTORIES:
+        raise KeyError(f"Unknown client {name!r}")
+    with _lock:
+        if client is None:
+            _instances.pop(name, None)
+        else:
+            _instances[name] = client
+
+
+@contextmanager
+def override_clients(**clients):
+    """Swaps clients for the duration of a block, e.g. ``override_clients(newsapi=stub)``."""
+    previous = {name: _instances.get(name) for name in clients}
+    for name, client in clients.items():
+        set_client(name, client)
+    try:
+        yield
+    finally:
+        for name, client in previous.items():
+            set_client(name, client)
@@ -0,0 +1,118 @@
+from collections import defaultdict
+from datetime import timedelta
+from hashlib import blake2b
+from django.conf import settings
+from app.models import Article
+from app.services.keyword_matcher import tokenize
+
+BITS = 64
+
+# Function words carry no signal about which story a headline is about
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or over that the this to was with".split()
+)
+
+
+def normalize_title(title, source=""):
+    """Lowercased title words minus stopwords, without the `` - Source`` suffix NewsAPI appends."""
+    if source and title.endswith(f" - {source}"):
+        title = title[:-len(source) - 3]
+    return [token for token in tokenize(title) if token not in STOPWORDS]
+
+
+def simhash(tokens):
+    """64-bit SimHash of the words of a title, as a signed integer (fits a BigIntegerField).
+
+    Titles that share most of their words get hashes a few bits apart. Headlines are too
+    short for word n-grams: one inserted word would change most of the features.
+    """
+    # Bit strings of the word hashes, so each bit position is counted with str.count()
+    bits = [format(int.from_bytes(blake2b(t.encode(), digest_size=8).digest(), "big"), "064b") for t in tokens]
+    unsigned = int("".join("1" if 2 * column.count("1") > len(bits) else "0" for column in zip(*bits)) or "0", 2)
+    return unsigned - (1 << BITS) if unsigned >= 1 << (BITS - 1) else unsigned
+
+
+def hamming(a, b):
+    return ((a ^ b) & ((1 << BITS) - 1)).bit_count()
+
+
+class SimHashIndex:
+    """Banded LSH index over SimHashes for near-duplicate lookups.
+
+    The 64 bits are split into ``max_distance + 1`` bands, so by the pigeonhole principle
+    two hashes at most ``max_distance`` bits apart agree on at least one whole band:
+    only hashes sharing a band bucket are compared.
+    """
+
+    def __init__(self, max_distance=6):
+        self.max_distance = max_distance
+        bands = max_distance + 1
+        width = -(-BITS // bands)
+        self.bands = [(start, (1 << min(width, BITS - start)) - 1) for start in range(0, BITS, width)]
+        self.buckets = defaultdict(list)
+
+    def _band_keys(self, value):
+        unsigned = value & ((1 << BITS) - 1)
+        return [(band, unsigned >> start & mask) for band, (start, mask) in enumerate(self.bands)]
+
+    def add(self, value, cluster_id):
+        for key in self._band_keys(value):
+            self.buckets[key].append((value, cluster_id))
+
+    def query(self, value):
+        """Returns the cluster ID of the closest indexed hash within ``max_distance``, or ``None``."""
+        best = None
+        for key in self._band_keys(value):
+            for candidate, cluster_id in self.buckets.get(key, ()):
+                distance = hamming(value, candidate)
+                if distance <= self.max_distance and (best is None or distance < best[0]):
+                    best = (distance, cluster_id)
+        return best and best[1]
+
+
+def assign_clusters(rows):
+    """Sets ``title_simhash`` and ``cluster_id`` on new article rows; returns the rows to insert
+    and the IDs of the clusters their near-duplicates joined.
+
+    Rows are compared with each other and with every article stored in the
+    ``NEAR_DUPLICATE_WINDOW_HOURS`` around the batch, whichever feeds list it. A
+    near-duplicate joins the cluster of the article it matches and is flagged
+    ``is_duplicate``; a cluster's ID is its first article's SimHash. With
+    ``NEAR_DUPLICATE_DROP`` near-duplicates are dropped instead.
+    """
+    if not rows:
+        return rows, set()
+    max_distance = getattr(settings, "NEAR_DUPLICATE_MAX_DISTANCE", 6)
+    window = timedelta(hours=getattr(settings, "NEAR_DUPLICATE_WINDOW_HOURS", 48))
+    drop = getattr(settings, "NEAR_DUPLICATE_DROP", False)
+
+    # Seed the index with the recent stored articles
+    index = SimHashIndex(max_distance)
+    published = [row["published_at"] for row in rows]
+    recent = Article.objects.filter(
+        published_at__gte=min(published) - window, published_at__lte=max(published) + window,
+        title_simhash__isnull=False,
+    )
+    for value, cluster_id in recent.values_list("title_simhash", "cluster_id").order_by():
+        index.add(value, cluster_id)
+
+    kept, joined = [], set()
+    for row in rows:
+        tokens = normalize_title(row["title"], row.get("source", ""))
+        if not tokens:
+            kept.append(row)  # Nothing to compare: the row stays unclustered
+            continue
+        value = simhash(tokens)
+        cluster_id = index.query(value)
+        if cluster_id is not None:
+            joined.add(cluster_id)
+            if drop:
+                continue
+        row["is_duplicate"] = cluster_id is not None
+        if cluster_id is None:
+            cluster_id = value
+            index.add(value, cluster_id)
+        row["title_simhash"] = value
+        row["cluster_id"] = cluster_id
+        kept.append(row)
+    return kept, joined
@@ -0,0 +1,36 @@
+from django.conf import settings
+from django.core.cache import cache
+import time
+
+ALL = ""  # Category of a read that did not filter by category
+
+
+def _window():
+    return getattr(settings, "DEMAND_WINDOW", 60 * 60)
+
+
+def _key(scope, category, bucket):
+    return f"demand_{scope}_{category}_{bucket}"
+
+
+def record_demand(scope, category=ALL):
+    """Counts one read of a feed (a freshness scope, see ``app.services.freshness``).
+
+    Reads are counted per fixed window of ``DEMAND_WINDOW`` seconds in the shared cache,
+    for the category read and for the scope as a whole.
+    """
+    window = _window()
+    bucket = int(time.time() // window)
+    for counted in {category, ALL}:
+        key = _key(scope, counted, bucket)
+        cache.add(key, 0, 2 * window)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.add(key, 1, 2 * window)  # Evicted between add() and incr()
+
+
+def recent_demand(scope, category=ALL):
+    """Reads of a feed in the current and the previous window."""
+    bucket = int(time.time() // _window())
+    return sum(cache.get_many([_key(scope, category, bucket), _key(scope, category, bucket - 1)]).values())
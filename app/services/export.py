@@ -0,0 +1,95 @@
+from datetime import datetime, time
+from django.utils.dateparse import parse_date, parse_datetime
+from django.utils.timezone import is_naive, make_aware
+from app.models import ArticleQuerySet, ArticleScope, NewsArticle, LocalNews
+import csv
+import json
+
+SCOPES = {"global": NewsArticle, "local": LocalNews}
+FORMATS = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+FIELDS = ("id", "title", "source", "url", "published_at", "category", "sentiment")
+LOCAL_FIELDS = FIELDS + ("location",)
+CHUNK_SIZE = 2000
+
+
+def parse_moment(value, name, end_of_day=False):
+    """Accepts an ISO date or datetime; bare dates cover the whole day."""
+    # parse_datetime() also accepts bare dates (as midnight), so try dates first
+    day = parse_date(value)
+    if day is not None:
+        moment = datetime.combine(day, time.max if end_of_day else time.min)
+    else:
+        moment = parse_datetime(value)
+        if moment is None:
+            raise ValueError(f"Invalid {name}: expected an ISO date or datetime")
+    return make_aware(moment) if is_naive(moment) else moment
+
+
+def export_queryset(scope="global", since=None, until=None, category=None, sentiment=None, location=None):
+    """Builds the filtered ``.values()`` queryset of an export; raises ``ValueError`` on bad filters.
+
+    ``since``/``until`` are inclusive ISO dates or datetimes; ``location`` only applies to
+    the local scope, whose export has one row per location listing an article. Rows come
+    out in primary-key order.
+    """
+    if scope not in SCOPES:
+        raise ValueError(f"Invalid scope: expected one of {', '.join(SCOPES)}")
+    model_class = SCOPES[scope]
+    if model_class is LocalNews:
+        articles = ArticleQuerySet(LocalNews).with_locations(ArticleScope.LOCAL)
+    else:
+        articles = model_class.objects.all()
+
+    if since:
+        articles = articles.filter(published_at__gte=parse_moment(since, "since"))
+    if until:
+        articles = articles.filter(published_at__lte=parse_moment(until, "until", end_of_day=True))
+    if category:
+        articles = articles.filter(category=category)
+    if sentiment:
+        articles = articles.filter(sentiment=sentiment)
+    if location:
+        if model_class is not LocalNews:
+            raise ValueError("The location filter only applies to the local scope")
+        articles = articles.filter(location=location)
+
+    return articles.order_by("id").values(*export_fields(model_class))
+
+
+def export_fields(model_class):
+    return LOCAL_FIELDS if model_class is LocalNews else FIELDS
+
+
+def _rows(queryset, chunk_size):
+    # iterator() streams from the database cursor instead of caching the whole result
+    for row in queryset.iterator(chunk_size=chunk_size):
+        row["published_at"] = row["published_at"].isoformat()
+        yield row
+
+
+def iter_ndjson(queryset, chunk_size=CHUNK_SIZE):
+    """Yields one JSON document per article, newline terminated."""
+    for row in _rows(queryset, chunk_size):
+        yield json.dumps(row, ensure_ascii=False) + "\n"
+
+
+class _Echo:
+    """File-like object whose ``write`` hands the CSV line back instead of buffering it."""
+
+    def write(self, value):
+        return value
+
+
+def iter_csv(queryset, chunk_size=CHUNK_SIZE):
+    """Yields a header line followed by one CSV line per article."""
+    writer = csv.writer(_Echo())
+    fields = export_fields(queryset.model)
+    yield writer.writerow(fields)
+    for row in _rows(queryset, chunk_size):
+        yield writer.writerow([row[field] for field in fields])
+
+
+def iter_export(queryset, export_format, chunk_size=CHUNK_SIZE):
+    if export_format not in FORMATS:
+        raise ValueError(f"Invalid format: expected one of {', '.join(FORMATS)}")
+    return (iter_ndjson if export_format == "ndjson" else iter_csv)(queryset, chunk_size)
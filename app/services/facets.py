@@ -0,0 +1,43 @@
+from django.core.cache import cache
+from django.db.models import Count
+from django.dispatch import receiver
+from app.signals import articles_changed
+
+FACET_TIMEOUT = 24 * 60 * 60  # Invalidated on every write, the timeout is only a safety net
+FACET_FIELDS = {"categories": "category", "sentiments": "sentiment"}
+
+
+def _key(model_class):
+    return f"facets_{model_class._meta.label_lower}"
+
+
+def count_facets(queryset):
+    """``{"categories": [{"value": "Business", "count": 12}, ...], "sentiments": [...]}`` of ``queryset``,
+    with one GROUP BY per field."""
+    return {
+        name: [
+            {"value": row[field], "count": row["count"]}
+            for row in queryset.exclude(**{f"{field}__isnull": True})
+            .values(field).annotate(count=Count("id")).order_by(field)
+        ]
+        for name, field in FACET_FIELDS.items()
+    }
+
+
+def get_facets(model_class):
+    """Returns the filter dropdown values of ``model_class`` with their article counts
+    (see ``count_facets``), cached until the next write to the table."""
+    facets = cache.get(_key(model_class))
+    if facets is None:
+        facets = count_facets(model_class.objects.all())
+        cache.set(_key(model_class), facets, FACET_TIMEOUT)
+    return facets
+
+
+def invalidate_facets(model_class):
+    cache.delete(_key(model_class))
+
+
+@receiver(articles_changed)
+def invalidate_facets_on_change(sender, **kwargs):
+    invalidate_facets(sender)
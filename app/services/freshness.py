@@ -0,0 +1,74 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.text import slugify
+import time
+
+FRESH, STALE, EXPIRED = "fresh", "stale", "expired"
+
+DEFAULT_TTLS = (60 * 60, 6 * 60 * 60)  # (soft, hard) seconds
+
+
+def get_ttls(category):
+    """Returns the ``(soft, hard)`` TTLs of a category from ``settings.NEWS_FRESHNESS``."""
+    freshness = getattr(settings, "NEWS_FRESHNESS", {})
+    return freshness.get(category, freshness.get("default", DEFAULT_TTLS))
+
+
+def local_scope(locality):
+    """Freshness scope of a locality's local news (``"global"`` is the global news scope)."""
+    return f"local_{slugify(locality or 'local news')}"
+
+
+def _key(scope, category):
+    return f"news_fetched_{scope}_{category}"
+
+
+def category_states(scope, categories):
+    """Returns ``{category: FRESH | STALE | EXPIRED}`` for one scope.
+
+    A category is fresh until its soft TTL, stale (served, but due for a background
+    refresh) until its hard TTL, and expired afterwards or if it was never fetched.
+    """
+    fetched_at = cache.get_many([_key(scope, category) for category in categories])
+    now = time.time()
+    states = {}
+    for category in categories:
+        timestamp = fetched_at.get(_key(scope, category))
+        soft, hard = get_ttls(category)
+        if timestamp is None or now - timestamp >= hard:
+            states[category] = EXPIRED
+        elif now - timestamp >= soft:
+            states[category] = STALE
+        else:
+            states[category] = FRESH
+    return states
+
+
+def categories_due(scope, categories):
+    """Returns the categories of a scope that are stale or expired, in order."""
+    states = category_states(scope, categories)
+    return [category for category in categories if states[category] != FRESH]
+
+
+def mark_failed(scope, categories):
+    """Records a failed fetch of ``categories``: for ``NEWS_FETCH_BACKOFF`` seconds readers
+    are served what is stored instead of waiting on (or queuing) another fetch."""
+    timeout = getattr(settings, "NEWS_FETCH_BACKOFF", 60)
+    cache.set_many({_backoff_key(scope, category): True for category in categories}, timeout)
+
+
+def backing_off(scope, categories):
+    """Returns the categories of a scope whose last synchronous fetch failed recently."""
+    failed = cache.get_many([_backoff_key(scope, category) for category in categories])
+    return [category for category in categories if _backoff_key(scope, category) in failed]
+
+
+def _backoff_key(scope, category):
+    return f"news_fetch_failed_{scope}_{category}"
+
+
+def mark_fetched(scope, categories):
+    """Records a successful fetch of ``categories``; the marker lives until the hard TTL."""
+    now = time.time()
+    for category in categories:
+        cache.set(_key(scope, category), now, get_ttls(category)[1])
@@ -0,0 +1,125 @@
+from django.conf import settings
+from django.core.cache import cache
+from app.services.clients import get_geocoder
+from app.services.metrics import GEOCODE_SECONDS, record_span
+import logging
+import math
+import time
+
+logger = logging.getLogger(__name__)
+
+GEOHASH_ALPHABET = "0123456789bcdefghjkmnpqrstuvwxyz"
+NO_LOCALITY = ""  # Cached marker for cells the geocoder could not name
+NO_CITY_QUERY = "local news"  # Query, and feed location, of coordinates the geocoder cannot name
+
+
+def parse_coordinates(lat, lon):
+    """Parses a ``lat``/``lon`` pair into floats, raising ``ValueError`` unless both are finite and on the globe."""
+    try:
+        lat, lon = float(lat), float(lon)
+    except TypeError as e:
+        raise ValueError("lat and lon are required") from e
+    if not (math.isfinite(lat) and math.isfinite(lon) and -90 <= lat <= 90 and -180 <= lon <= 180):
+        raise ValueError(f"Coordinate out of range: {lat}, {lon}")
+    return lat, lon
+
+
+def geohash_encode(lat, lon, precision=5):
+    """Encodes a coordinate as a geohash; precision 5 is a cell of roughly 5 x 5 km."""
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    bits = []
+    for i in range(precision * 5):
+        # Even bits split longitude, odd bits split latitude
+        value, bounds = (lon, lon_range) if i % 2 == 0 else (lat, lat_range)
+        middle = (bounds[0] + bounds[1]) / 2
+        if value >= middle:
+            bits.append(1)
+            bounds[0] = middle
+        else:
+            bits.append(0)
+            bounds[1] = middle
+    return "".join(
+        GEOHASH_ALPHABET[int("".join(map(str, bits[i:i + 5])), 2)] for i in range(0, len(bits), 5)
+    )
+
+
+def geohash_center(cell):
+    """Returns the ``(lat, lon)`` center of a geohash cell."""
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    even = True
+    for char in cell:
+        index = GEOHASH_ALPHABET.index(char)
+        for shift in range(4, -1, -1):
+            bounds = lon_range if even else lat_range
+            middle = (bounds[0] + bounds[1]) / 2
+            if index >> shift & 1:
+                bounds[0] = middle
+            else:
+                bounds[1] = middle
+            even = not even
+    return (lat_range[0] + lat_range[1]) / 2, (lon_range[0] + lon_range[1]) / 2
+
+
+def resolve_locality(lat, lon):
+    """Returns the locality name for a coordinate, sharing one geocode result per geohash cell.
+
+    The coordinate is bucketed into a cell of ``GEOCODE_GEOHASH_PRECISION`` characters and
+    the cell's center is geocoded once; the answer (or the lack of one) is cached for
+    ``GEOCODE_CACHE_TIMEOUT`` seconds, so every user in the same area shares it.
+    """
+    started = time.perf_counter()
+    cell = geohash_encode(float(lat), float(lon), getattr(settings, "GEOCODE_GEOHASH_PRECISION", 5))
+    cache_key = f"geocode_cell_{cell}"
+
+    locality = cache.get(cache_key)
+    cached = locality is not None
+    if not cached:
+        locality = reverse_geocode(*geohash_center(cell)) or NO_LOCALITY
+        # Failed lookups are retried sooner than successful ones
+        timeout = getattr(settings, "GEOCODE_CACHE_TIMEOUT", 30 * 24 * 60 * 60) if locality else 60 * 60
+        cache.set(cache_key, locality, timeout)
+
+    elapsed = time.perf_counter() - started
+    GEOCODE_SECONDS.observe(elapsed, cached=str(cached).lower())
+    record_span("geocode", elapsed)
+    return locality or None
+
+
+def local_location(lat, lon):
+    """The location whose local feed serves ``lat``/``lon``: the stored ``location`` of its articles."""
+    return resolve_locality(lat, lon) or NO_CITY_QUERY
+
+
+def reverse_geocode(lat, lon):
+    """Converts latitude and longitude to a city or region name using OpenCage API."""
+    try:
+        results = get_geocoder().reverse_geocode(lat, lon)
+
+        if results:
+            components = results[0]["components"]
+            city = components.get("city") or components.get("town") or components.get("village")
+            county = components.get("county")
+            state = components.get("state")
+            country = components.get("country")
+
+            if city:
+                location_name = f"{city}, {state}" if state else city
+                logger.info(f"📍 Identified Location: {location_name}, {country}")
+                return location_name
+            elif county:
+                location_name = f"{county}, {state}" if state else county
+                logger.info(f"📍 Using county as fallback: {location_name}, {country}")
+                return location_name
+            elif state:
+                logger.info(f"📍 Using state as fallback: {state}, {country}")
+                return state
+            else:
+                logger.warning("⚠️ No valid city, county, or state found.")
+                return None
+
+        logger.warning("⚠️ No geocoding results found.")
+        return None
+
+    except Exception as e:
+        logger.error(f"❌ Error in reverse geocoding: {str(e)}")
+        return None
@@ -0,0 +1,103 @@
+from datetime import datetime
+from django.db import transaction
+from django.utils.timezone import make_aware
+from app.models import Article, ArticleScope, SCOPE_MODELS
+from app.services.dedup import assign_clusters
+from app.services.metrics import DB_WRITE_ROWS, DB_WRITE_SECONDS
+from app.services.rollups import record_placements
+from app.signals import articles_changed
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_articles(articles, category, **extra):
+    """Turns the ``articles`` of one NewsAPI response into model field dicts.
+
+    Articles without a URL are skipped, as are (with a warning) articles with a missing or
+    malformed ``publishedAt``; ``extra`` fields are added to every row.
+    """
+    rows = []
+    for article in articles or []:
+        if not article.get("url"):
+            continue
+        try:
+            published_at = make_aware(datetime.strptime(article["publishedAt"], "%Y-%m-%dT%H:%M:%SZ"))
+        except (KeyError, TypeError, ValueError):
+            logger.warning(f"⚠️ Skipped {article['url']}: invalid publishedAt {article.get('publishedAt')!r}")
+            continue
+        rows.append({
+            "title": article.get("title") or "",
+            "source": (article.get("source") or {}).get("name") or "",
+            "url": article["url"],
+            "published_at": published_at,
+            "category": category.capitalize(),
+            **extra,
+        })
+    return rows
+
+
+def ingest_articles(rows, scope, location=""):
+    """Lists normalized rows in the feed ``scope``/``location`` and returns the IDs of the new articles.
+
+    Rows are deduplicated by URL in memory (first occurrence wins). URLs that are not
+    stored yet become articles, clustered with their near-duplicate headlines first (see
+    ``app.services.dedup``); articles already stored for another feed are only listed in
+    this one too, so each article is stored, scored and indexed once. So is the first
+    article of a cluster a near-duplicate joined (or was dropped for): the feed keeps the
+    story when lists collapse near-duplicates, whichever feed stored it first. Everything
+    is written with a few bulk queries inside a single transaction.
+    """
+    by_url = {}
+    for row in rows:
+        by_url.setdefault(row["url"], row)
+    if not by_url:
+        return []
+
+    with DB_WRITE_SECONDS.time(span="db_write", operation="ingest", model="Article"), transaction.atomic():
+        existing = dict(Article.objects.filter(url__in=list(by_url)).values_list("url", "id"))
+        new_rows, joined = assign_clusters([row for url, row in by_url.items() if url not in existing])
+        new_urls = [row["url"] for row in new_rows]
+        firsts = set(
+            Article.objects.filter(cluster_id__in=joined, is_duplicate=False).values_list("id", flat=True)
+        ) if joined else set()
+        listed = set(
+            ArticleScope.objects.filter(scope=scope, location=location, article_id__in={*existing.values(), *firsts})
+            .values_list("article_id", flat=True)
+        )
+
+        created_ids = []
+        if new_urls:
+            # ignore_conflicts covers rows inserted by a concurrent fetch since the SELECT above;
+            # those are listed here like any stored article, but not reported as created
+            new_articles = Article.objects.filter(url__in=new_urls).values_list("url", "id")
+            concurrent = dict(new_articles)
+            Article.objects.bulk_create([Article(**row) for row in new_rows], batch_size=500, ignore_conflicts=True)
+            created = dict(new_articles.all())  # .all(): a fresh query, not the cached rows
+            created_ids = [article_id for url, article_id in created.items() if url not in concurrent]
+            existing.update(created)
+
+        stored_ids = dict.fromkeys([*existing.values(), *firsts])
+        placed_ids = [article_id for article_id in stored_ids if article_id not in listed]
+        ArticleScope.objects.bulk_create(
+            [ArticleScope(article_id=article_id, scope=scope, location=location) for article_id in placed_ids],
+            batch_size=500, ignore_conflicts=True,
+        )
+        # Articles scored for another feed count in this feed's rollups right away
+        relisted = set(placed_ids) - set(created_ids)
+        if relisted:
+            scored = Article.objects.filter(id__in=relisted, sentiment_version__gt=0)
+            record_placements(scored.only("published_at", "category", "sentiment"), scope, location)
+
+    DB_WRITE_ROWS.inc(len(created_ids), operation="ingest", model="Article")
+    logger.info(
+        f"✅ Added {len(created_ids)} articles to the {scope} feed{f' of {location}' if location else ''}, "
+        f"listed {len(relisted)} stored ones, skipped {len(listed - firsts)} duplicates"
+        f" and {len(by_url) - len(existing)} near-duplicates"
+    )
+    if placed_ids:
+        if scope == ArticleScope.LOCAL:
+            articles_changed.send(sender=SCOPE_MODELS[scope], ids=placed_ids, locations=[location])
+        else:
+            articles_changed.send(sender=SCOPE_MODELS[scope], ids=placed_ids)
+    return created_ids
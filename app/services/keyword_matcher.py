@@ -0,0 +1,84 @@
+import re
+from collections import deque
+
+TOKEN_RE = re.compile(r"[a-z0-9]+(?:'[a-z0-9]+)*")
+
+LABEL_FLAGS = {"positive": 1, "negative": 2}
+
+
+def tokenize(text):
+    """Lowercases ``text`` and splits it into word tokens, dropping punctuation."""
+    return TOKEN_RE.findall(text.lower())
+
+
+def load_lexicon(path):
+    """Reads a lexicon file into a ``{term: flag}`` dict.
+
+    Each non-empty line is ``<label>: <term>``, where label is ``positive`` or ``negative``
+    and term is a word or phrase. Lines starting with ``#`` are comments.
+    """
+    terms = {}
+    with open(path, encoding="utf-8") as lexicon:
+        for line_number, line in enumerate(lexicon, start=1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            label, _, term = line.partition(":")
+            flag = LABEL_FLAGS.get(label.strip().lower())
+            if flag is None or not term.strip():
+                raise ValueError(f"{path}:{line_number}: expected '<positive|negative>: <term>'")
+            terms[term.strip()] = terms.get(term.strip(), 0) | flag
+    return terms
+
+
+class KeywordMatcher:
+    """Aho-Corasick automaton over word tokens.
+
+    Finds every single-word and multi-word term of the lexicon in one left-to-right pass
+    over a title's tokens, so matching cost does not grow with the size of the lexicon.
+    """
+
+    def __init__(self, terms):
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [0]
+        for term, flag in terms.items():
+            self._add(tokenize(term), flag)
+        self._link()
+
+    def _add(self, tokens, flag):
+        if not tokens:
+            return
+        state = 0
+        for token in tokens:
+            if token not in self._goto[state]:
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(0)
+                self._goto[state][token] = len(self._goto) - 1
+            state = self._goto[state][token]
+        self._out[state] |= flag
+
+    def _link(self):
+        """Computes failure links breadth-first and folds suffix matches into each state's output."""
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for token, child in self._goto[state].items():
+                fallback = self._fail[state]
+                while fallback and token not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(token, 0)
+                self._out[child] |= self._out[self._fail[child]]
+                queue.append(child)
+
+    def flags(self, text):
+        """Returns the OR of the flags of every term found in ``text``."""
+        goto, fail, out = self._goto, self._fail, self._out
+        state = flags = 0
+        for token in tokenize(text):
+            while state and token not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(token, 0)
+            flags |= out[state]
+        return flags
@@ -0,0 +1,104 @@
+from collections import defaultdict
+from django.conf import settings
+from django.core.cache import cache
+from django.dispatch import receiver
+from app.models import Article, ArticleScope, LocalNews
+from app.services.demand import recent_demand
+from app.services.facets import count_facets
+from app.services.freshness import local_scope
+from app.services.pagination import ORDERING, encode_cursor
+from app.signals import articles_changed
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+ALL = ""  # Feed key of an unset category or sentiment filter
+FEED_FIELDS = ("id", "title", "url", "published_at", "sentiment", "category")  # The list views' ARTICLE_FIELDS
+EPOCH_KEY = "local_feed_epoch"
+
+
+def partition(location):
+    """The local articles of one locality, read through the placement index."""
+    return Article.objects.in_scope(ArticleScope.LOCAL, location)
+
+
+def _feed_size():
+    return getattr(settings, "LOCAL_FEED_SIZE", 100)
+
+
+def _key(location):
+    epoch = cache.get(EPOCH_KEY)
+    if epoch is None:
+        cache.add(EPOCH_KEY, time.time_ns(), None)
+        epoch = cache.get(EPOCH_KEY)
+    return f"local_feed_{epoch}_{local_scope(location)}"
+
+
+def is_hot(location):
+    """Whether a locality was read at least ``LOCAL_FEED_HOT_READS`` times recently (see ``app.services.demand``)."""
+    return recent_demand(local_scope(location)) >= getattr(settings, "LOCAL_FEED_HOT_READS", 3)
+
+
+def build_feeds(location):
+    """Reads a locality's partition once and splits it into its top-N feeds and facet counts.
+
+    Feeds are keyed ``(category, sentiment)``, ``ALL`` standing for no filter, and hold the
+    newest ``LOCAL_FEED_SIZE`` rows plus one, so a full feed still knows it has a next page.
+    """
+    size = _feed_size()
+    articles = partition(location)
+    feeds = defaultdict(list)
+    for row in articles.values(*FEED_FIELDS).order_by(*ORDERING).iterator(chunk_size=2000):
+        for key in {(ALL, ALL), (row["category"], ALL), (ALL, row["sentiment"]), (row["category"], row["sentiment"])}:
+            if len(feeds[key]) <= size:
+                feeds[key].append(row)
+    return {"feeds": dict(feeds), "facets": count_facets(articles), "size": size}
+
+
+def refresh_feeds(location):
+    """Rebuilds and stores the feeds of ``location``; returns them."""
+    started = time.perf_counter()
+    entry = build_feeds(location)
+    cache.set(_key(location), entry, getattr(settings, "LOCAL_FEED_TIMEOUT", 6 * 60 * 60))
+    logger.info(f"✅ Rebuilt the local feeds of {location} in {time.perf_counter() - started:.3f}s")
+    return entry
+
+
+def get_feeds(location):
+    """The precomputed feeds of a hot locality (built on a miss), or ``None`` for a cold one."""
+    if not is_hot(location):
+        return None
+    entry = cache.get(_key(location))
+    return entry if entry is not None else refresh_feeds(location)
+
+
+def feed_page(entry, category, sentiment, page_size):
+    """The first page of a feed and its cursor (as ``paginate`` would return them),
+    or ``None`` when the feed is too short to tell."""
+    rows = entry["feeds"].get((category or ALL, sentiment or ALL), [])
+    if len(rows) > page_size:
+        page = rows[:page_size]
+        return page, encode_cursor(page[-1]["published_at"], page[-1]["id"])
+    if len(rows) <= entry["size"]:
+        return rows, None  # The whole partition matching the filters
+    return None
+
+
+@receiver(articles_changed)
+def refresh_feeds_on_change(sender, locations=None, **kwargs):
+    """Ingestion and scoring name the localities they wrote to: hot ones are rebuilt right
+    away, cold ones dropped. Writes to unknown localities (purges) start a new epoch."""
+    if sender is not LocalNews:
+        return
+    if locations is None:
+        try:
+            cache.incr(EPOCH_KEY)
+        except ValueError:
+            cache.add(EPOCH_KEY, time.time_ns(), None)
+        return
+    for location in locations:
+        if is_hot(location):
+            refresh_feeds(location)
+        else:
+            cache.delete(_key(location))
@@ -0,0 +1,162 @@
+from bisect import bisect_left
+from contextvars import ContextVar
+from functools import wraps
+import threading
+import time
+
+# Seconds; covers a cached view (~1 ms) up to a slow NewsAPI call with retries
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+REGISTRY = []
+
+# Spans of the request being served, collected for the Server-Timing header (None outside requests)
+request_spans = ContextVar("request_spans", default=None)
+
+
+class Metric:
+    """Base of the in-process metrics; series are keyed by their label values."""
+
+    type = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.lock = threading.Lock()
+        self.series = {}
+        REGISTRY.append(self)
+
+    def _labels(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _format_labels(self, values, extra=()):
+        pairs = list(zip(self.labelnames, values)) + list(extra)
+        if not pairs:
+            return ""
+        escaped = (value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in pairs)
+        return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+    def reset(self):
+        with self.lock:
+            self.series.clear()
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._labels(labels)
+        with self.lock:
+            self.series[key] = self.series.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self.series.get(self._labels(labels), 0)
+
+    def samples(self):
+        with self.lock:
+            return [f"{self.name}{self._format_labels(key)} {value}" for key, value in sorted(self.series.items())]
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        key = self._labels(labels)
+        with self.lock:
+            counts, total = self.series.get(key, ([0] * (len(self.buckets) + 1), 0.0))
+            counts[bisect_left(self.buckets, value)] += 1
+            self.series[key] = (counts, total + value)
+
+    def count(self, **labels):
+        counts, _ = self.series.get(self._labels(labels), ((), 0.0))
+        return sum(counts)
+
+    def time(self, span=None, **labels):
+        """Times a block or function into this histogram (and the request's Server-Timing spans)."""
+        return Timer(self, span or self.name, labels)
+
+    def samples(self):
+        lines = []
+        with self.lock:
+            for key, (counts, total) in sorted(self.series.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets + (float("inf"),), counts):
+                    cumulative += count
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(f"{self.name}_bucket{self._format_labels(key, [('le', le)])} {cumulative}")
+                lines.append(f"{self.name}_sum{self._format_labels(key)} {total}")
+                lines.append(f"{self.name}_count{self._format_labels(key)} {cumulative}")
+        return lines
+
+
+class Timer:
+    """Context manager and decorator returned by ``Histogram.time()``."""
+
+    def __init__(self, histogram, span, labels):
+        self.histogram = histogram
+        self.span = span
+        self.labels = labels
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.elapsed = time.perf_counter() - self.started
+        self.histogram.observe(self.elapsed, **self.labels)
+        record_span(self.span, self.elapsed)
+        return False
+
+    def __call__(self, func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with Timer(self.histogram, self.span, self.labels):
+                return func(*args, **kwargs)
+        return wrapper
+
+
+def record_span(name, seconds):
+    """Adds a span to the current request's Server-Timing header, if one is being collected."""
+    spans = request_spans.get()
+    if spans is not None:
+        spans.append((name, seconds))
+
+
+def render():
+    """All registered metrics in the Prometheus text exposition format (version 0.0.4)."""
+    lines = []
+    for metric in REGISTRY:
+        lines.append(f"# HELP {metric.name} {metric.documentation}")
+        lines.append(f"# TYPE {metric.name} {metric.type}")
+        lines.extend(metric.samples())
+    return "\n".join(lines) + "\n"
+
+
+# Hot-path metrics. Values live in the process that records them: web workers expose
+# them on /metrics, and refresh jobs also keep their stage timings (see app.automation).
+REFRESH_STAGE_SECONDS = Histogram("news_refresh_stage_seconds", "Time spent per refresh stage", ["stage"])
+NEWSAPI_REQUEST_SECONDS = Histogram(
+    "news_newsapi_request_seconds", "NewsAPI request latency per attempt", ["endpoint", "category", "outcome"]
+)
+NEWSAPI_SCHEDULED = Counter(
+    "news_newsapi_scheduled_total", "NewsAPI requests sent or deferred by the scheduler", ["decision"]
+)
+GEOCODE_SECONDS = Histogram("news_geocode_seconds", "Locality resolution latency", ["cached"])
+DB_WRITE_SECONDS = Histogram("news_db_write_seconds", "Article table write latency", ["operation", "model"])
+DB_WRITE_ROWS = Counter("news_db_write_rows_total", "Rows written to the article tables", ["operation", "model"])
+SENTIMENT_BATCH_SECONDS = Histogram("news_sentiment_batch_seconds", "Sentiment scoring time per chunk", ["model"])
+SENTIMENT_ARTICLES = Counter("news_sentiment_articles_total", "Articles scored", ["model"])
+SENTIMENT_CACHE_LOOKUPS = Counter(
+    "news_sentiment_cache_lookups_total", "Score cache lookups by result", ["result"]
+)
+VIEW_SECONDS = Histogram("news_view_seconds", "Request latency per view", ["view"])
+VIEW_QUERIES = Histogram(
+    "news_view_queries", "Database queries per request", ["view"], buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100)
+)
+SERIALIZE_SECONDS = Histogram("news_serialize_seconds", "Article serialization time per response", ["view"])
@@ -1,166 +1,229 @@
-from opencage.geocoder import OpenCageGeocode
-from newsapi import NewsApiClient
-from datetime import datetime
-from django.utils.timezone import make_aware
+from functools import partial
 from django.core.cache import cache
-from app.models import NewsArticle, LocalNews
-import os
-import time
+from app.models import ArticleScope
+from app.services.clients import get_newsapi
+from app.services.freshness import categories_due, local_scope, mark_failed, mark_fetched
+from app.services.geocoding import NO_CITY_QUERY, resolve_locality
+from app.services.ingestion import ingest_articles, normalize_articles
+from app.services.metrics import NEWSAPI_REQUEST_SECONDS, REFRESH_STAGE_SECONDS
+from app.services.newsapi_client import fetch_concurrently
+from app.services.scheduler import get_scheduler
+from app.services.singleflight import single_flight
 import logging
-from dotenv import load_dotenv
-
-# Load environment variables
-load_dotenv()
-API_KEY = os.getenv("NEWSAPI_KEY")
-GEOCODING_API_KEY = os.getenv("GEOCODING_API_KEY")  # OpenCage API Key
+import time
+import uuid
 
 logger = logging.getLogger(__name__)
-logging.basicConfig(level=logging.INFO)
-
-newsapi = NewsApiClient(api_key=API_KEY)
-geocoder = OpenCageGeocode(GEOCODING_API_KEY)  # OpenCage client
 
 CATEGORIES = ["technology", "business", "sports", "entertainment", "health", "science", "general"]
-CACHE_TIMEOUT = 6 * 60 * 60  # 6 hours
+GLOBAL_SCOPE = "global"
+BATCH_CLAIM_TIMEOUT = 60 * 60  # Longer than a queued ingest stage can lag behind its fetch
 
 
 def fetch_news():
-    """Fetches global news articles and stores them in the database with caching."""
-    cache_key = "latest_news_fetched"
-    if cache.get(cache_key):
+    """Fetches global news articles and stores them in the database with caching.
+
+    Returns the IDs of the articles created by this call so they can be scored incrementally.
+    """
+    batch = fetch_global_articles()
+    if batch is None:
+        return []
+    return store_global_articles(batch)
+
+
+def fetch_global_articles():
+    """Fetch stage of a global refresh.
+
+    Only categories past their soft TTL (see ``app.services.freshness``) are requested.
+    Returns a JSON-serializable batch with an ``id``, ``{category: [raw NewsAPI articles]}``
+    and the categories that were fetched successfully or not, or ``None`` when every
+    category is fresh.
+    """
+    categories = categories_due(GLOBAL_SCOPE, CATEGORIES)
+    if not categories:
         logger.info("✅ Using cached news, skipping API request")
-        return
+        return None
+
+    # Concurrent refreshes wait for and share one upstream fetch
+    return single_flight("fetch_global_articles", partial(_request_global_articles, categories))
 
-    logger.info("📡 Starting news fetch...")
 
-    for category in CATEGORIES:
-        logger.info(f"🔍 Fetching {category.capitalize()} news...")
+def _scheduled_request(batch, endpoint, category, func):
+    """Wraps a NewsAPI call so every attempt goes through the scheduler ``batch`` (see
+    ``app.services.scheduler``) and is recorded in ``NEWSAPI_REQUEST_SECONDS``."""
+    def call():
+        started, outcome = time.perf_counter(), "error"
         try:
-            top_headlines = newsapi.get_top_headlines(category=category, language="en", country="us")
-
-            if not top_headlines.get("articles"):
-                logger.warning(f"⚠️ No articles found for {category}!")
-                continue
-
-            for article in top_headlines["articles"]:
-                obj, created = NewsArticle.objects.get_or_create(
-                    url=article["url"],
-                    defaults={
-                        "title": article["title"],
-                        "source": article["source"]["name"],
-                        "published_at": make_aware(
-                            datetime.strptime(article["publishedAt"], "%Y-%m-%dT%H:%M:%SZ")
-                        ),
-                        "category": category.capitalize(),
-                    },
-                )
-                if created:
-                    logger.info(f"✅ Added: {article['title']}")
-                else:
-                    logger.info(f"🔹 Skipped duplicate: {article['title']}")
-
-        except Exception as e:
-            logger.error(f"❌ Error fetching {category} news: {str(e)}")
-            time.sleep(5)
-
-    cache.set(cache_key, datetime.now(), CACHE_TIMEOUT)
-    logger.info(f"✅ News fetch completed & cached for {CACHE_TIMEOUT // 3600} hours")
-
-
-def reverse_geocode(lat, lon):
-    """Converts latitude and longitude to a city or region name using OpenCage API."""
-    try:
-        results = geocoder.reverse_geocode(lat, lon)
-
-        if results:
-            components = results[0]["components"]
-            city = components.get("city") or components.get("town") or components.get("village")
-            county = components.get("county")
-            state = components.get("state")
-            country = components.get("country")
-
-            if city:
-                location_name = f"{city}, {state}" if state else city
-                logger.info(f"📍 Identified Location: {location_name}, {country}")
-                return location_name
-            elif county:
-                location_name = f"{county}, {state}" if state else county
-                logger.info(f"📍 Using county as fallback: {location_name}, {country}")
-                return location_name
-            elif state:
-                logger.info(f"📍 Using state as fallback: {state}, {country}")
-                return state
-            else:
-                logger.warning("⚠️ No valid city, county, or state found.")
-                return None
-
-        logger.warning("⚠️ No geocoding results found.")
-        return None
+            result = func()
+            outcome = "ok"
+            return result
+        finally:
+            NEWSAPI_REQUEST_SECONDS.observe(
+                time.perf_counter() - started, endpoint=endpoint, category=category, outcome=outcome
+            )
+    return partial(batch.call, call)
+
+
+@REFRESH_STAGE_SECONDS.time(span="fetch", stage="fetch_global")
+def _request_global_articles(categories):
+    newsapi = get_newsapi()
+
+    # Only the categories the quota admits are requested, most read first; all of them
+    # concurrently, failures retried with backoff and logged
+    with get_scheduler().batch(GLOBAL_SCOPE, categories) as batch:
+        logger.info(f"📡 Starting news fetch for {', '.join(batch.admitted) or 'no categories'}...")
+        responses = fetch_concurrently({
+            category: _scheduled_request(
+                batch, "top-headlines", category,
+                partial(newsapi.get_top_headlines, category=category, language="en", country="us"),
+            )
+            for category in batch.admitted
+        })
+
+    articles = {}
+    for category, top_headlines in responses.items():
+        if top_headlines is None:
+            continue
+
+        if not top_headlines.get("articles"):
+            logger.warning(f"⚠️ No articles found for {category}!")
+            continue
+
+        articles[category] = top_headlines["articles"]
+
+    return {
+        "id": uuid.uuid4().hex,
+        "articles": articles,
+        "fetched": [category for category, response in responses.items() if response is not None],
+        # Failed, or deferred by the request scheduler
+        "failed": [category for category in categories if responses.get(category) is None],
+    }
+
+
+def _claim(batch):
+    """Whether this caller stores ``batch``.
+
+    Every refresh coalesced into one flight receives the same batch; only the first to
+    claim it ingests it, so its articles are reported as created (and scored) once.
+    """
+    if cache.add(f"ingested_batch_{batch['id']}", True, BATCH_CLAIM_TIMEOUT):
+        return True
+    logger.info("✅ Fetched articles already stored by a concurrent refresh")
+    return False
+
+
+@REFRESH_STAGE_SECONDS.time(span="ingest", stage="ingest_global")
+def store_global_articles(batch):
+    """Ingest stage of a global refresh: bulk inserts the fetched articles and returns the created IDs
+    (none when a concurrent refresh already stored this batch)."""
+    if not _claim(batch):
+        return []
+    rows = []
+    for category, category_articles in batch["articles"].items():
+        rows.extend(normalize_articles(category_articles, category))
 
-    except Exception as e:
-        logger.error(f"❌ Error in reverse geocoding: {str(e)}")
-        return None
+    # One bulk insert for the whole refresh
+    created_ids = ingest_articles(rows, ArticleScope.GLOBAL)
+
+    # Failed categories stay due and are retried by a refresh once their back-off ends
+    mark_fetched(GLOBAL_SCOPE, batch["fetched"])
+    mark_failed(GLOBAL_SCOPE, batch["failed"])
+    logger.info(f"✅ News fetch completed for {len(batch['fetched'])} categories")
+    return created_ids
 
 
 def fetch_local_news(lat, lon):
-    """Fetches local news based on user's latitude & longitude."""
-    
-    # Round lat/lon to prevent floating-point mismatches in cache keys
-    lat, lon = round(float(lat), 4), round(float(lon), 4)
-
-    cache_key = f"local_news_fetched_{lat}_{lon}"
-    if cache.get(cache_key):
-        logger.info(f"✅ Using cached local news for {lat}, {lon}, skipping API request")
-        return
-
-    city_name = reverse_geocode(lat, lon)
-    
+    """Fetches local news based on user's latitude & longitude.
+
+    Returns the IDs of the local articles created by this call.
+    """
+    batch = fetch_local_articles(lat, lon)
+    if batch is None:
+        return []
+    return store_local_articles(batch)
+
+
+def fetch_local_articles(lat, lon):
+    """Fetch stage of a local refresh.
+
+    Returns a JSON-serializable batch with the resolved location, its stale or expired
+    categories' ``{category: [raw NewsAPI articles]}`` and the categories fetched
+    successfully or not, or ``None`` when this locality is fresh.
+    """
+    # Nearby users share one geocode result and one set of fetched articles per locality
+    city_name = resolve_locality(lat, lon)
+    scope = local_scope(city_name)
+
+    categories = categories_due(scope, CATEGORIES)
+    if not categories:
+        logger.info(f"✅ Using cached local news for {city_name or 'local news'}, skipping API request")
+        return None
+
+    # Concurrent refreshes for the same locality wait for and share one upstream fetch
+    return single_flight(f"fetch_{scope}", partial(_request_local_articles, city_name, scope, categories))
+
+
+@REFRESH_STAGE_SECONDS.time(span="fetch", stage="fetch_local")
+def _request_local_articles(city_name, scope, categories):
     if not city_name:
-        logger.warning("⚠️ No city found, using 'local news' query.")
-        query = "local news"
+        logger.warning(f"⚠️ No city found, using '{NO_CITY_QUERY}' query.")
+        query = NO_CITY_QUERY
     else:
         query = city_name
 
     logger.info(f"📡 Fetching local news for location: {query}...")
-
-    try:
-        local_articles = []
-        for category in CATEGORIES:
-            logger.info(f"🔍 Fetching {category.capitalize()} local news...")
-            
-            # Use location + category in the query for better results
-            top_headlines = newsapi.get_everything(q=f"{query} {category}", language="en")
-
-            if not top_headlines.get("articles"):
-                logger.warning(f"⚠️ No articles found for {category} in {query}!")
-                continue
-
-            for article in top_headlines["articles"]:
-                obj, created = LocalNews.objects.get_or_create(
-                    url=article["url"],
-                    defaults={
-                        "title": article["title"],
-                        "source": article["source"]["name"],
-                        "published_at": make_aware(
-                            datetime.strptime(article["publishedAt"], "%Y-%m-%dT%H:%M:%SZ")
-                        ),
-                        "category": category.capitalize(),
-                        "location": city_name,
-                    },
-                )
-                if created:
-                    local_articles.append(obj)
-                    logger.info(f"✅ Added: {article['title']} ({category})")
-                else:
-                    logger.info(f"🔹 Skipped duplicate: {article['title']}")
-
-        if local_articles:
-            logger.info(f"✅ Successfully added {len(local_articles)} local articles for {query}")
-
-    except Exception as e:
-        logger.error(f"❌ Error fetching local news: {str(e)}")
+    newsapi = get_newsapi()
+
+    # Use location + category in the query for better results; categories are fetched concurrently
+    with get_scheduler().batch(scope, categories) as batch:
+        responses = fetch_concurrently({
+            category: _scheduled_request(
+                batch, "everything", category,
+                partial(newsapi.get_everything, q=f"{query} {category}", language="en"),
+            )
+            for category in batch.admitted
+        })
+
+    articles = {}
+    for category, top_headlines in responses.items():
+        if top_headlines is None:
+            continue
+
+        if not top_headlines.get("articles"):
+            logger.warning(f"⚠️ No articles found for {category} in {query}!")
+            continue
+
+        articles[category] = top_headlines["articles"]
+
+    return {
+        "id": uuid.uuid4().hex,
+        "scope": scope,
+        "location": city_name or query,
+        "articles": articles,
+        "fetched": [category for category, response in responses.items() if response is not None],
+        # Failed, or deferred by the request scheduler
+        "failed": [category for category in categories if responses.get(category) is None],
+    }
+
+
+@REFRESH_STAGE_SECONDS.time(span="ingest", stage="ingest_local")
+def store_local_articles(batch):
+    """Ingest stage of a local refresh: bulk inserts a fetched batch and returns the created IDs
+    (none when a concurrent refresh already stored this batch)."""
+    if not _claim(batch):
         return []
-
-    # ✅ Set cache AFTER successful fetch
-    cache.set(cache_key, True, CACHE_TIMEOUT)
-    logger.info(f"✅ Local news fetch completed & cached for {CACHE_TIMEOUT // 3600} hours")
+    location = batch["location"]
+    rows = []
+    for category, category_articles in batch["articles"].items():
+        rows.extend(normalize_articles(category_articles, category))
+
+    # One bulk insert for all categories
+    created_ids = ingest_articles(rows, ArticleScope.LOCAL, location)
+    if created_ids:
+        logger.info(f"✅ Successfully added {len(created_ids)} local articles for {location}")
+
+    # ✅ Mark only the categories that were fetched successfully; failed ones stay due
+    mark_fetched(batch["scope"], batch["fetched"])
+    mark_failed(batch["scope"], batch["failed"])
+    logger.info(f"✅ Local news fetch completed for {len(batch['fetched'])} categories in {location}")
+    return created_ids
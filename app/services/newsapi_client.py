@@ -0,0 +1,144 @@
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+import logging
+import random
+import time
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+class NewsApiError(Exception):
+    """Raised when NewsAPI answers with an error status or an ``"status": "error"`` body."""
+
+    def __init__(self, message, status=None, code=None, retry_after=None):
+        super().__init__(message)
+        self.status = status
+        self.code = code
+        self.retry_after = retry_after
+
+    @property
+    def retryable(self):
+        return self.status in RETRYABLE_STATUS
+
+
+class RequestDeferred(NewsApiError):
+    """Raised by the request scheduler instead of sending a request the quota or rate limit
+    cannot afford now; the caller retries on a later refresh."""
+
+
+class NewsApiHttpClient:
+    """Minimal NewsAPI v2 client sharing one pooled ``requests.Session`` across threads.
+
+    Mirrors the ``get_top_headlines`` / ``get_everything`` calls of ``newsapi-python`` but
+    adds a configurable base URL (for stub servers) and per-request timeouts.
+    """
+
+    def __init__(self, api_key, base_url=None, timeout=None, session=None):
+        self.api_key = api_key
+        self.base_url = (base_url or getattr(settings, "NEWSAPI_BASE_URL", "https://newsapi.org/v2")).rstrip("/")
+        self.timeout = timeout or getattr(settings, "NEWSAPI_TIMEOUT", 10)
+        self.session = session or build_session(getattr(settings, "NEWSAPI_MAX_WORKERS", 4))
+
+    def get_top_headlines(self, **params):
+        return self._get("top-headlines", params)
+
+    def get_everything(self, **params):
+        return self._get("everything", params)
+
+    def _get(self, endpoint, params):
+        response = self.session.get(
+            f"{self.base_url}/{endpoint}",
+            params=params,
+            headers={"X-Api-Key": self.api_key or ""},
+            timeout=self.timeout,
+        )
+        try:
+            payload = response.json()
+        except ValueError:
+            payload = {}
+
+        if response.status_code != 200 or payload.get("status") == "error":
+            raise NewsApiError(
+                payload.get("message") or f"HTTP {response.status_code}",
+                status=response.status_code,
+                code=payload.get("code"),
+                retry_after=_parse_retry_after(response.headers.get("Retry-After")),
+            )
+        return payload
+
+
+def build_session(pool_size):
+    """Returns a session whose connection pool can serve ``pool_size`` concurrent requests."""
+    # requests is imported when the first client is built, not by every process importing the fetcher
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def _parse_retry_after(value):
+    try:
+        return max(float(value), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+def call_with_retry(func, *args, attempts=None, backoff=None, max_backoff=30, **kwargs):
+    """Calls ``func`` and retries timeouts, connection errors and 429/5xx answers.
+
+    Waits use exponential backoff with full jitter (``NEWSAPI_RETRY_BACKOFF`` is the base
+    delay in seconds), or the server's ``Retry-After`` when it sends one. A ``Retry-After``
+    longer than ``max_backoff`` is not waited for in the calling thread: the error is raised
+    and the scheduler defers further requests until then.
+    """
+    import requests
+
+    attempts = attempts or getattr(settings, "NEWSAPI_RETRIES", 3)
+    backoff = getattr(settings, "NEWSAPI_RETRY_BACKOFF", 0.5) if backoff is None else backoff
+
+    for attempt in range(attempts):
+        try:
+            return func(*args, **kwargs)
+        except NewsApiError as e:
+            if not e.retryable or attempt == attempts - 1:
+                raise
+            delay = e.retry_after
+            if delay is not None and delay > max_backoff:
+                raise
+        except (requests.ConnectionError, requests.Timeout):
+            if attempt == attempts - 1:
+                raise
+            delay = None
+
+        if delay is None:
+            delay = random.uniform(0, min(max_backoff, backoff * 2 ** attempt))
+        logger.warning(f"🔁 Retrying NewsAPI call in {delay:.2f}s (attempt {attempt + 2}/{attempts})")
+        time.sleep(delay)
+
+
+def fetch_concurrently(calls, max_workers=None):
+    """Runs ``{key: zero-argument callable}`` on a bounded thread pool with retries.
+
+    Returns ``{key: result}`` in the order of ``calls``; a call that still fails after its
+    retries, or that the scheduler deferred, is logged and maps to ``None``.
+    """
+    max_workers = max_workers or getattr(settings, "NEWSAPI_MAX_WORKERS", 4)
+    results = {}
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="newsapi") as pool:
+        futures = {key: pool.submit(call_with_retry, call) for key, call in calls.items()}
+        for key, future in futures.items():
+            try:
+                results[key] = future.result()
+            except RequestDeferred as e:
+                logger.info(f"⏸️ Deferred {key}: {str(e)}")
+                results[key] = None
+            except Exception as e:
+                logger.error(f"❌ Error fetching {key}: {str(e)}")
+                results[key] = None
+    return results
@@ -0,0 +1,68 @@
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import datetime
+from django.conf import settings
+from django.db.models import Q
+import json
+
+ORDERING = ("-published_at", "-id")
+MAX_ID = 2 ** 63 - 1  # Largest primary key a BigAutoField can hold
+
+
+class InvalidCursor(ValueError):
+    """Raised when a ``cursor`` query parameter cannot be decoded."""
+
+
+def encode_cursor(published_at, pk):
+    """Packs the sort key of the last row on a page into an opaque URL-safe token."""
+    raw = json.dumps([published_at.isoformat(), pk], separators=(",", ":")).encode()
+    return urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    """Returns the ``(published_at, id)`` sort key packed by ``encode_cursor``."""
+    try:
+        raw = urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        published_at, pk = json.loads(raw)
+        published_at = datetime.fromisoformat(published_at)
+    except (ValueError, TypeError, OverflowError) as e:
+        raise InvalidCursor("Invalid cursor") from e
+    # Only IDs encode_cursor could have written: no floats, booleans or out-of-range numbers
+    if type(pk) is not int or not 0 < pk <= MAX_ID:
+        raise InvalidCursor("Invalid cursor")
+    return published_at, pk
+
+
+def get_page_size(request):
+    """Reads ``page_size`` from the query string, defaulting to and capped by the settings."""
+    default = getattr(settings, "NEWS_PAGE_SIZE", 30)
+    maximum = getattr(settings, "NEWS_MAX_PAGE_SIZE", 100)
+    try:
+        page_size = int(request.GET.get("page_size", default))
+    except ValueError:
+        page_size = default
+    return max(1, min(page_size, maximum))
+
+
+def paginate(queryset, cursor=None, page_size=30):
+    """Returns one keyset page of ``queryset`` ordered by ``(-published_at, -id)`` plus the next cursor.
+
+    ``queryset`` should already be narrowed with ``.values()`` / ``.only()`` and must expose
+    ``id`` and ``published_at``. Each page is an index range scan starting after the cursor,
+    so page cost does not depend on how deep the client has paged. ``next`` is ``None`` on
+    the last page.
+    """
+    queryset = queryset.order_by(*ORDERING)
+    if cursor:
+        published_at, pk = decode_cursor(cursor)
+        queryset = queryset.filter(Q(published_at__lt=published_at) | Q(published_at=published_at, id__lt=pk))
+
+    rows = list(queryset[:page_size + 1])
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        last = rows[-1]
+        if isinstance(last, dict):
+            next_cursor = encode_cursor(last["published_at"], last["id"])
+        else:
+            next_cursor = encode_cursor(last.published_at, last.id)
+    return rows, next_cursor
@@ -0,0 +1,88 @@
+from datetime import timedelta
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils.timezone import now
+from app.models import Article, ArticleScope, SCOPE_MODELS
+from app.services.metrics import DB_WRITE_ROWS, DB_WRITE_SECONDS
+from app.signals import articles_changed
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RETENTION_DAYS = {ArticleScope.GLOBAL: 7, ArticleScope.LOCAL: 7}
+
+
+def retention_days(scope):
+    """Returns the retention window of a feed scope from ``settings.NEWS_RETENTION_DAYS``."""
+    retention = getattr(settings, "NEWS_RETENTION_DAYS", DEFAULT_RETENTION_DAYS)
+    return retention.get(scope, DEFAULT_RETENTION_DAYS[scope])
+
+
+def _delete_in_batches(queryset, model_class, batch_size):
+    """Deletes the rows of ``queryset`` by primary key, ``batch_size`` per transaction.
+
+    Placements have no relations of their own, so ``.delete()`` fast-deletes them without
+    loading them. Articles would go through the deletion collector, which loads every
+    article to cascade to its placements; instead a batch's placements are deleted first
+    and the articles with a plain ``DELETE ... WHERE id IN (...)``.
+    """
+    ids_query = queryset.order_by().values_list("id", flat=True)
+    deleted = 0
+    while ids := list(ids_query[:batch_size]):
+        with DB_WRITE_SECONDS.time(operation="purge", model=model_class.__name__), transaction.atomic():
+            if model_class is Article:
+                ArticleScope.objects.filter(article_id__in=ids).delete()
+                with connection.cursor() as cursor:
+                    cursor.execute(
+                        f"DELETE FROM {Article._meta.db_table} WHERE id IN ({', '.join(['%s'] * len(ids))})", ids
+                    )
+                    count = cursor.rowcount
+            else:
+                count, _ = model_class.objects.filter(pk__in=ids).delete()
+        deleted += count
+        DB_WRITE_ROWS.inc(count, operation="purge", model=model_class.__name__)
+    return deleted
+
+
+def purge_scope(scope, days, batch_size=1000):
+    """Unlists the articles of ``scope`` published more than ``days`` ago, in primary-key batches.
+
+    Each batch selects up to ``batch_size`` IDs and deletes them in its own short
+    transaction, so SQLite writers are only ever blocked for one batch. Articles left
+    in no feed are then deleted the same way; an article still listed by a feed with a
+    longer window is kept. Returns ``{"scope", "removed", "deleted", "seconds", "rows_per_second"}``
+    (placements removed, articles deleted).
+    """
+    cutoff = now() - timedelta(days=days)
+    started = time.monotonic()
+
+    expired = ArticleScope.objects.filter(scope=scope, article__published_at__lt=cutoff)
+    removed = _delete_in_batches(expired, ArticleScope, batch_size)
+    orphans = Article.objects.filter(published_at__lt=cutoff, placements__isnull=True)
+    deleted = _delete_in_batches(orphans, Article, batch_size)
+
+    seconds = time.monotonic() - started
+    if removed:
+        articles_changed.send(sender=SCOPE_MODELS[scope])
+    return {
+        "scope": scope,
+        "removed": removed,
+        "deleted": deleted,
+        "seconds": seconds,
+        "rows_per_second": (removed + deleted) / seconds if seconds else 0.0,
+    }
+
+
+def purge_old_articles(days=None, batch_size=None):
+    """Applies the retention window of every feed scope; ``days`` overrides the settings."""
+    batch_size = batch_size or getattr(settings, "PURGE_BATCH_SIZE", 1000)
+    results = []
+    for scope in SCOPE_MODELS:
+        result = purge_scope(scope, days if days is not None else retention_days(scope), batch_size)
+        logger.info(
+            f"🗑️ Unlisted {result['removed']} {scope} articles and deleted {result['deleted']} "
+            f"in {result['seconds']:.2f}s ({result['rows_per_second']:.0f} rows/s)"
+        )
+        results.append(result)
+    return results
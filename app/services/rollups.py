@@ -0,0 +1,159 @@
+from collections import Counter, defaultdict
+from datetime import timedelta, timezone
+from django.db import transaction
+from django.db.models import Count, F, Min, Sum
+from django.db.models.functions import TruncDay, TruncHour
+from django.utils.timezone import now
+from app.models import ArticleScope, SentimentRollup
+from app.services.metrics import DB_WRITE_ROWS, DB_WRITE_SECONDS
+import logging
+
+logger = logging.getLogger(__name__)
+
+GRANULARITIES = {"hour": TruncHour, "day": TruncDay}
+SCOPES = (ArticleScope.GLOBAL, ArticleScope.LOCAL)
+
+
+def bucket_start(moment, granularity):
+    """Returns the UTC start of the hour or day that ``moment`` falls in."""
+    moment = moment.astimezone(timezone.utc).replace(minute=0, second=0, microsecond=0)
+    return moment.replace(hour=0) if granularity == "day" else moment
+
+
+def _keys(article, placement, sentiment):
+    scope, location = placement
+    for granularity in GRANULARITIES:
+        yield (granularity, bucket_start(article.published_at, granularity), scope, location, article.category, sentiment)
+
+
+def placements_of(article_ids):
+    """Returns ``{article_id: [(scope, location), ...]}``: the feeds each article is listed in."""
+    placements = defaultdict(list)
+    rows = ArticleScope.objects.filter(article_id__in=article_ids).values_list("article_id", "scope", "location")
+    for article_id, scope, location in rows.order_by():
+        placements[article_id].append((scope, location))
+    return placements
+
+
+def record_sentiment_changes(changes, placements=None):
+    """Updates the rollups for articles whose sentiment label was just (re)computed.
+
+    ``changes`` holds ``(article, previous_sentiment)`` pairs; ``previous_sentiment`` is
+    ``None`` when the article had never been scored, otherwise its old label is moved
+    to the new one in every feed listing the article. Articles need ``published_at`` and
+    ``category``; ``placements`` (see ``placements_of``) is looked up when not given.
+    """
+    changes = [(article, previous) for article, previous in changes if previous != article.sentiment]
+    if placements is None:
+        placements = placements_of([article.pk for article, _ in changes])
+    deltas = Counter()
+    for article, previous in changes:
+        for placement in placements.get(article.pk, ()):
+            if previous is not None:
+                deltas.subtract(_keys(article, placement, previous))
+            if article.sentiment is not None:
+                deltas.update(_keys(article, placement, article.sentiment))
+    apply_deltas(deltas)
+
+
+def record_placements(articles, scope, location=""):
+    """Counts already scored ``articles`` that were just listed in another feed."""
+    deltas = Counter()
+    for article in articles:
+        deltas.update(_keys(article, (scope, location), article.sentiment))
+    apply_deltas(deltas)
+
+
+def apply_deltas(deltas):
+    """Adds ``{(granularity, bucket, scope, location, category, sentiment): delta}`` to the counts.
+
+    Missing rows are created first (``ignore_conflicts`` lets concurrent scorers race
+    safely), then every count is bumped in place with an ``F()`` update.
+    """
+    deltas = {key: delta for key, delta in deltas.items() if delta}
+    if not deltas:
+        return
+
+    fields = ("granularity", "bucket", "scope", "location", "category", "sentiment")
+    with DB_WRITE_SECONDS.time(span="db_write", operation="rollup", model="SentimentRollup"), transaction.atomic():
+        SentimentRollup.objects.bulk_create(
+            [SentimentRollup(**dict(zip(fields, key))) for key in deltas], batch_size=500, ignore_conflicts=True
+        )
+        for key, delta in deltas.items():
+            SentimentRollup.objects.filter(**dict(zip(fields, key))).update(count=F("count") + delta)
+    DB_WRITE_ROWS.inc(len(deltas), operation="rollup", model="SentimentRollup")
+
+
+def rebuild_rollups(since=None):
+    """Recomputes the rollups from the stored articles and returns how many rows were written.
+
+    Every feed placement of an article counts once. Only buckets from ``since`` on are
+    replaced (default: the day of each scope's oldest article), so history whose articles
+    were already purged is kept.
+    """
+    written = 0
+    for scope in SCOPES:
+        placements = ArticleScope.objects.filter(scope=scope)
+        start = since or placements.aggregate(oldest=Min("article__published_at"))["oldest"]
+        if start is None:
+            continue
+        start = bucket_start(start, "day")
+        scored = placements.filter(
+            article__published_at__gte=start, article__sentiment_version__gt=0, article__sentiment__isnull=False
+        )
+
+        with transaction.atomic():
+            SentimentRollup.objects.filter(scope=scope, bucket__gte=start).delete()
+            for granularity, trunc in GRANULARITIES.items():
+                rows = (
+                    scored.annotate(
+                        bucket=trunc("article__published_at", tzinfo=timezone.utc),
+                        category=F("article__category"), sentiment=F("article__sentiment"),
+                    )
+                    .values("bucket", "location", "category", "sentiment").annotate(count=Count("id")).order_by()
+                )
+                created = SentimentRollup.objects.bulk_create(
+                    [SentimentRollup(granularity=granularity, scope=scope, **row) for row in rows], batch_size=1000
+                )
+                written += len(created)
+
+        logger.info(f"✅ Rebuilt {scope} sentiment rollups from {start:%Y-%m-%d}")
+    return written
+
+
+def get_trends(granularity="day", scope="global", since=None, until=None, category=None, location=None):
+    """Returns ``[{"bucket", "category", "total", "counts": {sentiment: n}}]`` in bucket order.
+
+    Reads the rollup table only. Local trends cover every location unless ``location``
+    is given; ``since`` defaults to 7 days (hourly: 48 hours) before ``until`` or now.
+    """
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"Invalid granularity: expected one of {', '.join(GRANULARITIES)}")
+    if scope not in SCOPES:
+        raise ValueError(f"Invalid scope: expected one of {', '.join(SCOPES)}")
+    if location and scope != "local":
+        raise ValueError("The location filter only applies to the local scope")
+
+    rollups = SentimentRollup.objects.filter(granularity=granularity, scope=scope)
+    if until:
+        rollups = rollups.filter(bucket__lte=until)
+    if since is None:
+        since = (until or now()) - (timedelta(hours=48) if granularity == "hour" else timedelta(days=7))
+    rollups = rollups.filter(bucket__gte=bucket_start(since, granularity))
+    if category:
+        rollups = rollups.filter(category=category)
+    if location:
+        rollups = rollups.filter(location=location)
+
+    points = {}
+    rows = rollups.values("bucket", "category", "sentiment").annotate(count=Sum("count")).order_by("bucket", "category")
+    for row in rows:
+        if row["count"] <= 0:
+            continue
+        point = points.setdefault(
+            (row["bucket"], row["category"]),
+            {"bucket": row["bucket"].isoformat(), "category": row["category"], "total": 0, "counts": {}},
+        )
+        point["counts"][row["sentiment"]] = row["count"]
+        point["total"] += row["count"]
+    return list(points.values())
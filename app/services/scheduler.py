@@ -0,0 +1,214 @@
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from functools import lru_cache
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F
+from django.db.models.functions import Greatest
+from app.models import ApiQuota
+from app.services.demand import recent_demand
+from app.services.metrics import NEWSAPI_SCHEDULED
+from app.services.newsapi_client import NewsApiError, RequestDeferred
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+COOLDOWN_KEY = "newsapi_cooldown_until"
+EXHAUSTED_CODES = {"apiKeyExhausted"}  # NewsAPI error codes meaning no requests are left today
+RATE_LIMITED_CODE = "rateLimited"  # A 429; without Retry-After it is the plan's daily limit
+
+
+class TokenBucket:
+    """Allows ``rate`` requests per second on average, in bursts of up to ``capacity``."""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self, max_wait=0.0):
+        """Takes a token, waiting up to ``max_wait`` seconds for one; returns whether it got one."""
+        deadline = time.monotonic() + max_wait
+        while True:
+            with self.lock:
+                current = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (current - self.updated) * self.rate)
+                self.updated = current
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return True
+                wait = (1 - self.tokens) / self.rate
+            if current + wait > deadline:
+                return False
+            time.sleep(wait)
+
+
+class NewsApiScheduler:
+    """Admits NewsAPI requests against the daily quota, a rate limit and upstream back-off.
+
+    A fetch opens a ``batch`` for its due categories, in the calling thread:
+
+    * while a ``Retry-After`` cool-down of a 429 answer is running (shared through the
+      cache), nothing is admitted;
+    * categories are admitted most read first (see ``app.services.demand``), each taking
+      one of the day's ``NEWSAPI_DAILY_QUOTA`` requests (UTC days) with a conditional
+      ``UPDATE`` of ``ApiQuota``, so every process draws from the same counter. Feeds
+      nobody read recently leave ``NEWSAPI_HOT_RESERVE`` of what is left of the day's
+      share to the feeds readers are waiting for.
+
+    Each attempt, retries included, then takes a token of a per-process token bucket
+    (``NEWSAPI_RATE`` per second, bursts of ``NEWSAPI_BURST``) in the fetch threads.
+    Categories that are not admitted stay due and are fetched by a later refresh.
+    """
+
+    api = "newsapi"
+
+    def __init__(self, daily_quota=100, rate=2.0, burst=20, max_wait=2.0, hot_reserve=0.5):
+        self.daily_quota = daily_quota
+        self.max_wait = max_wait
+        self.hot_reserve = hot_reserve
+        self.bucket = TokenBucket(rate, burst)
+
+    def demand(self, scope, categories):
+        """Recent reads of each category's feed, plus the reads of the scope not filtered
+        to one of ``categories`` (those want every category)."""
+        reads = {category: recent_demand(scope, category) for category in categories}
+        others = max(recent_demand(scope) - sum(reads.values()), 0)
+        return {category: count + others for category, count in reads.items()}
+
+    @contextmanager
+    def batch(self, scope, categories):
+        """Yields a ``Batch`` of the admitted categories, most read first; settles the
+        count of the day they were admitted with the attempts actually sent when the block exits."""
+        day = datetime.now(timezone.utc).date()
+        batch = Batch(self, self.admit(scope, categories, day), day)
+        try:
+            yield batch
+        finally:
+            batch.settle()
+
+    def admit(self, scope, categories, day=None):
+        """Reserves one request of the quota of ``day`` (today) per category it admits; returns
+        those, most read first."""
+        cooldown = self.cooldown()
+        if cooldown > self.max_wait:
+            NEWSAPI_SCHEDULED.inc(len(categories), decision="deferred_cooldown")
+            logger.info(f"⏸️ NewsAPI asked to back off for {cooldown:.0f}s, deferring {', '.join(categories)}")
+            return []
+
+        demand = self.demand(scope, categories)
+        admitted, deferred = [], []
+        for category in sorted(categories, key=lambda category: -demand[category]):
+            hot = demand[category] > 0
+            ceiling = self.daily_quota if hot else self.cold_ceiling()
+            (admitted if self.reserve(ceiling, day) else deferred).append(category)
+        NEWSAPI_SCHEDULED.inc(len(deferred), decision="deferred_quota")
+        if deferred:
+            logger.info(f"⏸️ Daily NewsAPI quota left for feeds in demand, deferring {', '.join(deferred)}")
+        return admitted
+
+    def cooldown(self):
+        """Seconds left of the last ``Retry-After`` back-off."""
+        return (cache.get(COOLDOWN_KEY) or 0) - time.time()
+
+    def cold_ceiling(self):
+        """Requests a feed without recent readers may use today: all but a reserve that
+        shrinks as the day goes by, kept for feeds in demand."""
+        day = datetime.now(timezone.utc)
+        remaining = 1 - (day.hour * 3600 + day.minute * 60 + day.second) / 86400
+        return int(self.daily_quota * (1 - self.hot_reserve * remaining))
+
+    def reserve(self, ceiling, day=None):
+        """Counts one request against the quota of ``day`` (today) unless ``ceiling`` requests were already made."""
+        day = day or datetime.now(timezone.utc).date()
+        ApiQuota.objects.bulk_create([ApiQuota(api=self.api, day=day)], ignore_conflicts=True)
+        return bool(
+            ApiQuota.objects.filter(api=self.api, day=day, exhausted=False, used__lt=ceiling)
+            .update(used=F("used") + 1)
+        )
+
+    def record_error(self, error):
+        """Backs off after a 429 for its ``Retry-After`` (or ``NEWSAPI_COOLDOWN``) seconds, in
+        every process. Returns whether NewsAPI said the key has no requests left today, which
+        a ``rateLimited`` answer without ``Retry-After`` also means."""
+        if error.code in EXHAUSTED_CODES or (error.code == RATE_LIMITED_CODE and not error.retry_after):
+            logger.warning("⚠️ NewsAPI quota exhausted for today, deferring requests until tomorrow (UTC)")
+            return True
+        if error.status == 429:
+            seconds = error.retry_after or getattr(settings, "NEWSAPI_COOLDOWN", 15 * 60)
+            cache.set(COOLDOWN_KEY, time.time() + seconds, seconds)
+            logger.warning(f"⚠️ NewsAPI rate limited us, backing off for {seconds:.0f}s")
+        return False
+
+    def usage(self):
+        """``{"day", "used", "quota", "exhausted"}`` of today."""
+        today = datetime.now(timezone.utc).date()
+        quota = ApiQuota.objects.filter(api=self.api, day=today).first()
+        return {
+            "day": today.isoformat(),
+            "used": quota.used if quota else 0,
+            "quota": self.daily_quota,
+            "exhausted": bool(quota and quota.exhausted),
+        }
+
+
+class Batch:
+    """The admitted categories of one fetch; ``call`` sends their requests from any thread."""
+
+    def __init__(self, scheduler, admitted, day):
+        self.scheduler = scheduler
+        self.admitted = admitted
+        self.day = day
+        self.sent = 0
+        self.exhausted = False
+        self.lock = threading.Lock()
+
+    def call(self, func):
+        """Sends one attempt of ``func()`` once the cool-down and the token bucket allow it."""
+        if self.exhausted:  # No retries once NewsAPI said the day's requests are spent
+            NEWSAPI_SCHEDULED.inc(decision="deferred_quota")
+            raise RequestDeferred("NewsAPI quota exhausted for today")
+        cooldown = self.scheduler.cooldown()
+        if cooldown > self.scheduler.max_wait:
+            NEWSAPI_SCHEDULED.inc(decision="deferred_cooldown")
+            raise RequestDeferred(f"NewsAPI asked to back off for {cooldown:.0f}s")
+        if cooldown > 0:
+            time.sleep(cooldown)
+        if not self.scheduler.bucket.acquire(self.scheduler.max_wait):
+            NEWSAPI_SCHEDULED.inc(decision="deferred_rate")
+            raise RequestDeferred("request rate limit reached")
+
+        NEWSAPI_SCHEDULED.inc(decision="sent")
+        with self.lock:
+            self.sent += 1
+        try:
+            return func()
+        except NewsApiError as e:
+            if self.scheduler.record_error(e):
+                self.exhausted = True
+            raise
+
+    def settle(self):
+        """Corrects the count of the admission day for retries and deferred attempts (in the
+        calling thread), even when the fetch ran past midnight."""
+        quota = ApiQuota.objects.filter(api=self.scheduler.api, day=self.day)
+        if self.sent != len(self.admitted):
+            quota.update(used=Greatest(F("used") + (self.sent - len(self.admitted)), 0))
+        if self.exhausted:
+            quota.update(exhausted=True)
+
+
+@lru_cache(maxsize=None)
+def get_scheduler():
+    """The process-wide NewsAPI scheduler, configured by the ``NEWSAPI_*`` settings."""
+    return NewsApiScheduler(
+        daily_quota=getattr(settings, "NEWSAPI_DAILY_QUOTA", 100),
+        rate=getattr(settings, "NEWSAPI_RATE", 2.0),
+        burst=getattr(settings, "NEWSAPI_BURST", 20),
+        max_wait=getattr(settings, "NEWSAPI_MAX_WAIT", 2.0),
+        hot_reserve=getattr(settings, "NEWSAPI_HOT_RESERVE", 0.5),
+    )
@@ -0,0 +1,116 @@
+from collections import OrderedDict
+from functools import lru_cache
+from hashlib import blake2b
+from django.conf import settings
+from django.core.cache import cache
+from app.services.metrics import SENTIMENT_CACHE_LOOKUPS
+import re
+import threading
+
+WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_title(title, source=""):
+    """The text a title is scored on: lowercased, whitespace collapsed, `` - Source`` suffix removed.
+
+    Scorers are case-insensitive, so titles that only differ in these ways share a score.
+    """
+    title = WHITESPACE_RE.sub(" ", title).strip()
+    if source and title.endswith(f" - {source.strip()}"):
+        title = title[:-len(source.strip()) - 3].rstrip()
+    return title.lower()
+
+
+class ScoreCache:
+    """Content-addressed memo of sentiment labels: a bounded in-process LRU in front of the Django cache.
+
+    Keys hash the normalized title, the sports flag (the only thing the rules read from
+    the category) and the scorer's class and version, so bumping ``SENTIMENT_VERSION``
+    orphans every old entry instead of serving stale labels.
+    """
+
+    def __init__(self, maxsize=10000, timeout=7 * 24 * 60 * 60):
+        self.maxsize = maxsize
+        self.timeout = timeout
+        self.local = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = {"local": 0, "shared": 0}
+        self.misses = 0
+
+    @staticmethod
+    def key(scorer, text, is_sports):
+        digest = blake2b(f"{type(scorer).__name__}:{scorer.version}|{int(is_sports)}|{text}".encode(), digest_size=16)
+        return f"sentiment_score_{digest.hexdigest()}"
+
+    def _remember(self, key, label):
+        with self.lock:
+            self.local[key] = label
+            self.local.move_to_end(key)
+            while len(self.local) > self.maxsize:
+                self.local.popitem(last=False)
+
+    def score_batch(self, scorer, titles, categories, sources=None):
+        """Returns ``scorer``'s labels for the titles, scoring each distinct normalized title once."""
+        sources = sources or [""] * len(titles)
+        texts = [normalize_title(title, source) for title, source in zip(titles, sources)]
+        sports = [category.lower() == "sports" for category in categories]
+        keys = [self.key(scorer, text, is_sports) for text, is_sports in zip(texts, sports)]
+
+        labels = {}
+        with self.lock:
+            for key in keys:
+                if key in self.local:
+                    labels[key] = self.local[key]
+                    self.local.move_to_end(key)
+        local_hits = sum(1 for key in keys if key in labels)
+
+        shared = cache.get_many([key for key in set(keys) if key not in labels])
+        labels.update(shared)
+        for key, label in shared.items():
+            self._remember(key, label)
+
+        # Score each missing key once, even if it occurs several times in the batch
+        missing = {}
+        for key, text, category in zip(keys, texts, categories):
+            if key not in labels:
+                missing.setdefault(key, (text, category))
+        if missing:
+            scored = dict(zip(missing, scorer.score_batch(
+                [text for text, _ in missing.values()], [category for _, category in missing.values()]
+            )))
+            cache.set_many(scored, self.timeout)
+            labels.update(scored)
+            for key, label in scored.items():
+                self._remember(key, label)
+
+        # Repeats of a title scored in this batch count as shared hits
+        shared_hits = len(keys) - local_hits - len(missing)
+        with self.lock:
+            self.hits["local"] += local_hits
+            self.hits["shared"] += shared_hits
+            self.misses += len(missing)
+        SENTIMENT_CACHE_LOOKUPS.inc(local_hits, result="local_hit")
+        SENTIMENT_CACHE_LOOKUPS.inc(shared_hits, result="shared_hit")
+        SENTIMENT_CACHE_LOOKUPS.inc(len(missing), result="miss")
+        return [labels[key] for key in keys]
+
+    def stats(self):
+        """Lookups served by the local LRU / the shared cache, misses (scored), and the hit rate."""
+        with self.lock:
+            total = self.hits["local"] + self.hits["shared"] + self.misses
+            return {
+                "local_hits": self.hits["local"],
+                "shared_hits": self.hits["shared"],
+                "misses": self.misses,
+                "hit_rate": (total - self.misses) / total if total else 0.0,
+                "size": len(self.local),
+            }
+
+
+@lru_cache(maxsize=None)
+def get_score_cache():
+    """The process-wide score cache, sized by ``SENTIMENT_CACHE_SIZE``."""
+    return ScoreCache(
+        maxsize=getattr(settings, "SENTIMENT_CACHE_SIZE", 10000),
+        timeout=getattr(settings, "SENTIMENT_CACHE_TIMEOUT", 7 * 24 * 60 * 60),
+    )
@@ -0,0 +1,170 @@
+from functools import lru_cache
+from django.conf import settings
+from django.db import connection, connections
+from django.db.models import BooleanField, FloatField, Q
+from django.db.models.expressions import RawSQL
+from app.models import ArticleScope
+from app.services.keyword_matcher import tokenize
+from app.services.pagination import ORDERING, InvalidCursor
+
+# Must stay identical to the expression of the GIN index created by migrations 0006/0008
+POSTGRES_DOCUMENT = "to_tsvector('english'::regconfig, COALESCE(title, '') || ' ' || COALESCE(source, ''))"
+POSTGRES_QUERY = "websearch_to_tsquery('english'::regconfig, %s)"
+
+TITLE_WEIGHT, SOURCE_WEIGHT = 10.0, 1.0  # bm25() column weights: headline hits outrank source hits
+
+# Sync triggers of the FTS5 index of app_article (migrations 0006/0008)
+SQLITE_TRIGGERS = {
+    "{table}_fts_insert": """CREATE TRIGGER IF NOT EXISTS {table}_fts_insert AFTER INSERT ON {table} BEGIN
+        INSERT INTO {table}_fts(rowid, title, source) VALUES (new.id, new.title, new.source);
+    END""",
+    "{table}_fts_delete": """CREATE TRIGGER IF NOT EXISTS {table}_fts_delete AFTER DELETE ON {table} BEGIN
+        INSERT INTO {table}_fts({table}_fts, rowid, title, source) VALUES ('delete', old.id, old.title, old.source);
+    END""",
+    "{table}_fts_update": """CREATE TRIGGER IF NOT EXISTS {table}_fts_update AFTER UPDATE OF title, source ON {table} BEGIN
+        INSERT INTO {table}_fts({table}_fts, rowid, title, source) VALUES ('delete', old.id, old.title, old.source);
+        INSERT INTO {table}_fts(rowid, title, source) VALUES (new.id, new.title, new.source);
+    END""",
+}
+
+
+def fts_query(q):
+    """Turns free text into an FTS5 query: every word must match, the last one as a prefix.
+
+    Words are quoted, so FTS5 operators typed by users are searched as plain text.
+    """
+    tokens = tokenize(q)
+    if not tokens:
+        return None
+    return " ".join([f'"{token}"' for token in tokens[:-1]] + [f'"{tokens[-1]}"*'])
+
+
+@lru_cache(maxsize=None)
+def fts_table(model_class):
+    """Name of the FTS5 index of ``model_class`` on SQLite, or ``None`` if it was not created."""
+    if connection.vendor != "sqlite":
+        return None
+    table = f"{model_class._meta.db_table}_fts"
+    return table if table in connection.introspection.table_names() else None
+
+
+def repair_search_index(using="default", **kwargs):
+    """``post_migrate`` receiver: restores FTS5 sync triggers dropped by a table rebuild.
+
+    SQLite migrations that alter a column copy the table into a new one, which silently
+    drops its triggers. Missing triggers are recreated and the index rebuilt from the table.
+    """
+    db = connections[using]
+    if db.vendor != "sqlite":
+        return
+    with db.cursor() as cursor:
+        cursor.execute("SELECT type, name FROM sqlite_master WHERE type IN ('table', 'trigger')")
+        existing = {name for kind, name in cursor.fetchall()}
+        for table in ("app_article",):
+            if f"{table}_fts" not in existing:
+                continue
+            missing = [sql for name, sql in SQLITE_TRIGGERS.items() if name.format(table=table) not in existing]
+            for sql in missing:
+                cursor.execute(sql.format(table=table))
+            if missing:
+                cursor.execute(f"INSERT INTO {table}_fts({table}_fts) VALUES ('rebuild')")
+
+
+def matching(queryset, q):
+    """Narrows ``queryset`` to the articles whose title or source matches ``q`` (unranked).
+
+    Uses the FTS5 index on SQLite, the GIN full-text index on PostgreSQL and a
+    ``LIKE`` scan on any other database.
+    """
+    table = fts_table(queryset.model)
+    if table:
+        expression = fts_query(q)
+        if expression is None:
+            return queryset.none()
+        return queryset.filter(id__in=RawSQL(f"SELECT rowid FROM {table} WHERE {table} MATCH %s", [expression]))
+    if connection.vendor == "postgresql":
+        return queryset.filter(RawSQL(f"{POSTGRES_DOCUMENT} @@ {POSTGRES_QUERY}", [q], output_field=BooleanField()))
+    return queryset.filter(Q(title__icontains=q) | Q(source__icontains=q))
+
+
+def ranked_ids(model_class, q, limit, candidates, scope=None, location=None):
+    """Returns up to ``limit`` IDs of FTS5 matches, best BM25 score first (SQLite only).
+
+    Only the ``candidates`` most recent matches are scored: FTS5 walks its doclists in
+    rowid order cheaply, but ranking every match of a common word would cost a BM25
+    evaluation per row. With a ``scope`` (and ``location``) only the articles that feed
+    lists are candidates, checked against the placement index before the cut.
+    """
+    table = fts_table(model_class)
+    expression = fts_query(q)
+    if expression is None:
+        return []
+    placed, params = "", []
+    if scope is not None:
+        placements = ArticleScope._meta.db_table
+        placed = f"AND rowid IN (SELECT article_id FROM {placements} WHERE scope = %s"
+        params = [scope]
+        if scope == ArticleScope.GLOBAL or location is not None:
+            placed += " AND location = %s"
+            params.append(location or "")
+        placed += ") "
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT rowid FROM ("
+            f"SELECT rowid, bm25({table}, {TITLE_WEIGHT}, {SOURCE_WEIGHT}) AS score FROM {table} "
+            f"WHERE {table} MATCH %s {placed}ORDER BY rowid DESC LIMIT %s"
+            f") ORDER BY score, rowid DESC LIMIT %s",
+            [expression, *params, candidates, limit],
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def search_page(queryset, q, filters=None, cursor=None, page_size=30, scope=None, location=None):
+    """Returns one page of ``queryset`` rows matching ``q`` and the equality ``filters``,
+    most relevant first, plus the next cursor.
+
+    On SQLite the FTS5 index ranks the newest ``SEARCH_CANDIDATES`` matches (keeping the
+    best ``SEARCH_MAX_RESULTS``) listed in the feed ``scope``/``location`` that
+    ``queryset`` reads, or of every feed without a scope. Those IDs are narrowed to
+    ``queryset`` by primary key, ``filters`` are checked against the
+    rows in Python, and only then is the page cut and loaded. (Filtering in SQL would let
+    SQLite, which has no statistics by default, scan a whole category through its index
+    instead.)
+    PostgreSQL ranks with ``ts_rank`` in the query itself. Without an index, matches come
+    newest first. Search cursors are result offsets.
+    """
+    filters = filters or {}
+    try:
+        offset = int(cursor or 0)
+    except ValueError as e:
+        raise InvalidCursor("Invalid cursor") from e
+    if offset < 0:
+        raise InvalidCursor("Invalid cursor")
+
+    if fts_table(queryset.model):
+        ids = ranked_ids(
+            queryset.model, q,
+            getattr(settings, "SEARCH_MAX_RESULTS", 1000), getattr(settings, "SEARCH_CANDIDATES", 5000),
+            scope, location,
+        )
+        wanted = list(filters.values())
+        allowed = {
+            pk for pk, *values in queryset.filter(id__in=ids).values_list("id", *filters).order_by()
+            if values == wanted
+        }
+        page_ids = [pk for pk in ids if pk in allowed][offset:offset + page_size + 1]
+        rows = {_pk(row): row for row in queryset.filter(id__in=page_ids)}
+        matches = [rows[pk] for pk in page_ids if pk in rows]
+    elif connection.vendor == "postgresql":
+        rank = RawSQL(f"ts_rank({POSTGRES_DOCUMENT}, {POSTGRES_QUERY})", [q], output_field=FloatField())
+        ranked = matching(queryset.filter(**filters), q).annotate(rank=rank).order_by("-rank", *ORDERING)
+        matches = list(ranked[offset:offset + page_size + 1])
+    else:
+        matches = list(matching(queryset.filter(**filters), q).order_by(*ORDERING)[offset:offset + page_size + 1])
+
+    next_cursor = str(offset + page_size) if len(matches) > page_size else None
+    return matches[:page_size], next_cursor
+
+
+def _pk(row):
+    return row["id"] if isinstance(row, dict) else row.pk
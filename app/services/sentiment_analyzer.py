@@ -1,69 +1,115 @@
-from textblob import TextBlob
-from app.models import NewsArticle, LocalNews
-
-# Expanded keyword lists for better accuracy
-POSITIVE_WORDS = {
-    "profit", "growth", "success", "win", "record", "innovation", "strong", "rise", 
-    "optimistic", "gains", "increase", "improve", "advancement", 
-    "stunner", "comeback", "clutch", "dominant", "amazing", "upset", "pull off", 
-    "stable", "good health", "good", "fix", "new"
-}
-
-NEGATIVE_WORDS = {
-    "crash", "decline", "loss", "fail", "drop", "problem", "risk", "cut", "pessimistic", 
-    "downturn", "plummet", "reduce", "collapse", "hope is fading", "no hope", 
-    "hopeless", "fatal", "suing"
-}
-
-def analyze_sentiment():
-    """Improved sentiment analysis for both Global and Local news articles."""
-    
-    # Process global news
-    process_sentiment(NewsArticle.objects.all(), NewsArticle)
-
-    # Process local news
-    process_sentiment(LocalNews.objects.all(), LocalNews)
-
-    print("✅ Sentiment analysis updated for both Global & Local news!")
-
-
-def process_sentiment(articles, model_class):
-    """Processes sentiment for a queryset of news articles."""
-    bulk_updates = []
-
-    for article in articles:
-        if not article.title:  # Ignore empty titles
-            continue
-
-        # Analyze sentiment with TextBlob
-        analysis = TextBlob(article.title)
-        polarity = analysis.sentiment.polarity
-
-        # Convert title to lowercase for keyword matching
-        words = set(article.title.lower().split())
-
-        # Category-based sentiment adjustment
-        is_sports = article.category.lower() == "sports"
-
-        # Determine sentiment
-        if words & POSITIVE_WORDS:
-            sentiment = "Positive"
-        elif words & NEGATIVE_WORDS:
-            sentiment = "Negative"
-        else:
-            # If no strong keywords, rely on polarity score with adjusted thresholds
-            if polarity > 0.05 or (is_sports and polarity >= 0):  
-                sentiment = "Positive"  # Sports articles often get a positive bias
-            elif polarity < -0.05:
-                sentiment = "Negative"
-            else:
-                sentiment = "Neutral"
-
-        # Update sentiment only if it has changed
-        if article.sentiment != sentiment:
+from itertools import islice
+from django.conf import settings
+from django.db.models import QuerySet
+from app.models import Article, ArticleScope, LocalNews, NewsArticle, SCOPE_MODELS
+from app.signals import articles_changed
+from app.services.metrics import (
+    DB_WRITE_ROWS, DB_WRITE_SECONDS, REFRESH_STAGE_SECONDS, SENTIMENT_ARTICLES, SENTIMENT_BATCH_SECONDS,
+)
+from app.services.rollups import placements_of, record_sentiment_changes
+from app.services.score_cache import get_score_cache
+from app.services.sentiment_engine import get_scorer
+# The word lists and the scorer version used to live here; kept importable from this module
+from app.services.sentiment_engine import NEGATIVE_WORDS, POSITIVE_WORDS, SENTIMENT_VERSION  # noqa: F401
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@REFRESH_STAGE_SECONDS.time(span="score", stage="score")
+def analyze_sentiment(article_ids=None, local_ids=None):
+    """Scores new or stale articles, whichever feeds list them.
+
+    Pass the IDs returned by the fetchers to score only the rows they just created.
+    Without IDs, every article whose ``sentiment_version`` is behind the scorer's version
+    is scored, so refresh cost follows the number of new articles, not table size.
+    """
+    ids = None
+    if article_ids is not None or local_ids is not None:
+        ids = list(article_ids or []) + list(local_ids or [])
+    scored = process_sentiment(pending_articles(ids))
+
+    stats = get_score_cache().stats()
+    logger.info(
+        f"✅ Sentiment analysis updated for {scored} Global & Local news articles "
+        f"(score cache hit rate {stats['hit_rate']:.0%}, {stats['misses']} titles scored)"
+    )
+    return scored
+
+
+def pending_articles(ids=None):
+    """Returns the articles that still need scoring, optionally limited to ``ids``."""
+    articles = Article.objects.exclude(sentiment_version=get_scorer().version)
+    if ids is not None:
+        articles = articles.filter(pk__in=ids)
+    return articles.only("id", "title", "source", "category", "published_at", "sentiment", "sentiment_version")
+
+
+def process_sentiment(articles, scorer=None):
+    """Processes sentiment for a queryset of news articles and returns how many were scored.
+
+    Articles are scored and written back a chunk at a time (``SENTIMENT_BATCH_SIZE``), so
+    rescoring a large archive keeps memory bounded. Titles go through the shared score
+    cache, so a headline already scored is not scored again. This is where labels become
+    known, so the sentiment rollups of every feed listing an article are updated here too.
+    """
+    scorer = scorer or get_scorer()
+    score_cache = get_score_cache()
+    batch_size = getattr(settings, "SENTIMENT_BATCH_SIZE", 1000)
+    scored_ids = {model_class: [] for model_class in SCOPE_MODELS.values()}
+    locations = set()
+    scored = 0
+
+    for chunk in _chunked(articles, batch_size):
+        # Untitled rows are stamped with the version too so they are not picked up again
+        titled = [article for article in chunk if article.title]
+        # Rows never scored before are not in the rollups yet
+        previous = [article.sentiment if article.sentiment_version else None for article in chunk]
+        with SENTIMENT_BATCH_SECONDS.time(model="Article"):
+            labels = score_cache.score_batch(
+                scorer,
+                [article.title for article in titled],
+                [article.category for article in titled],
+                [article.source for article in titled],
+            )
+        for article, sentiment in zip(titled, labels):
             article.sentiment = sentiment
-            bulk_updates.append(article)
+        for article in chunk:
+            article.sentiment_version = scorer.version
+
+        # Bulk update the whole chunk at once for efficiency
+        with DB_WRITE_SECONDS.time(span="db_write", operation="sentiment", model="Article"):
+            Article.objects.bulk_update(chunk, ["sentiment", "sentiment_version"], batch_size=500)
+        DB_WRITE_ROWS.inc(len(chunk), operation="sentiment", model="Article")
+        SENTIMENT_ARTICLES.inc(len(chunk), model="Article")
+        placements = placements_of([article.pk for article in chunk])
+        record_sentiment_changes(zip(chunk, previous), placements)
+        for article in chunk:
+            for scope in {scope for scope, _ in placements.get(article.pk, ())}:
+                scored_ids[SCOPE_MODELS[scope]].append(article.pk)
+            locations.update(location for scope, location in placements.get(article.pk, ()) if scope == ArticleScope.LOCAL)
+        scored += len(chunk)
+
+    if scored_ids[NewsArticle]:
+        articles_changed.send(sender=NewsArticle, ids=scored_ids[NewsArticle])
+    if scored_ids[LocalNews]:
+        articles_changed.send(sender=LocalNews, ids=scored_ids[LocalNews], locations=sorted(locations))
+    return scored
+
+
+def _chunked(articles, size):
+    """Yields lists of up to ``size`` articles.
+
+    Querysets are walked in primary-key order one page at a time, which keeps memory flat
+    and stays correct while the scored rows drop out of the pending filter.
+    """
+    if isinstance(articles, QuerySet):
+        last_pk = 0
+        while chunk := list(articles.filter(pk__gt=last_pk).order_by("pk")[:size]):
+            yield chunk
+            last_pk = chunk[-1].pk
+        return
 
-    # Bulk update all changed articles at once for efficiency
-    if bulk_updates:
-        model_class.objects.bulk_update(bulk_updates, ["sentiment"])
+    iterator = iter(articles)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
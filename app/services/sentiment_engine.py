@@ -0,0 +1,142 @@
+from functools import lru_cache
+from django.conf import settings
+from django.utils.module_loading import import_string
+from app.services.keyword_matcher import KeywordMatcher, load_lexicon
+
+# NumPy and TextBlob (which loads NLTK) are imported by the scorers when they first
+# score: processes that never score, like the web workers, don't pay for them at startup.
+
+# Bump whenever the scoring rules or lexicons change so stored labels get recomputed
+SENTIMENT_VERSION = 3
+
+# Expanded keyword lists for better accuracy
+POSITIVE_WORDS = {
+    "profit", "growth", "success", "win", "record", "innovation", "strong", "rise",
+    "optimistic", "gains", "increase", "improve", "advancement",
+    "stunner", "comeback", "clutch", "dominant", "amazing", "upset", "pull off",
+    "stable", "good health", "good", "fix", "new"
+}
+
+NEGATIVE_WORDS = {
+    "crash", "decline", "loss", "fail", "drop", "problem", "risk", "cut", "pessimistic",
+    "downturn", "plummet", "reduce", "collapse", "hope is fading", "no hope",
+    "hopeless", "fatal", "suing"
+}
+
+POSITIVE, NEGATIVE = 1, 2  # Keyword hit flags, OR-ed together per title
+LABELS = ("Neutral", "Positive", "Negative")
+
+
+@lru_cache(maxsize=None)
+def get_matcher():
+    """Builds the keyword automaton once from the built-in word lists plus ``SENTIMENT_LEXICON_FILES``."""
+    terms = {word: POSITIVE for word in POSITIVE_WORDS}
+    for word in NEGATIVE_WORDS:
+        terms[word] = terms.get(word, 0) | NEGATIVE
+    for path in getattr(settings, "SENTIMENT_LEXICON_FILES", []):
+        for term, flag in load_lexicon(path).items():
+            terms[term] = terms.get(term, 0) | flag
+    return KeywordMatcher(terms)
+
+
+class SentimentScorer:
+    """Interface for sentiment scorers: maps a batch of titles to sentiment labels."""
+
+    version = SENTIMENT_VERSION
+
+    def score_batch(self, titles, categories):
+        """Returns one of "Positive", "Negative" or "Neutral" for each (title, category) pair."""
+        raise NotImplementedError
+
+    def score(self, title, category):
+        return self.score_batch([title], [category])[0]
+
+
+class KeywordTextBlobScorer(SentimentScorer):
+    """Reference rule: keyword hits win, otherwise TextBlob polarity with a sports bias."""
+
+    def __init__(self, matcher=None):
+        self.matcher = matcher or get_matcher()
+
+    def score_batch(self, titles, categories):
+        return [self._score_one(title, category) for title, category in zip(titles, categories)]
+
+    def _score_one(self, title, category):
+        from textblob import TextBlob
+
+        # Analyze sentiment with TextBlob
+        analysis = TextBlob(title)
+        polarity = analysis.sentiment.polarity
+
+        # Match keywords and phrases in the lowercased title
+        flags = self.matcher.flags(title)
+
+        # Category-based sentiment adjustment
+        is_sports = category.lower() == "sports"
+
+        # Determine sentiment
+        if flags & POSITIVE:
+            return "Positive"
+        elif flags & NEGATIVE:
+            return "Negative"
+        # If no strong keywords, rely on polarity score with adjusted thresholds
+        elif polarity > 0.05 or (is_sports and polarity >= 0):
+            return "Positive"  # Sports articles often get a positive bias
+        elif polarity < -0.05:
+            return "Negative"
+        return "Neutral"
+
+
+class BatchSentimentScorer(SentimentScorer):
+    """Scores whole chunks of titles at once and yields the same labels as the reference rule.
+
+    Keyword hits come from the precompiled keyword automaton, polarity is only computed
+    for titles without a keyword hit (calling the pattern analyzer directly instead of
+    building a TextBlob per title), and the thresholds are applied as NumPy array operations.
+    The pattern analyzer still dominates, so the gain over the reference scorer depends on
+    how many titles hit a keyword: about 1.2x to 3x on real and synthetic headlines.
+    """
+
+    def __init__(self, matcher=None):
+        self.matcher = matcher or get_matcher()
+
+    def score_batch(self, titles, categories):
+        if not titles:
+            return []
+        import numpy as np
+        from textblob.en.sentiments import pattern_sentiment
+
+        flags = self.keyword_flags(titles)
+        has_positive = (flags & POSITIVE).astype(bool)
+        has_negative = (flags & NEGATIVE).astype(bool) & ~has_positive
+
+        polarity = np.zeros(len(titles))
+        for i in np.flatnonzero(~(has_positive | has_negative)):
+            polarity[i] = pattern_sentiment(titles[i])[0]
+
+        is_sports = np.array([category.lower() == "sports" for category in categories])
+
+        # 0 = Neutral, 1 = Positive, 2 = Negative (indexes into LABELS)
+        label_ids = np.select(
+            [
+                has_positive,
+                has_negative,
+                (polarity > 0.05) | (is_sports & (polarity >= 0)),
+                polarity < -0.05,
+            ],
+            [1, 2, 1, 2],
+            default=0,
+        )
+        return np.take(LABELS, label_ids).tolist()
+
+    def keyword_flags(self, titles):
+        """Returns an array with the keyword flags matched in each title."""
+        import numpy as np
+        return np.fromiter(map(self.matcher.flags, titles), dtype=np.uint8, count=len(titles))
+
+
+@lru_cache(maxsize=None)
+def get_scorer():
+    """Returns the scorer configured by ``settings.SENTIMENT_SCORER`` (a dotted class path)."""
+    path = getattr(settings, "SENTIMENT_SCORER", "app.services.sentiment_engine.BatchSentimentScorer")
+    return import_string(path)()
@@ -0,0 +1,59 @@
+from django.conf import settings
+from django.core.cache import cache
+import logging
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+RESULT_TIMEOUT = 60  # How long a finished flight's result stays available to its waiters
+
+
+class SingleFlightTimeout(Exception):
+    """Raised when a waiter gives up on an in-flight call it was coalesced into."""
+
+
+def single_flight(key, func, lock_timeout=None, wait_timeout=None, poll_interval=0.05):
+    """Runs ``func`` once for all concurrent callers using the same ``key``.
+
+    The first caller takes a lock in the shared cache (``cache.add``, so it works across
+    processes with Redis) and runs ``func``; everyone arriving while it runs waits for that
+    flight and returns its result instead of calling ``func`` again. If the leader fails or
+    its lock expires, a waiter takes over. ``lock_timeout`` should exceed the slowest
+    expected call.
+    """
+    lock_timeout = lock_timeout or getattr(settings, "SINGLE_FLIGHT_LOCK_TIMEOUT", 120)
+    wait_timeout = wait_timeout or lock_timeout
+    lock_key = f"singleflight_lock_{key}"
+    result_key = f"singleflight_result_{key}"
+    deadline = time.monotonic() + wait_timeout
+
+    while True:
+        token = uuid.uuid4().hex
+        if cache.add(lock_key, token, lock_timeout):
+            try:
+                result = func()
+                cache.set(result_key, {"token": token, "value": result}, RESULT_TIMEOUT)
+                return result
+            finally:
+                if cache.get(lock_key) == token:
+                    cache.delete(lock_key)
+
+        # Another caller is running this flight: wait for its result
+        leader = cache.get(lock_key)
+        if leader is None:
+            continue  # It finished between our add() and get(), try to lead the next one
+        logger.info(f"⏳ Waiting for in-flight {key}")
+        while True:
+            outcome = cache.get(result_key)
+            if outcome is not None and outcome["token"] == leader:
+                return outcome["value"]
+            if cache.get(lock_key) != leader:
+                break  # Leader finished without a result (it failed) or the lock changed hands
+            if time.monotonic() > deadline:
+                raise SingleFlightTimeout(f"Timed out waiting for in-flight {key}")
+            time.sleep(poll_interval)
+
+        outcome = cache.get(result_key)
+        if outcome is not None and outcome["token"] == leader:
+            return outcome["value"]
@@ -0,0 +1,6 @@
+from django.dispatch import Signal
+
+# Sent with sender=<article model class> after ingestion, sentiment scoring or purging
+# has written rows of that model; ``ids`` lists the affected rows when known, and
+# ``locations`` the local feeds they are listed in (``LocalNews`` only).
+articles_changed = Signal()
@@ -1,3 +1,1135 @@
-from django.test import TestCase
+from base64 import urlsafe_b64encode
+from datetime import datetime, timedelta, timezone
+from django.test import Client, TestCase, override_settings
+from django.core.cache import cache
+from django.db import connection
+from django.utils.timezone import now
+from unittest import skipUnless
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+from config import celery_app
+from app.automation.jobs import create_job
+from app.models import ApiQuota, Article, ArticleScope, NewsArticle, LocalNews, SentimentRollup
+from app.benchmarks.corpus import CATEGORIES, synthetic_headline
+from app.benchmarks.suite import compare, run_suite
+from app.management.commands.benchmark_news import BENCHMARK_CACHES
+from app.services import news_fetcher
+from app.services.geocoding import geohash_center, geohash_encode, parse_coordinates, resolve_locality
+from app.services.clients import override_clients, set_client
+from app.services.demand import record_demand
+from app.services.facets import count_facets, get_facets
+from app.services.freshness import local_scope, mark_fetched
+from app.services.ingestion import ingest_articles, normalize_articles
+from app.services.keyword_matcher import KeywordMatcher
+from app.services.metrics import DB_WRITE_ROWS, GEOCODE_SECONDS, REGISTRY, VIEW_QUERIES, Histogram
+from app.services.newsapi_client import NewsApiError, NewsApiHttpClient, RequestDeferred
+from app.services.pagination import ORDERING, InvalidCursor, decode_cursor, encode_cursor, paginate
+from app.services.local_feeds import partition
+from app.services.retention import purge_old_articles, purge_scope
+from app.services.rollups import rebuild_rollups
+from app.services.sentiment_analyzer import analyze_sentiment, process_sentiment
+from app.services.scheduler import Batch, get_scheduler
+from app.services.search import search_page
+from app.services.score_cache import ScoreCache
+from app.services.sentiment_engine import (
+    NEGATIVE, POSITIVE, BatchSentimentScorer, KeywordTextBlobScorer, SentimentScorer, get_matcher, get_scorer,
+)
+from app.views import ARTICLE_FIELDS
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.core.management import call_command
+from django.test.utils import CaptureQueriesContext
+from io import StringIO
+import json
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
 
-# Create your tests here.
+
+class StubNewsAPI:
+    """Local NewsAPI stand-in: answers every request after ``delay`` seconds with two articles."""
+
+    def __init__(self, delay=0.2, failures=0):
+        self.delay = delay
+        self.failures = failures  # Number of leading requests answered with HTTP 503
+        self.requests = []
+        self.lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                params = {k: v[0] for k, v in parse_qs(urlparse(self.path).query).items()}
+                with stub.lock:
+                    stub.requests.append(params)
+                    failing = stub.failures > 0
+                    stub.failures -= failing
+                time.sleep(stub.delay)
+                key = params.get("category") or params.get("q", "").replace(" ", "-")
+                body = {"status": "error", "message": "busy"} if failing else {
+                    "status": "ok",
+                    "articles": [
+                        {
+                            "title": f"{key} headline {i}",
+                            "url": f"https://example.com/{key}/{i}",
+                            "source": {"name": "Stub"},
+                            "publishedAt": "2025-03-01T12:00:00Z",
+                        }
+                        for i in range(2)
+                    ],
+                }
+                payload = json.dumps(body).encode()
+                self.send_response(503 if failing else 200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/v2"
+
+    def __enter__(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def fresh_scheduler(test):
+    """Gives ``test`` a NewsAPI scheduler built from its settings, with a full token bucket."""
+    get_scheduler.cache_clear()
+    test.addCleanup(get_scheduler.cache_clear)
+
+
+@override_settings(NEWSAPI_MAX_WORKERS=4, NEWSAPI_RETRY_BACKOFF=0.01)
+class ConcurrentFetchTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(set_client, "newsapi", None)
+        fresh_scheduler(self)
+
+    def test_categories_are_fetched_concurrently(self):
+        with StubNewsAPI(delay=0.2) as stub:
+            set_client("newsapi", NewsApiHttpClient(api_key="test", base_url=stub.url))
+            started = time.monotonic()
+            created_ids = news_fetcher.fetch_news()
+            elapsed = time.monotonic() - started
+
+        self.assertEqual(len(stub.requests), len(news_fetcher.CATEGORIES))
+        self.assertEqual(len(created_ids), 2 * len(news_fetcher.CATEGORIES))
+        self.assertEqual(NewsArticle.objects.count(), 2 * len(news_fetcher.CATEGORIES))
+        # Seven serial round-trips would take at least 1.4s
+        self.assertLess(elapsed, 0.2 * len(news_fetcher.CATEGORIES))
+
+    def test_failed_requests_are_retried(self):
+        with StubNewsAPI(delay=0, failures=2) as stub:
+            set_client("newsapi", NewsApiHttpClient(api_key="test", base_url=stub.url))
+            created_ids = news_fetcher.fetch_news()
+
+        self.assertEqual(len(stub.requests), len(news_fetcher.CATEGORIES) + 2)
+        self.assertEqual(len(created_ids), 2 * len(news_fetcher.CATEGORIES))
+
+    def test_a_shared_batch_is_ingested_once(self):
+        with StubNewsAPI(delay=0) as stub:
+            set_client("newsapi", NewsApiHttpClient(api_key="test", base_url=stub.url))
+            batch = news_fetcher.fetch_global_articles()
+
+        # Every caller coalesced into the flight gets the batch; only one stores and reports it
+        self.assertEqual(len(news_fetcher.store_global_articles(batch)), 2 * len(news_fetcher.CATEGORIES))
+        self.assertEqual(news_fetcher.store_global_articles(batch), [])
+        self.assertEqual(news_fetcher.store_global_articles(dict(batch, id="another flight")), [])
+
+
+@override_settings(NEWSAPI_DAILY_QUOTA=3, NEWSAPI_HOT_RESERVE=0, NEWSAPI_RETRY_BACKOFF=0.01)
+class NewsApiSchedulerTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(set_client, "newsapi", None)
+        fresh_scheduler(self)
+
+    def test_daily_quota_defers_the_remaining_categories(self):
+        with StubNewsAPI(delay=0) as stub:
+            set_client("newsapi", NewsApiHttpClient(api_key="test", base_url=stub.url))
+            news_fetcher.fetch_news()
+            news_fetcher.fetch_news()
+
+        self.assertEqual(len(stub.requests), 3)
+        self.assertEqual(ApiQuota.objects.get().used, 3)
+
+    def test_retries_count_against_the_quota(self):
+        with StubNewsAPI(delay=0, failures=1) as stub:
+            set_client("newsapi", NewsApiHttpClient(api_key="test", base_url=stub.url))
+            news_fetcher.fetch_news()
+
+        self.assertEqual(len(stub.requests), 4)
+        self.assertEqual(ApiQuota.objects.get().used, 4)
+
+    def test_retry_after_defers_requests_until_it_expires(self):
+        def rate_limited():
+            raise NewsApiError("slow down", status=429, retry_after=60)
+
+        scheduler = get_scheduler()
+        with scheduler.batch("global", ["business"]) as batch:
+            with self.assertRaises(NewsApiError):
+                batch.call(rate_limited)
+
+        self.assertGreater(scheduler.cooldown(), 50)
+        self.assertEqual(scheduler.admit("global", ["business", "sports"]), [])
+
+    def test_rate_limited_without_retry_after_exhausts_the_day(self):
+        def rate_limited():
+            raise NewsApiError("too many requests", status=429, code="rateLimited")
+
+        scheduler = get_scheduler()
+        with scheduler.batch("global", ["business"]) as batch:
+            with self.assertRaises(NewsApiError):
+                batch.call(rate_limited)
+            with self.assertRaises(RequestDeferred):
+                batch.call(rate_limited)  # Not retried
+
+        self.assertTrue(scheduler.usage()["exhausted"])
+        self.assertEqual(scheduler.admit("global", ["business"]), [])
+
+    def test_attempts_are_settled_on_the_day_they_were_admitted(self):
+        scheduler = get_scheduler()
+        today = datetime.now(timezone.utc).date()
+        yesterday = today - timedelta(days=1)
+        batch = Batch(scheduler, scheduler.admit("global", ["business", "sports"], yesterday), yesterday)
+        scheduler.reserve(scheduler.daily_quota)  # Past midnight, another fetch starts today
+
+        batch.settle()  # Nothing was sent
+
+        self.assertEqual(ApiQuota.objects.get(day=yesterday).used, 0)
+        self.assertEqual(ApiQuota.objects.get(day=today).used, 1)
+
+    @override_settings(NEWSAPI_DAILY_QUOTA=100, NEWSAPI_HOT_RESERVE=1.0)
+    def test_feeds_in_demand_get_the_reserve(self):
+        scheduler = get_scheduler()
+        scheduler.reserve(scheduler.daily_quota)
+        ApiQuota.objects.update(used=scheduler.cold_ceiling())
+        record_demand("global", "sports")
+
+        self.assertEqual(scheduler.admit("global", ["business", "sports"]), ["sports"])
+
+
+class RefreshJobTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(set_client, "newsapi", None)
+        fresh_scheduler(self)
+        # Run the chain in-process instead of on a broker
+        celery_app.conf.task_always_eager = True
+        self.addCleanup(setattr, celery_app.conf, "task_always_eager", False)
+
+    def test_refresh_is_accepted_with_a_job_to_poll(self):
+        with StubNewsAPI(delay=0) as stub:
+            set_client("newsapi", NewsApiHttpClient(api_key="test", base_url=stub.url))
+            response = self.client.get("/refresh")
+
+        self.assertEqual(response.status_code, 202)
+        body = response.json()
+        self.assertEqual(body["status"], "queued")
+        self.assertEqual(body["status_url"], f"/refresh/{body['job_id']}")
+
+        job = self.client.get(body["status_url"]).json()
+        self.assertEqual(job["status"], "done")
+        self.assertEqual((job["created"], job["scored"]), (14, 14))
+        self.assertIn("score_seconds", job)
+
+    def test_status_of_a_pending_job(self):
+        job_id = create_job(lat=None, lon=None)
+
+        response = self.client.get(f"/refresh/{job_id}")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["status"], "queued")
+        self.assertEqual(self.client.get("/refresh/unknown").status_code, 404)
+
+
+class StubGeocoder:
+    """OpenCage stand-in naming coordinates ``locality`` ("City, State", or a function of
+    ``lat``/``lon`` returning one); counts its calls."""
+
+    def __init__(self, locality="Austin, Texas"):
+        self.locality = locality
+        self.calls = []
+
+    def reverse_geocode(self, lat, lon):
+        self.calls.append((lat, lon))
+        name = self.locality(lat, lon) if callable(self.locality) else self.locality
+        if not name:
+            return []
+        city, state = name.split(", ")
+        return [{"components": {"city": city, "state": state, "country": "United States"}}]
+
+
+class GeohashBucketingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_geohash_cells(self):
+        self.assertEqual(geohash_encode(57.64911, 10.40744, 11), "u4pruydqqvj")
+        self.assertEqual(geohash_encode(30.2672, -97.7431), "9v6kp")
+        # Cell 9v6kp spans longitudes -97.778 to -97.734: a kilometer east is the next cell
+        self.assertEqual(geohash_encode(30.2600, -97.7500), "9v6kp")
+        self.assertNotEqual(geohash_encode(30.2672, -97.7300), "9v6kp")
+        self.assertEqual(geohash_encode(*geohash_center("9v6kp")), "9v6kp")
+
+    def test_one_geocode_per_cell(self):
+        geocoder = StubGeocoder()
+        with override_clients(geocoder=geocoder):
+            self.assertEqual(resolve_locality(30.2672, -97.7431), "Austin, Texas")
+            self.assertEqual(resolve_locality(30.2600, -97.7500), "Austin, Texas")
+            self.assertEqual(len(geocoder.calls), 1)
+            self.assertEqual(geocoder.calls[0], geohash_center("9v6kp"))
+
+            resolve_locality(30.2672, -97.7300)
+            self.assertEqual(len(geocoder.calls), 2)
+
+    def test_localities_share_a_freshness_scope(self):
+        self.assertEqual(local_scope("Austin, Texas"), "local_austin-texas")
+        self.assertEqual(local_scope(None), "local_local-news")
+        with override_clients(geocoder=StubGeocoder(locality=None)):
+            self.assertIsNone(resolve_locality(0.0, 0.0))
+
+
+class SingleFlightTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(set_client, "newsapi", None)
+        fresh_scheduler(self)
+        self.enterContext(override_clients(geocoder=StubGeocoder()))
+
+    def fire(self, func, *argument_lists):
+        with ThreadPoolExecutor(max_workers=len(argument_lists)) as pool:
+            return list(pool.map(lambda args: func(*args), argument_lists))
+
+    def test_concurrent_global_refreshes_share_one_fetch(self):
+        with StubNewsAPI(delay=0.3) as stub:
+            set_client("newsapi", NewsApiHttpClient(api_key="test", base_url=stub.url))
+            results = self.fire(news_fetcher.fetch_global_articles, *[()] * 10)
+
+        # One upstream call per category, whatever the number of concurrent callers
+        self.assertCountEqual([r["category"] for r in stub.requests], news_fetcher.CATEGORIES)
+        self.assertTrue(all(result == results[0] for result in results))
+
+    def test_concurrent_local_refreshes_share_one_fetch_per_locality(self):
+        nearby = [(30.2672 + i / 10000, -97.7431) for i in range(10)]
+        with StubNewsAPI(delay=0.3) as stub:
+            set_client("newsapi", NewsApiHttpClient(api_key="test", base_url=stub.url))
+            results = self.fire(news_fetcher.fetch_local_articles, *nearby)
+
+        self.assertEqual(len(stub.requests), len(news_fetcher.CATEGORIES))
+        self.assertEqual({result["location"] for result in results}, {"Austin, Texas"})
+
+
+def raw_articles(count, prefix="a"):
+    """Builds ``count`` NewsAPI-shaped articles with unique URLs."""
+    return [
+        {
+            "title": f"Headline {i}",
+            "url": f"https://example.com/{prefix}/{i}",
+            "source": {"name": "Stub"},
+            "publishedAt": "2025-03-01T12:00:00Z",
+        }
+        for i in range(count)
+    ]
+
+
+class BulkIngestionTests(TestCase):
+
+    def test_batch_is_written_in_a_few_queries(self):
+        rows = normalize_articles(raw_articles(100), "business")
+        rows += rows[:10]  # Duplicates within the response are dropped in memory
+
+        # SAVEPOINT, existing-URL lookup, near-duplicate window, ID lookups before and after the bulk
+        # INSERT (2 statements: SQLite allows 999 parameters per statement), placement INSERT, RELEASE
+        with self.assertNumQueries(9):
+            created_ids = ingest_articles(rows, ArticleScope.GLOBAL)
+
+        self.assertEqual(len(created_ids), 100)
+        self.assertEqual(NewsArticle.objects.filter(category="Business").count(), 100)
+
+    def test_rows_inserted_concurrently_are_not_reported(self):
+        rows = normalize_articles(raw_articles(3), "business")
+        rivals = [normalize_articles(raw_articles(1), "business")]
+
+        def insert_rival(execute, sql, params, many, context):
+            # Another worker stores the first URL while this batch is being clustered
+            if "title_simhash" in sql and rivals:
+                ingest_articles(rivals.pop(), ArticleScope.LOCAL, "Austin, Texas")
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(insert_rival):
+            created_ids = ingest_articles(rows, ArticleScope.GLOBAL)
+
+        self.assertCountEqual(
+            NewsArticle.objects.filter(id__in=created_ids).values_list("url", flat=True),
+            ["https://example.com/a/1", "https://example.com/a/2"],
+        )
+        self.assertEqual(NewsArticle.objects.count(), 3)
+
+    def test_rows_with_a_bad_date_are_skipped(self):
+        articles = raw_articles(4)
+        articles[1]["publishedAt"] = "yesterday"
+        del articles[2]["publishedAt"]
+        articles[3]["publishedAt"] = None
+
+        with self.assertLogs("app.services.ingestion", "WARNING") as logs:
+            rows = normalize_articles(articles, "business")
+
+        self.assertEqual([row["url"] for row in rows], ["https://example.com/a/0"])
+        self.assertEqual(len(logs.output), 3)
+
+    def test_only_new_urls_are_reported(self):
+        ingest_articles(normalize_articles(raw_articles(5), "science"), ArticleScope.GLOBAL)
+        rows = normalize_articles(raw_articles(5) + raw_articles(3, prefix="b"), "science")
+
+        created_ids = ingest_articles(rows, ArticleScope.GLOBAL)
+
+        self.assertCountEqual(
+            NewsArticle.objects.filter(id__in=created_ids).values_list("url", flat=True),
+            [f"https://example.com/b/{i}" for i in range(3)],
+        )
+
+
+@override_settings(NEWS_RETENTION_DAYS={"global": 7, "local": 3})
+class PurgeTests(TestCase):
+    def setUp(self):
+        # raw_articles() are published on 2025-03-01, past every retention window
+        ingest_articles(normalize_articles(raw_articles(5), "health"), ArticleScope.GLOBAL)
+        local = normalize_articles(raw_articles(3, "b"), "health")
+        for row in local:
+            row["title"] = f"Austin {row['title']}"  # Other stories than the global headlines
+        ingest_articles(local, ArticleScope.LOCAL, "Austin, Texas")
+        self.recent = normalize_articles(raw_articles(2, "c"), "health")
+        for row in self.recent:
+            row["published_at"] = now() - timedelta(days=2)
+        ingest_articles(self.recent, ArticleScope.GLOBAL)
+
+    def test_old_articles_are_purged_in_batches(self):
+        results = purge_old_articles(batch_size=2)
+
+        self.assertEqual([(r["scope"], r["removed"], r["deleted"]) for r in results], [("global", 5, 5), ("local", 3, 3)])
+        self.assertCountEqual(Article.objects.values_list("url", flat=True), [row["url"] for row in self.recent])
+
+    def test_purge_does_not_load_the_rows_it_deletes(self):
+        with CaptureQueriesContext(connection) as queries:
+            purge_old_articles(days=0)
+
+        statements = [query["sql"] for query in queries]
+        self.assertFalse([sql for sql in statements if sql.startswith("SELECT") and '"title"' in sql])
+        # Per scope: its placements, then the orphaned articles' placements and the articles
+        self.assertEqual(len([sql for sql in statements if sql.startswith("DELETE")]), 6)
+
+    def test_zero_days_purges_everything(self):
+        stdout = StringIO()
+        call_command("delete_old_news", days=0, stdout=stdout)
+
+        self.assertFalse(Article.objects.exists())
+        self.assertFalse(ArticleScope.objects.exists())
+        self.assertIn("Unlisted 7 old global articles", stdout.getvalue())
+
+
+class UnifiedStoreTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.rows = normalize_articles(raw_articles(2), "health")
+
+    def test_an_article_in_several_feeds_is_stored_and_scored_once(self):
+        ingest_articles(self.rows, ArticleScope.GLOBAL)
+        analyze_sentiment()
+
+        self.assertEqual(ingest_articles(self.rows, ArticleScope.LOCAL, "Austin, Texas"), [])
+        ingest_articles(self.rows[:1], ArticleScope.LOCAL, "Denver, Colorado")
+
+        self.assertEqual(Article.objects.count(), 2)
+        self.assertEqual(NewsArticle.objects.count(), 2)
+        self.assertEqual(LocalNews.objects.count(), 2)  # Each article once, whatever its locations
+        self.assertEqual(Article.objects.in_scope(ArticleScope.LOCAL, "Denver, Colorado").count(), 1)
+        self.assertEqual(analyze_sentiment(), 0)
+        # Rollups count the article in every feed listing it
+        local = SentimentRollup.objects.filter(scope=ArticleScope.LOCAL, granularity="day")
+        self.assertEqual(sum(local.values_list("count", flat=True)), 3)
+
+    def test_purge_keeps_articles_listed_elsewhere(self):
+        ingest_articles(self.rows, ArticleScope.GLOBAL)
+        ingest_articles(self.rows[:1], ArticleScope.LOCAL, "Austin, Texas")
+
+        result = purge_scope(ArticleScope.GLOBAL, days=0)
+
+        self.assertEqual((result["removed"], result["deleted"]), (2, 1))
+        self.assertFalse(NewsArticle.objects.exists())
+        self.assertEqual(LocalNews.objects.get().url, self.rows[0]["url"])
+
+    def test_local_export_has_a_row_per_location(self):
+        ingest_articles(self.rows[:1], ArticleScope.LOCAL, "Austin, Texas")
+        ingest_articles(self.rows[:1], ArticleScope.LOCAL, "Denver, Colorado")
+
+        response = self.client.get("/export?scope=local&format=csv")
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(lines[0], "id,title,source,url,published_at,category,sentiment,location")
+        self.assertEqual(len(lines), 3)
+        denver = self.client.get("/export?scope=local&location=Denver, Colorado")
+        self.assertEqual(len(b"".join(denver.streaming_content).splitlines()), 1)
+
+
+@override_settings(LOCAL_FEED_HOT_READS=2)
+class LocalFeedTests(TestCase):
+    AUSTIN, DENVER = (30.2672, -97.7431), (39.7392, -104.9903)
+
+    def setUp(self):
+        cache.clear()
+        self.geocoder = StubGeocoder(lambda lat, lon: "Austin, Texas" if lat < 35 else "Denver, Colorado")
+        self.enterContext(override_clients(geocoder=self.geocoder))
+        for location in ("Austin, Texas", "Denver, Colorado"):
+            mark_fetched(local_scope(location), news_fetcher.CATEGORIES)
+        ingest_articles(normalize_articles(raw_articles(3), "sports"), ArticleScope.LOCAL, "Austin, Texas")
+        ingest_articles(normalize_articles(raw_articles(2, "b"), "health"), ArticleScope.LOCAL, "Denver, Colorado")
+
+    def get(self, coordinates, **params):
+        lat, lon = coordinates
+        return self.client.get("/fetch_local_news", {"lat": lat, "lon": lon, **params}).json()
+
+    def test_only_the_users_locality_is_served(self):
+        austin = self.get(self.AUSTIN)
+
+        self.assertEqual(austin["location"], "Austin, Texas")
+        self.assertEqual(len(austin["articles"]), 3)
+        self.assertEqual(austin["facets"]["categories"], [{"value": "Sports", "count": 3}])
+        self.assertEqual(len(self.get(self.DENVER, category="Health")["articles"]), 2)
+        self.assertEqual(self.client.get("/fetch_local_news").status_code, 400)
+
+    def test_the_locality_is_resolved_once_per_read(self):
+        def geocodes():
+            return GEOCODE_SECONDS.count(cached="true") + GEOCODE_SECONDS.count(cached="false")
+
+        for _ in range(2):  # Uncached, then from the response cache
+            before = geocodes()
+            self.assertEqual(self.get(self.AUSTIN)["location"], "Austin, Texas")
+            self.assertEqual(geocodes() - before, 1)
+
+    def test_non_finite_or_off_globe_coordinates_are_rejected(self):
+        for lat, lon in (("nan", "0"), ("0", "inf"), ("1e400", "0"), ("91", "0"), ("0", "-180.5")):
+            with self.subTest(lat=lat, lon=lon):
+                response = self.client.get("/fetch_local_news", {"lat": lat, "lon": lon})
+                self.assertEqual(response.status_code, 400)
+        # Nor were they geocoded or revalidated on the way in
+        self.assertEqual(self.geocoder.calls, [])
+        with self.assertRaises(ValueError):
+            parse_coordinates("-inf", "0")
+        self.assertEqual(parse_coordinates("-90", "180"), (-90.0, 180.0))
+
+    def test_hot_localities_are_served_from_feeds_refreshed_by_ingestion(self):
+        self.get(self.AUSTIN)
+        self.get(self.AUSTIN, page_size=2)  # Second read: Austin is hot, its feeds are built
+        ingest_articles(normalize_articles(raw_articles(1, "c"), "sports"), ArticleScope.LOCAL, "Austin, Texas")
+
+        # First pages come from the rebuilt feeds without querying the partition
+        with self.assertNumQueries(0):
+            first = self.get(self.AUSTIN, category="Sports", page_size=2)
+        self.assertEqual(len(first["articles"]), 2)
+        second = self.get(self.AUSTIN, category="Sports", page_size=2, cursor=first["next"])
+        self.assertEqual(len(second["articles"]), 2)
+        self.assertIsNone(second["next"])
+
+
+class FacetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        ingest_articles(normalize_articles(raw_articles(3), "health"), ArticleScope.GLOBAL)
+        ingest_articles(normalize_articles(raw_articles(2, "b"), "sports"), ArticleScope.GLOBAL)
+        NewsArticle.objects.filter(url__endswith="/0").update(sentiment="Positive")
+
+    def test_counts_follow_the_queryset_filters(self):
+        self.assertEqual(count_facets(NewsArticle.objects.all()), {
+            "categories": [{"value": "Health", "count": 3}, {"value": "Sports", "count": 2}],
+            "sentiments": [{"value": "Neutral", "count": 3}, {"value": "Positive", "count": 2}],
+        })
+        self.assertEqual(count_facets(NewsArticle.objects.filter(category="Health")), {
+            "categories": [{"value": "Health", "count": 3}],
+            "sentiments": [{"value": "Neutral", "count": 2}, {"value": "Positive", "count": 1}],
+        })
+        self.assertEqual(count_facets(NewsArticle.objects.filter(sentiment="Negative")), {"categories": [], "sentiments": []})
+
+    def test_cached_counts_are_invalidated_by_writes(self):
+        get_facets(NewsArticle)
+        with self.assertNumQueries(0):
+            get_facets(NewsArticle)
+
+        ingest_articles(normalize_articles(raw_articles(1, "c"), "health"), ArticleScope.GLOBAL)
+
+        self.assertEqual(get_facets(NewsArticle)["categories"][0], {"value": "Health", "count": 4})
+
+
+class CursorPaginationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        mark_fetched(news_fetcher.GLOBAL_SCOPE, news_fetcher.CATEGORIES)
+        # Every article has the same published_at: only the id orders them
+        ingest_articles(normalize_articles(raw_articles(5), "health"), ArticleScope.GLOBAL)
+
+    def test_cursor_round_trip(self):
+        published_at = now().replace(microsecond=123456)
+
+        self.assertEqual(decode_cursor(encode_cursor(published_at, 42)), (published_at, 42))
+        with self.assertRaises(InvalidCursor):
+            decode_cursor("not-a-cursor")
+
+    def test_ties_on_published_at_are_broken_by_id(self):
+        articles = NewsArticle.objects.values("id", "published_at")
+        pages, cursor = [], None
+        while True:
+            page, cursor = paginate(articles, cursor, page_size=2)
+            pages.append([row["id"] for row in page])
+            if cursor is None:
+                break
+
+        self.assertEqual(len(pages), 3)
+        self.assertEqual(sum(pages, []), sorted(NewsArticle.objects.values_list("id", flat=True), reverse=True))
+
+    def test_malformed_cursor_is_rejected(self):
+        def packed(raw):
+            return urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+        published_at = now().isoformat()
+        cursors = ["garbage", packed(f'["{published_at}", 1e400]'), packed(f'["{published_at}", 1.5]'),
+                   packed(f'["{published_at}", true]'), packed(f'["{published_at}", {2 ** 64}]'), packed('[1, 2]')]
+        for cursor in cursors:
+            with self.subTest(cursor=cursor):
+                response = self.client.get("/", {"cursor": cursor}, HTTP_X_REQUESTED_WITH="XMLHttpRequest")
+                self.assertEqual(response.status_code, 400)
+
+
+@skipUnless(connection.vendor == "sqlite", "EXPLAIN output is SQLite specific")
+class QueryPlanTests(TestCase):
+    """Keeps the list, filter and purge queries index-backed (no full scans or temp sorts)."""
+
+    def assertUsesIndex(self, queryset, index_name):
+        plan = queryset.explain()
+        self.assertRegex(plan, rf"USING (COVERING )?INDEX {index_name}\b")
+        self.assertNotIn("TEMP B-TREE", plan)
+
+    def test_global_list_queries(self):
+        articles = NewsArticle.objects.values(*ARTICLE_FIELDS).order_by(*ORDERING)
+        self.assertUsesIndex(articles[:31], "article_published_idx")
+        self.assertUsesIndex(articles.filter(category="Business")[:31], "article_category_idx")
+        self.assertUsesIndex(articles.filter(sentiment="Positive")[:31], "article_sentiment_idx")
+        self.assertUsesIndex(
+            articles.filter(category="Business", sentiment="Positive")[:31], "article_cat_sentiment_idx"
+        )
+
+    def test_local_list_queries(self):
+        articles = LocalNews.objects.values(*ARTICLE_FIELDS).order_by(*ORDERING)
+        self.assertUsesIndex(articles.filter(category="Sports")[:31], "article_category_idx")
+        # One locality's page reads its partition through the placement index only
+        located = Article.objects.in_scope(ArticleScope.LOCAL, "Austin, Texas").values(*ARTICLE_FIELDS)
+        plan = located.order_by(*ORDERING)[:31].explain()
+        self.assertRegex(plan, r"SEARCH app_articlescope USING COVERING INDEX \w+ \(scope=\? AND location=\?\)")
+        self.assertNotRegex(plan, r"SCAN app_article\b")
+
+    def test_purge_query(self):
+        cutoff = now() - timedelta(days=7)
+        self.assertUsesIndex(Article.objects.filter(published_at__lt=cutoff).order_by().values("id"), "article_published_idx")
+
+
+@override_settings(NEWSAPI_RETRIES=1)
+class RevalidationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(set_client, "newsapi", None)
+        fresh_scheduler(self)
+        celery_app.conf.task_always_eager = True
+        self.addCleanup(setattr, celery_app.conf, "task_always_eager", False)
+
+    def titles(self):
+        response = self.client.get("/", HTTP_X_REQUESTED_WITH="XMLHttpRequest")
+        self.assertEqual(response.status_code, 200)
+        return [article["title"] for article in response.json()["articles"]]
+
+    def test_expired_news_is_fetched_before_responding(self):
+        with StubNewsAPI(delay=0) as stub:
+            set_client("newsapi", NewsApiHttpClient(api_key="test", base_url=stub.url))
+            titles = self.titles()
+
+        self.assertEqual(len(stub.requests), len(news_fetcher.CATEGORIES))
+        self.assertEqual(len(titles), 2 * len(news_fetcher.CATEGORIES))
+
+    @override_settings(NEWS_FRESHNESS={"default": (0, 60 * 60)})
+    def test_stale_news_is_refreshed_in_the_background(self):
+        ingest_articles(normalize_articles(raw_articles(1), "health"), ArticleScope.GLOBAL)
+        mark_fetched(news_fetcher.GLOBAL_SCOPE, news_fetcher.CATEGORIES)
+
+        with StubNewsAPI(delay=0) as stub:
+            set_client("newsapi", NewsApiHttpClient(api_key="test", base_url=stub.url))
+            self.titles()
+
+        # The refresh chain ran (eagerly here) and released the scope's lock when it ended
+        self.assertEqual(len(stub.requests), len(news_fetcher.CATEGORIES))
+        self.assertIsNone(cache.get("revalidating_global"))
+        self.assertEqual(NewsArticle.objects.count(), 1 + 2 * len(news_fetcher.CATEGORIES))
+
+    def test_failed_fetches_back_off(self):
+        ingest_articles(normalize_articles(raw_articles(1), "health"), ArticleScope.GLOBAL)
+
+        with StubNewsAPI(delay=0, failures=100) as stub:
+            set_client("newsapi", NewsApiHttpClient(api_key="test", base_url=stub.url))
+            first = self.titles()
+            second = self.titles()
+
+        # Readers after the failed fetch are served what is stored without calling NewsAPI
+        self.assertEqual(len(stub.requests), len(news_fetcher.CATEGORIES))
+        self.assertEqual(first, second)
+        self.assertEqual(len(second), 1)
+
+
+class ResponseCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = Client(HTTP_X_REQUESTED_WITH="XMLHttpRequest")
+        mark_fetched(news_fetcher.GLOBAL_SCOPE, news_fetcher.CATEGORIES)  # Keep the views off NewsAPI
+        ingest_articles(normalize_articles(raw_articles(3), "health"), ArticleScope.GLOBAL)
+
+    def test_repeated_requests_skip_the_database(self):
+        first = self.client.get("/?category=Health")
+
+        with self.assertNumQueries(0):
+            second = self.client.get("/?category=Health")
+            not_modified = self.client.get("/?category=Health", HTTP_IF_NONE_MATCH=first["ETag"])
+
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(not_modified.status_code, 304)
+
+    def test_ingestion_invalidates_cached_responses(self):
+        first = self.client.get("/?category=Health")
+        ingest_articles(normalize_articles(raw_articles(1, "b"), "health"), ArticleScope.GLOBAL)
+
+        second = self.client.get("/?category=Health", HTTP_IF_NONE_MATCH=first["ETag"])
+
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(len(second.json()["articles"]), 4)
+
+
+class ExportTests(TestCase):
+    def setUp(self):
+        ingest_articles(normalize_articles(raw_articles(3), "health"), ArticleScope.GLOBAL)
+        ingest_articles(normalize_articles(raw_articles(2, "b"), "sports"), ArticleScope.GLOBAL)
+
+    def test_ndjson_export_streams_filtered_rows(self):
+        response = self.client.get("/export?category=Health")
+
+        self.assertTrue(response.streaming)
+        rows = [json.loads(line) for line in b"".join(response.streaming_content).decode().splitlines()]
+        self.assertEqual(len(rows), 3)
+        self.assertEqual({row["category"] for row in rows}, {"Health"})
+
+    def test_csv_export_has_a_header(self):
+        response = self.client.get("/export?format=csv")
+
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(lines[0], "id,title,source,url,published_at,category,sentiment")
+        self.assertEqual(len(lines), 6)
+
+    def test_bare_dates_cover_the_whole_day(self):
+        def exported(**params):
+            response = self.client.get("/export", params)
+            return len(b"".join(response.streaming_content).splitlines())
+
+        # The articles are published at noon on 2025-03-01
+        self.assertEqual(exported(until="2025-03-01"), 5)
+        self.assertEqual(exported(since="2025-03-01", until="2025-03-01"), 5)
+        self.assertEqual(exported(until="2025-03-01T11:00:00Z"), 0)
+        self.assertEqual(exported(since="2025-03-02"), 0)
+
+    def test_invalid_filters_are_rejected(self):
+        self.assertEqual(self.client.get("/export?since=yesterday").status_code, 400)
+        self.assertEqual(self.client.get("/export?location=Paris").status_code, 400)
+
+
+class AlwaysPositiveScorer(SentimentScorer):
+    version = 99
+
+    def score_batch(self, titles, categories):
+        return ["Positive"] * len(titles)
+
+
+class KeywordMatcherTests(TestCase):
+    def test_phrases_match_whole_words(self):
+        matcher = get_matcher()
+
+        self.assertEqual(matcher.flags("Rookie helps Jets pull off upset"), POSITIVE)
+        self.assertEqual(matcher.flags("Hope is fading for missing hikers"), NEGATIVE)
+        self.assertEqual(matcher.flags("Officials say there is no hope left"), NEGATIVE)
+        self.assertEqual(matcher.flags("Doctors say she is in GOOD HEALTH."), POSITIVE)
+        self.assertEqual(matcher.flags("Record losses as markets crash"), POSITIVE | NEGATIVE)
+        # Terms inside longer words, or phrases with words in between, do not match
+        self.assertEqual(matcher.flags("Winter storm pulls officials away"), 0)
+        self.assertEqual(matcher.flags("Hope fading is not news"), 0)
+        self.assertEqual(matcher.flags("Pull the offer"), 0)
+
+    def test_overlapping_phrases_use_failure_links(self):
+        matcher = KeywordMatcher({"is fading": NEGATIVE, "hope is near": POSITIVE})
+
+        self.assertEqual(matcher.flags("hope is fading"), NEGATIVE)
+        self.assertEqual(matcher.flags("hope hope is near"), POSITIVE)
+
+
+class BatchScorerTests(TestCase):
+    TITLES = [
+        "Underdogs pull off a stunner in overtime",  # Positive phrase
+        "Hope is fading for the missing hikers",  # Negative phrase
+        "Markets crash despite record profits",  # Both: positive wins
+        "A wonderful day for the city",  # Polarity only
+        "Terrible storm hits the coast",
+        "Team plays on Sunday",  # Neutral polarity: positive for sports only
+        "",
+    ]
+
+    def test_labels_match_the_reference_scorer(self):
+        rng = random.Random(0)
+        titles = self.TITLES * 2 + [synthetic_headline(rng) for _ in range(500)]
+        categories = ["Sports"] * len(self.TITLES) + ["General"] * len(self.TITLES)
+        categories += [rng.choice(CATEGORIES) for _ in range(500)]
+
+        labels = BatchSentimentScorer().score_batch(titles, categories)
+
+        self.assertEqual(labels, KeywordTextBlobScorer().score_batch(titles, categories))
+        self.assertEqual(set(labels), {"Positive", "Negative", "Neutral"})
+
+
+class IncrementalScoringTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        get_scorer.cache_clear()
+        self.addCleanup(get_scorer.cache_clear)
+        self.created_ids = ingest_articles(normalize_articles(raw_articles(3), "health"), ArticleScope.GLOBAL)
+
+    def test_scored_articles_are_skipped(self):
+        self.assertEqual(analyze_sentiment(article_ids=self.created_ids[:1]), 1)
+        self.assertEqual(analyze_sentiment(), 2)
+
+        self.assertEqual(analyze_sentiment(), 0)
+        self.assertEqual(analyze_sentiment(article_ids=self.created_ids), 0)
+
+    def test_version_bump_rescores_stored_articles(self):
+        analyze_sentiment()
+
+        with override_settings(SENTIMENT_SCORER="app.tests.AlwaysPositiveScorer"):
+            get_scorer.cache_clear()
+            self.assertEqual(analyze_sentiment(), 3)
+            self.assertEqual(analyze_sentiment(), 0)
+
+        self.assertEqual(set(Article.objects.values_list("sentiment", "sentiment_version")), {("Positive", 99)})
+
+
+class SentimentRollupTests(TestCase):
+    def setUp(self):
+        ingest_articles(normalize_articles(raw_articles(3), "health"), ArticleScope.GLOBAL)
+        analyze_sentiment()
+
+    def counts(self):
+        return {
+            (row.granularity, row.category, row.sentiment): row.count
+            for row in SentimentRollup.objects.filter(count__gt=0)
+        }
+
+    def test_scoring_maintains_the_rollups(self):
+        self.assertEqual(self.counts(), {("hour", "Health", "Neutral"): 3, ("day", "Health", "Neutral"): 3})
+
+        process_sentiment(Article.objects.all(), scorer=AlwaysPositiveScorer())
+
+        incremental = self.counts()
+        self.assertEqual(incremental, {("hour", "Health", "Positive"): 3, ("day", "Health", "Positive"): 3})
+        rebuild_rollups()
+        self.assertEqual(self.counts(), incremental)
+
+    def test_rollups_outlive_the_purge(self):
+        purge_scope(ArticleScope.GLOBAL, days=0, batch_size=100)
+
+        self.assertFalse(NewsArticle.objects.exists())
+        self.assertEqual(self.counts()[("day", "Health", "Neutral")], 3)
+
+    def test_trends_endpoint(self):
+        response = self.client.get("/trends?granularity=hour&since=2025-03-01&until=2025-03-01")
+
+        self.assertEqual(response.json()["trends"], [
+            {"bucket": "2025-03-01T12:00:00+00:00", "category": "Health", "total": 3, "counts": {"Neutral": 3}},
+        ])
+        self.assertEqual(self.client.get("/trends?granularity=week").status_code, 400)
+
+
+@skipUnless(connection.vendor == "sqlite", "Checks the SQLite FTS5 index")
+class HeadlineSearchTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        mark_fetched(news_fetcher.GLOBAL_SCOPE, news_fetcher.CATEGORIES)
+        rows = normalize_articles(raw_articles(3), "health")
+        rows[0]["title"] = "Vaccine trial results announced"
+        rows[1]["title"] = "Vaccine maker shares fall after vaccine recall"
+        ingest_articles(rows, ArticleScope.GLOBAL)
+
+    def search(self, q, **params):
+        response = self.client.get("/", {"q": q, **params}, HTTP_X_REQUESTED_WITH="XMLHttpRequest")
+        return [article["title"] for article in response.json()["articles"]]
+
+    def test_results_are_ranked(self):
+        self.assertEqual(self.search("vaccine"), [
+            "Vaccine maker shares fall after vaccine recall",
+            "Vaccine trial results announced",
+        ])
+        self.assertEqual(self.search("vacc"), self.search("vaccine"))  # The last word matches as a prefix
+        self.assertEqual(self.search("vaccine OR \"trial"), [])  # Operators are plain text
+
+    def test_local_search_reads_the_locality_only(self):
+        local = normalize_articles(raw_articles(5, "local"), "general")
+        newer = normalize_articles(raw_articles(40, "global"), "general")
+        for row in local:
+            row["title"] = f"Storm warning {row['url'][-1]} for Springfield"
+        for row in newer:
+            row["title"] = f"Storm season outlook {row['url'].rsplit('/', 1)[1]}"
+            row["published_at"] += timedelta(days=1)
+        ingest_articles(local, ArticleScope.LOCAL, "Springfield, Illinois")
+        ingest_articles(newer, ArticleScope.GLOBAL)
+
+        articles = partition("Springfield, Illinois").values(*ARTICLE_FIELDS)
+        feed = {"scope": ArticleScope.LOCAL, "location": "Springfield, Illinois"}
+        # The 40 newer global matches would fill every candidate slot of an unscoped search
+        with self.settings(SEARCH_CANDIDATES=10):
+            page, next_cursor = search_page(articles, "storm", page_size=3, **feed)
+            rest, last_cursor = search_page(articles, "storm", cursor=next_cursor, page_size=3, **feed)
+            self.assertEqual(search_page(articles, "storm")[0], [])
+
+        self.assertEqual(len(page), 3)
+        self.assertEqual(len(rest), 2)
+        self.assertIsNone(last_cursor)
+        self.assertTrue(all("Springfield" in row["title"] for row in page + rest))
+        self.assertEqual(search_page(articles, "storm", {"category": "Sports"})[0], [])
+
+    def test_index_follows_updates_and_deletes(self):
+        NewsArticle.objects.filter(title__startswith="Vaccine trial").update(title="Measles trial results")
+        NewsArticle.objects.filter(title__startswith="Vaccine maker").delete()
+
+        self.assertEqual(self.search("vaccine"), [])
+        self.assertEqual(self.search("measles trial"), ["Measles trial results"])
+
+    def test_results_page_by_offset(self):
+        response = self.client.get("/", {"q": "vaccine", "page_size": 1}, HTTP_X_REQUESTED_WITH="XMLHttpRequest")
+        second = self.client.get(
+            "/", {"q": "vaccine", "page_size": 1, "cursor": response.json()["next"]},
+            HTTP_X_REQUESTED_WITH="XMLHttpRequest",
+        )
+
+        self.assertEqual(second.json()["articles"][0]["title"], "Vaccine trial results announced")
+        self.assertIsNone(second.json()["next"])
+
+
+class NearDuplicateTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        mark_fetched(news_fetcher.GLOBAL_SCOPE, news_fetcher.CATEGORIES)
+        self.rows = normalize_articles(raw_articles(3), "business")
+        self.rows[0]["title"] = "Fed raises interest rates by a quarter point - Stub"
+        self.rows[1]["title"] = "Fed raises interest rates by quarter point"
+        self.rows[2]["title"] = "Lakers beat Celtics in overtime thriller"
+
+    def test_near_duplicates_share_a_cluster(self):
+        ingest_articles(self.rows, ArticleScope.GLOBAL)
+
+        first, second, third = NewsArticle.objects.order_by("id")
+        self.assertEqual(first.cluster_id, first.title_simhash)
+        self.assertEqual(second.cluster_id, first.cluster_id)
+        self.assertEqual(third.cluster_id, third.title_simhash)
+
+    def test_stored_articles_seed_the_index(self):
+        ingest_articles(self.rows[:1], ArticleScope.GLOBAL)
+        ingest_articles(self.rows[1:], ArticleScope.GLOBAL)
+
+        self.assertEqual(NewsArticle.objects.values("cluster_id").distinct().count(), 2)
+
+    @override_settings(NEAR_DUPLICATE_DROP=True)
+    def test_near_duplicates_can_be_dropped(self):
+        self.assertEqual(len(ingest_articles(self.rows, ArticleScope.GLOBAL)), 2)
+
+    def test_collapsed_lists(self):
+        ingest_articles(self.rows, ArticleScope.GLOBAL)
+        headers = {"HTTP_X_REQUESTED_WITH": "XMLHttpRequest"}
+
+        self.assertEqual(len(self.client.get("/", **headers).json()["articles"]), 3)
+        self.assertEqual(len(self.client.get("/?collapse=1", **headers).json()["articles"]), 2)
+        self.assertEqual(len(self.client.get("/?collapse=1&q=fed", **headers).json()["articles"]), 1)
+
+    def local_titles(self, **params):
+        with override_clients(geocoder=StubGeocoder()):
+            response = self.client.get("/fetch_local_news", {"lat": 30.2672, "lon": -97.7431, **params})
+        return [article["title"] for article in response.json()["articles"]]
+
+    def test_local_near_duplicates_of_global_news_keep_the_story(self):
+        mark_fetched(local_scope("Austin, Texas"), news_fetcher.CATEGORIES)
+        ingest_articles(self.rows[:1], ArticleScope.GLOBAL)
+        ingest_articles(self.rows[1:], ArticleScope.LOCAL, "Austin, Texas")
+
+        # The global article the local one duplicates is listed locally too
+        self.assertEqual(self.local_titles(collapse=1), [self.rows[2]["title"], self.rows[0]["title"]])
+        self.assertEqual(len(self.local_titles()), 3)
+        self.assertEqual(NewsArticle.objects.count(), 1)
+
+    @override_settings(NEAR_DUPLICATE_DROP=True)
+    def test_dropped_local_near_duplicates_keep_the_story(self):
+        mark_fetched(local_scope("Austin, Texas"), news_fetcher.CATEGORIES)
+        ingest_articles(self.rows[:1], ArticleScope.GLOBAL)
+
+        self.assertEqual(len(ingest_articles(self.rows[1:2], ArticleScope.LOCAL, "Austin, Texas")), 0)
+        self.assertEqual(self.local_titles(), [self.rows[0]["title"]])
+
+
+class CountingScorer(SentimentScorer):
+    def __init__(self):
+        self.scored = []
+
+    def score_batch(self, titles, categories):
+        self.scored.extend(titles)
+        return ["Positive" if category == "Sports" else "Neutral" for category in categories]
+
+
+class ScoreCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_trivially_different_titles_are_scored_once(self):
+        scorer, score_cache = CountingScorer(), ScoreCache(maxsize=10)
+        titles = ["Markets close higher - Reuters", "markets  close higher", "MARKETS CLOSE HIGHER"]
+
+        labels = score_cache.score_batch(scorer, titles, ["Business"] * 3, ["Reuters", "", "AP"])
+
+        self.assertEqual(labels, ["Neutral"] * 3)
+        self.assertEqual(scorer.scored, ["markets close higher"])
+        self.assertEqual(score_cache.score_batch(scorer, ["Markets close higher"], ["Sports"]), ["Positive"])
+
+    def test_processes_share_labels_through_the_django_cache(self):
+        scorer = CountingScorer()
+        ScoreCache().score_batch(scorer, ["Rain expected"], ["General"])
+        other_process = ScoreCache()
+
+        other_process.score_batch(scorer, ["Rain expected"], ["General"])
+
+        self.assertEqual(len(scorer.scored), 1)
+        self.assertEqual(other_process.stats()["shared_hits"], 1)
+
+    def test_version_bump_invalidates(self):
+        scorer, score_cache = CountingScorer(), ScoreCache()
+        score_cache.score_batch(scorer, ["Rain expected"], ["General"])
+        scorer.version += 1
+
+        score_cache.score_batch(scorer, ["Rain expected"], ["General"])
+
+        self.assertEqual(len(scorer.scored), 2)
+
+    def test_local_lru_is_bounded(self):
+        score_cache = ScoreCache(maxsize=2)
+        score_cache.score_batch(CountingScorer(), ["a", "b", "c"], ["General"] * 3)
+
+        self.assertEqual(score_cache.stats()["size"], 2)
+
+
+class InstrumentationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        mark_fetched("global", news_fetcher.CATEGORIES)
+
+    def test_metrics_endpoint_exposes_view_and_write_metrics(self):
+        ingest_articles([{
+            "title": "Rates hold steady", "url": "https://example.com/rates", "source": "Wire",
+            "category": "Business", "published_at": now(),
+        }], ArticleScope.GLOBAL)
+        self.client.get("/", HTTP_X_REQUESTED_WITH="XMLHttpRequest")
+
+        body = self.client.get("/metrics").content.decode()
+
+        self.assertIn('news_view_seconds_count{view="index"} ', body)
+        self.assertIn('news_serialize_seconds_bucket{view="index",le="+Inf"} ', body)
+        self.assertGreaterEqual(DB_WRITE_ROWS.value(operation="ingest", model="Article"), 1)
+        self.assertGreaterEqual(VIEW_QUERIES.count(view="index"), 1)
+
+    @override_settings(SERVER_TIMING=True)
+    def test_server_timing_header(self):
+        response = self.client.get("/", HTTP_X_REQUESTED_WITH="XMLHttpRequest")
+
+        self.assertIn("serialize;dur=", response["Server-Timing"])
+        self.assertRegex(response["Server-Timing"], r'db;desc="\d+ queries";dur=[\d.]+, total;dur=')
+
+    @override_settings(SERVER_TIMING=False)
+    def test_server_timing_header_is_opt_in(self):
+        self.assertNotIn("Server-Timing", self.client.get("/about"))
+
+    def test_histogram_exposition_is_cumulative(self):
+        histogram = Histogram("test_seconds", "Test", ["stage"], buckets=(0.1, 1.0))
+        self.addCleanup(REGISTRY.remove, histogram)
+        histogram.observe(0.05, stage="a")
+        histogram.observe(0.5, stage="a")
+
+        lines = histogram.samples()
+
+        self.assertEqual(lines[:3], [
+            'test_seconds_bucket{stage="a",le="0.1"} 1',
+            'test_seconds_bucket{stage="a",le="1.0"} 2',
+            'test_seconds_bucket{stage="a",le="+Inf"} 2',
+        ])
+        self.assertEqual(lines[-1], 'test_seconds_count{stage="a"} 2')
+
+
+@override_settings(CACHES=BENCHMARK_CACHES)
+class BenchmarkSuiteTests(TestCase):
+    def test_suite_runs_offline_and_reports_json(self):
+        report = run_suite(sizes=[40], repeat=1, score_sample=10)
+
+        json.dumps(report)
+        result = report["results"][0]
+        self.assertEqual(NewsArticle.objects.filter(url__startswith="https://bench.example.com/global/").count(), 40)
+        self.assertEqual(result["fetch_news"]["articles"], 700)  # 7 categories x 100 stubbed articles
+        self.assertEqual(result["process_sentiment"]["cold"]["titles"], 10)
+        self.assertEqual(set(result["views"]), {"index", "index_filtered", "index_search", "fetch_local_news_view"})
+
+    def test_compare_flags_slower_medians_and_lower_throughput(self):
+        baseline = {"results": [{"rows": 1000, "views": {"index": {"cold": {"median_ms": 10.0}}},
+                                 "fetch_news": {"articles_per_second": 1000.0}}]}
+        report = {"results": [{"rows": 1000, "views": {"index": {"cold": {"median_ms": 11.0}}},
+                               "fetch_news": {"articles_per_second": 500.0}}]}
+
+        self.assertEqual(compare(report, baseline), ["1000 rows: fetch_news.articles_per_second 1000.0 -> 500.0/s"])
+        self.assertEqual(len(compare(report, baseline, tolerance=0.05)), 2)
+
+
+class ImportTimeTests(TestCase):
+    """Web and Celery workers import the views and tasks at startup; keep that cheap."""
+
+    HEAVY_MODULES = {"numpy", "textblob", "nltk", "opencage", "aiohttp", "requests"}
+    # A guard against gross regressions only (the heavy modules are what keep startup cheap):
+    # app.views took ~460 ms while it imported them. Slow or loaded machines can raise it.
+    BUDGET_MS = float(os.environ.get("IMPORT_TIME_BUDGET_MS", 1000))
+
+    def import_times(self, statement):
+        """Runs ``statement`` in a fresh interpreter under ``-X importtime``; returns ``{module: cumulative ms}``."""
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import django; django.setup(); {statement}"],
+            cwd=settings.BASE_DIR, env=os.environ.copy(), capture_output=True, text=True, check=True,
+        )
+        times = {}
+        for line in result.stderr.splitlines():
+            if line.startswith("import time:") and "|" in line:
+                _, cumulative, name = line.split("|")
+                if cumulative.strip().isdigit():
+                    times[name.strip()] = int(cumulative) / 1000
+        return times
+
+    def test_startup_imports_skip_heavy_dependencies(self):
+        times = self.import_times("import app.views, app.automation.tasks, app.management.commands.delete_old_news")
+
+        self.assertEqual({name.split(".")[0] for name in times} & self.HEAVY_MODULES, set())
+        self.assertLess(times["app.views"], self.BUDGET_MS)
@@ -4,6 +4,10 @@ from . import views
 urlpatterns = [
     path('', views.index, name='index'),
     path('refresh', views.refresh_articles, name='refresh_articles'),
+    path('refresh/<str:job_id>', views.refresh_status, name='refresh_status'),
     path('fetch_local_news', views.fetch_local_news_view, name='fetch_local_news'),  # New local news route
+    path('export', views.export_news, name='export_news'),
+    path('trends', views.trends, name='trends'),
+    path('metrics', views.metrics, name='metrics'),
     path('about', views.about, name='about'),
 ]
@@ -1,91 +1,250 @@
+from functools import wraps
 from django.shortcuts import render
-from django.http import JsonResponse
-from .models import NewsArticle, LocalNews
-from app.services.news_fetcher import fetch_news, fetch_local_news
-from app.services.sentiment_analyzer import analyze_sentiment
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.urls import reverse
+from .models import ArticleScope, NewsArticle, LocalNews
+from app.automation.jobs import get_job
+from app.automation.tasks import enqueue_refresh, revalidate_news
+from app.services.demand import record_demand
+from app.services.export import FORMATS, export_queryset, iter_export, parse_moment
+from app.services.facets import count_facets, get_facets
+from app.services.freshness import local_scope
+from app.services.geocoding import local_location, parse_coordinates
+from app.services.local_feeds import feed_page, get_feeds, partition
+from app.services.metrics import SERIALIZE_SECONDS, render as render_metrics
+from app.services.news_fetcher import GLOBAL_SCOPE
+from app.services.pagination import InvalidCursor, get_page_size, paginate
+from app.services.response_cache import cache_response
+from app.services.rollups import get_trends
+from app.services.search import search_page
+import logging
+
+logger = logging.getLogger(__name__)
+
+def stale_while_revalidate(local=False):
+    """Refresh stale news in the background (or expired news synchronously) before serving a list.
+
+    Local lists revalidate the locality of the request's ``lat``/``lon``, when valid, and
+    the view gets its resolved ``location`` as a keyword argument. Every read, cached or
+    not, counts towards the demand for its feed and category.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            category = request.GET.get("category", "").lower()
+            if not local:
+                record_demand(GLOBAL_SCOPE, category)
+                revalidate_news()
+            else:
+                try:
+                    lat, lon = parse_coordinates(request.GET.get("lat"), request.GET.get("lon"))
+                except ValueError:
+                    pass
+                else:
+                    kwargs["location"] = location = local_location(lat, lon)
+                    record_demand(local_scope(location), category)
+                    revalidate_news(lat, lon, location)
+            return view(request, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+ARTICLE_FIELDS = ("id", "title", "url", "published_at", "sentiment", "category")
+
+
+def serialize_articles(rows, view):
+    """Shape ``.values(*ARTICLE_FIELDS)`` rows for the JSON responses of ``view``."""
+    with SERIALIZE_SECONDS.time(span="serialize", view=view):
+        return [
+            {
+                "title": row["title"],
+                "url": row["url"],
+                "published_at": row["published_at"].strftime("%B %d, %Y %I:%M %p"),
+                "sentiment": row["sentiment"],
+                "category": row["category"],
+            }
+            for row in rows
+        ]
+
+
+def list_page(request, articles, filters, scope, location=None):
+    """One page of a news list: ranked headline matches when ``q`` is given, newest first otherwise.
+
+    ``articles`` reads the feed ``scope``/``location``. ``collapse=1`` keeps one article
+    per near-duplicate cluster.
+    """
+    query = request.GET.get("q", "").strip()
+    if request.GET.get("collapse") == "1":
+        filters = {**filters, "is_duplicate": False}
+    if query:
+        return search_page(
+            articles, query, filters, request.GET.get("cursor"), get_page_size(request), scope, location
+        )
+    return paginate(articles.filter(**filters), request.GET.get("cursor"), get_page_size(request))
 
+
+@stale_while_revalidate()
+@cache_response(NewsArticle)
 def index(request):
-    """Retrieve global news articles with AJAX filtering."""
-    articles = NewsArticle.objects.all().order_by("-published_at")
+    """Retrieve global news articles with AJAX filtering and headline search, one page at a time."""
+    articles = NewsArticle.objects.values(*ARTICLE_FIELDS)
 
     selected_category = request.GET.get("category", "")
     selected_sentiment = request.GET.get("sentiment", "")
 
+    filters = {}
     if selected_category:
-        articles = articles.filter(category=selected_category)
+        filters["category"] = selected_category
     if selected_sentiment:
-        articles = articles.filter(sentiment=selected_sentiment)
+        filters["sentiment"] = selected_sentiment
+
+    try:
+        page, next_cursor = list_page(request, articles, filters, ArticleScope.GLOBAL)
+    except InvalidCursor:
+        return JsonResponse({"status": "error", "message": "Invalid cursor."}, status=400)
 
     if request.headers.get("X-Requested-With") == "XMLHttpRequest":
-        return JsonResponse({"articles": [
-            {
-                "title": article.title,
-                "url": article.url,
-                "published_at": article.published_at.strftime("%B %d, %Y %I:%M %p"),
-                "sentiment": article.sentiment,
-                "category": article.category,
-            }
-            for article in articles
-        ]})
+        return JsonResponse({"articles": serialize_articles(page, "index"), "next": next_cursor})
 
-    categories = sorted(set(NewsArticle.objects.values_list("category", flat=True)))
-    sentiments = sorted(set(NewsArticle.objects.values_list("sentiment", flat=True)))
+    facets = get_facets(NewsArticle)
 
     return render(request, "index.html", {
-        "articles": articles,
-        "categories": categories,
-        "sentiments": sentiments,
+        "articles": page,
+        "next_cursor": next_cursor,
+        "categories": facets["categories"],
+        "sentiments": facets["sentiments"],
         "selected_category": selected_category,
         "selected_sentiment": selected_sentiment,
+        "query": request.GET.get("q", ""),
     })
 
 def refresh_articles(request):
-    """Refresh both global and local news dynamically using the user's location."""
-    fetch_news()  # Refresh global news
+    """Queue a refresh of global and local news (using the user's location) on the Celery workers.
 
+    Responds immediately with a job ID; poll ``refresh_status`` for progress.
+    """
     lat = request.GET.get("lat")
     lon = request.GET.get("lon")
 
     if lat and lon:
         try:
-            lat, lon = float(lat), float(lon)
-            fetch_local_news(lat, lon)  # Refresh local news dynamically
-            location_status = f"Local news refreshed for {lat}, {lon}."
+            lat, lon = parse_coordinates(lat, lon)
+            location_status = f"Local news refresh queued for {lat}, {lon}."
         except ValueError:
+            lat = lon = None
             location_status = "❌ Invalid location data. Refreshing only global news."
     else:
+        lat = lon = None
         location_status = "⚠️ No location provided. Refreshing only global news."
 
-    analyze_sentiment()  # Update sentiment scores
-
-    return JsonResponse({"status": "success", "message": f"Global & Local articles refreshed! {location_status}"})
-
-
-def fetch_local_news_view(request):
-    """Retrieve existing local news articles from the database with filtering."""
-    lat = request.GET.get("lat")
-    lon = request.GET.get("lon")
+    try:
+        job_id = enqueue_refresh(lat, lon)
+    except Exception as e:
+        logger.error(f"❌ Could not queue refresh: {str(e)}")
+        return JsonResponse({"status": "error", "message": "Refresh queue is unavailable, try again later."}, status=503)
+
+    return JsonResponse({
+        "status": "queued",
+        "job_id": job_id,
+        "status_url": reverse("refresh_status", args=[job_id]),
+        "message": f"Global & Local article refresh queued! {location_status}",
+    }, status=202)
+
+
+def refresh_status(request, job_id):
+    """Report the progress of a queued refresh job."""
+    job = get_job(job_id)
+    if job is None:
+        return JsonResponse({"status": "error", "message": "Unknown or expired refresh job."}, status=404)
+    return JsonResponse({"status": job["state"], **job})
+
+
+@stale_while_revalidate(local=True)
+@cache_response(LocalNews)
+def fetch_local_news_view(request, location=None):
+    """Retrieve the local news of the user's locality with filtering and headline search, one page at a time.
+
+    Only the locality's own partition is read; first pages of hot localities come from
+    their precomputed feeds (see ``app.services.local_feeds``).
+    """
+    if location is None:  # Set by stale_while_revalidate from valid coordinates only
+        return JsonResponse({"status": "error", "message": "Valid lat and lon are required."}, status=400)
     category = request.GET.get("category", "")
     sentiment = request.GET.get("sentiment", "")
 
-    articles = LocalNews.objects.all().order_by("-published_at")
-
-    # Apply filters
-    if category:
-        articles = articles.filter(category=category)
-    if sentiment:
-        articles = articles.filter(sentiment=sentiment)
-
-    return JsonResponse({"articles": [
-        {
-            "title": article.title,
-            "url": article.url,
-            "published_at": article.published_at.strftime("%B %d, %Y %I:%M %p"),
-            "sentiment": article.sentiment,
-            "category": article.category,
-        }
-        for article in articles
-    ]})
+    feeds = get_feeds(location)
+    first_page = not (request.GET.get("cursor") or request.GET.get("q", "").strip() or request.GET.get("collapse") == "1")
+    result = feed_page(feeds, category, sentiment, get_page_size(request)) if feeds and first_page else None
+
+    if result is None:
+        # Apply filters
+        filters = {}
+        if category:
+            filters["category"] = category
+        if sentiment:
+            filters["sentiment"] = sentiment
+
+        try:
+            result = list_page(
+                request, partition(location).values(*ARTICLE_FIELDS), filters, ArticleScope.LOCAL, location
+            )
+        except InvalidCursor:
+            return JsonResponse({"status": "error", "message": "Invalid cursor."}, status=400)
+    page, next_cursor = result
+
+    response = {"location": location, "articles": serialize_articles(page, "fetch_local_news"), "next": next_cursor}
+    if not request.GET.get("cursor"):
+        # Dropdown values, sent with the first page only
+        response["facets"] = feeds["facets"] if feeds else count_facets(partition(location))
+    return JsonResponse(response)
+
+
+def export_news(request):
+    """Stream the article archive as NDJSON or CSV with date/category/sentiment/location filters."""
+    export_format = request.GET.get("format", "ndjson")
+    scope = request.GET.get("scope", "global")
+    if export_format not in FORMATS:
+        return JsonResponse({"status": "error", "message": f"Invalid format: expected one of {', '.join(FORMATS)}"}, status=400)
+
+    try:
+        queryset = export_queryset(
+            scope,
+            since=request.GET.get("since"),
+            until=request.GET.get("until"),
+            category=request.GET.get("category"),
+            sentiment=request.GET.get("sentiment"),
+            location=request.GET.get("location"),
+        )
+    except ValueError as e:
+        return JsonResponse({"status": "error", "message": str(e)}, status=400)
+
+    response = StreamingHttpResponse(iter_export(queryset, export_format), content_type=FORMATS[export_format])
+    response["Content-Disposition"] = f'attachment; filename="{scope}-news.{export_format}"'
+    return response
+
+
+@cache_response(NewsArticle, LocalNews)
+def trends(request):
+    """Sentiment counts per hour/day bucket and category, read from the precomputed rollups."""
+    try:
+        since = request.GET.get("since")
+        until = request.GET.get("until")
+        points = get_trends(
+            granularity=request.GET.get("granularity", "day"),
+            scope=request.GET.get("scope", "global"),
+            since=parse_moment(since, "since") if since else None,
+            until=parse_moment(until, "until", end_of_day=True) if until else None,
+            category=request.GET.get("category"),
+            location=request.GET.get("location"),
+        )
+    except ValueError as e:
+        return JsonResponse({"status": "error", "message": str(e)}, status=400)
+    return JsonResponse({"trends": points})
+
+
+def metrics(request):
+    """Hot-path metrics of this process in the Prometheus text format."""
+    return HttpResponse(render_metrics(), content_type="text/plain; version=0.0.4; charset=utf-8")
 
 
 def about(request):
@@ -8,6 +8,7 @@ app = Celery("config")
 app.config_from_object("django.conf:settings", namespace="CELERY")
 
 app.autodiscover_tasks()
+app.autodiscover_tasks(["app.automation"])  # Beat schedule tasks live in app.automation.tasks
 
 app.conf.beat_schedule = {
     "fetch-news-every-6-hours": {
@@ -16,6 +16,7 @@ from dotenv import load_dotenv
 
 load_dotenv()
 NEWSAPI_KEY = os.getenv("NEWSAPI_KEY")
+GEOCODING_API_KEY = os.getenv("GEOCODING_API_KEY")  # OpenCage
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -53,6 +54,7 @@ INSTALLED_APPS = [
 TAILWIND_APP_NAME = "theme"
 
 MIDDLEWARE = [
+    'app.middleware.ServerTimingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -152,5 +154,90 @@ STATIC_ROOT = BASE_DIR / "staticfiles"
 CELERY_BROKER_URL = "redis://localhost:6379/0"
 CELERY_ACCEPT_CONTENT = ["json"]
 CELERY_TASK_SERIALIZER = "json"
-
-
+CELERY_RESULT_SERIALIZER = "json"
+CELERY_TASK_IGNORE_RESULT = True  # Refresh progress is tracked in the cache, see app/automation/jobs.py
+
+
+# Sentiment scoring
+SENTIMENT_SCORER = "app.services.sentiment_engine.BatchSentimentScorer"
+SENTIMENT_BATCH_SIZE = 1000
+SENTIMENT_LEXICON_FILES = []  # Extra "positive: term" / "negative: term" lexicons, see keyword_matcher.load_lexicon
+SENTIMENT_CACHE_SIZE = 10000  # Labels memoized per process, in front of the shared cache
+SENTIMENT_CACHE_TIMEOUT = 7 * 24 * 60 * 60  # Seconds a label stays in the shared cache
+
+# NewsAPI client
+NEWSAPI_BASE_URL = "https://newsapi.org/v2"
+NEWSAPI_TIMEOUT = 10  # Seconds per request
+NEWSAPI_MAX_WORKERS = 4  # Concurrent requests (and pooled connections) per fetch
+NEWSAPI_RETRIES = 3
+NEWSAPI_RETRY_BACKOFF = 0.5  # Base delay in seconds, doubled per attempt with full jitter
+
+# NewsAPI request scheduler (see app/services/scheduler.py): every request takes a token
+# (NEWSAPI_RATE per second, bursts of NEWSAPI_BURST per process) and one of the day's
+# NEWSAPI_DAILY_QUOTA requests (UTC days, counted in the database). Feeds without recent
+# readers leave NEWSAPI_HOT_RESERVE of the rest of the day's share to feeds in demand.
+# Waits longer than NEWSAPI_MAX_WAIT seconds defer the request to a later refresh.
+NEWSAPI_DAILY_QUOTA = 100  # Developer plan
+NEWSAPI_RATE = 2.0
+NEWSAPI_BURST = 20  # A global refresh and two localities at once
+NEWSAPI_MAX_WAIT = 2.0
+NEWSAPI_HOT_RESERVE = 0.5
+NEWSAPI_COOLDOWN = 15 * 60  # Back-off after a 429 without Retry-After
+
+# News list pagination
+NEWS_PAGE_SIZE = 30
+NEWS_MAX_PAGE_SIZE = 100
+RESPONSE_CACHE_TIMEOUT = 60 * 60  # Cached list responses are also dropped on every ingestion/scoring write
+
+# Reverse geocoding
+GEOCODE_GEOHASH_PRECISION = 5  # Geohash cell shared by nearby users, ~5 x 5 km
+GEOCODE_CACHE_TIMEOUT = 30 * 24 * 60 * 60  # Cell -> locality results change rarely
+
+# News freshness: (soft, hard) TTLs in seconds per category. Past the soft TTL the stored
+# articles are still served while a background refresh runs; past the hard TTL the next
+# reader waits for a synchronous fetch.
+NEWS_FRESHNESS = {
+    "default": (60 * 60, 6 * 60 * 60),
+    "general": (20 * 60, 6 * 60 * 60),
+    "business": (30 * 60, 6 * 60 * 60),
+    "technology": (30 * 60, 6 * 60 * 60),
+}
+NEWS_FETCH_BACKOFF = 60  # After a failed fetch, readers get the stored news for this long
+
+# Local feeds: each locality's articles are read through the placement index; localities
+# read LOCAL_FEED_HOT_READS times within the demand window (DEMAND_WINDOW seconds, plus the
+# previous one) keep their newest LOCAL_FEED_SIZE articles per category/sentiment precomputed,
+# rebuilt whenever ingestion or scoring writes to them (see app/services/local_feeds.py)
+DEMAND_WINDOW = 60 * 60
+LOCAL_FEED_HOT_READS = 3
+LOCAL_FEED_SIZE = 100
+LOCAL_FEED_TIMEOUT = 6 * 60 * 60
+
+# Retention: days of articles kept per feed scope, purged in batches of PURGE_BATCH_SIZE rows
+NEWS_RETENTION_DAYS = {"global": 7, "local": 3}
+PURGE_BATCH_SIZE = 1000
+
+# Upper bound on one coalesced upstream fetch; concurrent callers wait this long at most
+SINGLE_FLIGHT_LOCK_TIMEOUT = 120
+
+# Headline search (SQLite FTS5 / PostgreSQL full-text, see app/services/search.py)
+SEARCH_CANDIDATES = 5000  # Newest matches scored with BM25 on SQLite
+SEARCH_MAX_RESULTS = 1000  # Ranked matches a search can page through
+
+# Near-duplicate headlines (SimHash clustering at ingestion, see app/services/dedup.py)
+NEAR_DUPLICATE_MAX_DISTANCE = 6  # Max differing SimHash bits between two titles of the same story
+NEAR_DUPLICATE_WINDOW_HOURS = 48  # Stored articles published this close to a batch are compared
+NEAR_DUPLICATE_DROP = False  # True: drop near-duplicates instead of storing them in the cluster
+
+# Instrumentation: /metrics exposes hot-path timings (see app/services/metrics.py); with
+# SERVER_TIMING responses also carry a Server-Timing header with spans and query counts
+SERVER_TIMING = DEBUG
+
+# Logging: INFO and up to the console, in the format the services' emoji lines were written for
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "formatters": {"plain": {"format": "%(levelname)s:%(name)s:%(message)s"}},
+    "handlers": {"console": {"class": "logging.StreamHandler", "formatter": "plain"}},
+    "root": {"handlers": ["console"], "level": "INFO"},
+}